@@ -0,0 +1,84 @@
+"""
+Date-bounded PolitiFact backfill against a linear walk of the listing.
+
+The stand-in server (standin.py) serves a synthetic archive of --archive-pages
+listing pages, newest first. For each --windows date range the date-range mode
+of politifact-scrapping.py locates the pages by binary search and fetches them
+in parallel; the linear walk fetches every page from 1 to the last page of the
+window, as `--pages` would. Both must return the same fact checks.
+
+Reports the listing pages fetched by each (and how many the binary search
+needed) and the wall time.
+
+Usage:
+    python benchmarks/bench_backfill.py [--archive-pages 1000] [--workers 4]
+                                        [--windows 2020-01-01:2022-12-31 2015-03-01:2015-03-31]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'scrape_data', 'politifact-scrapping.py')
+sys.path.insert(0, os.path.join(ROOT, 'scrape_data'))
+
+from http_cache import CachedSession  # noqa: E402
+from standin import ARCHIVE_PAGES, FixtureServer  # noqa: E402
+
+
+def load_scraper():
+    spec = importlib.util.spec_from_file_location('politifact_scrapping', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_window(text):
+    start, _, end = text.partition(':')
+    return date.fromisoformat(start), date.fromisoformat(end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archive-pages', type=int, default=ARCHIVE_PAGES)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--windows', type=parse_window, nargs='+',
+                        default=[parse_window('2020-01-01:2022-12-31'), parse_window('2015-03-01:2015-03-31')])
+    args = parser.parse_args()
+
+    scraper = load_scraper()
+    print(f"{'window':<23} {'pages':>9} {'checks':>6} {'fetched':>7} {'search':>6} {'time (s)':>8} "
+          f"{'linear fetched':>14} {'linear (s)':>10}  same")
+    failures = 0
+    with FixtureServer(archive_pages=args.archive_pages) as server:
+        base_url = f'{server.url}/archive/factchecks/list/'
+        for start_date, end_date in args.windows:
+            with CachedSession() as session:
+                start = time.perf_counter()
+                fact_checks, stats = scraper.scrape_politifact_date_range(start_date, end_date, session, base_url,
+                                                                          args.workers)
+                elapsed = time.perf_counter() - start
+
+            # The linear walk stops at the last page of the window, which it cannot know any better
+            last_page = max(stats['last_page'], 0)
+            with CachedSession() as session:
+                start = time.perf_counter()
+                walked = scraper.scrape_politifact(last_page, session, base_url)
+                linear_elapsed = time.perf_counter() - start
+            expected = [fact_check for fact_check in walked
+                        if start_date <= scraper.item_date(fact_check) <= end_date]
+
+            same = fact_checks == expected
+            failures += not same
+            pages = f"{stats['first_page']}-{stats['last_page']}"
+            print(f"{f'{start_date}:{end_date}':<23} {pages:>9} {len(fact_checks):>6} {stats['fetches']:>7} "
+                  f"{stats['search_fetches']:>6} {elapsed:>8.2f} {last_page:>14} {linear_elapsed:>10.2f}  {same}")
+    if failures:
+        sys.exit(f"{failures} windows returned different fact checks than the linear walk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Query latency of the BM25 claim index.
+
+Builds the index over data/knowledge_base.csv (optionally replicated --scales
+times to simulate a larger archive), reloads it memory-mapped and runs every
+evaluation-set claim as a query. Results are checked against exhaustive
+scoring of all postings.
+
+Usage:
+    python benchmarks/bench_claim_index.py [--scales 1 10 100] [-k 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from claim_index import BM25Index  # noqa: E402
+
+
+def exhaustive_search(index, terms, k):
+    scores = np.zeros(len(index), dtype=np.float64)
+    for term, tf in terms:
+        start, end = index.offsets[term], index.offsets[term + 1]
+        scores[index.doc_ids[start:end]] += index.impacts[start:end].astype(np.float64) * tf
+    top = np.argsort(-scores, kind='stable')[:k]
+    return [(int(doc), float(scores[doc])) for doc in top if scores[doc] > 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    knowledge_base = pd.read_csv(os.path.join(ROOT, 'data', 'knowledge_base.csv'))
+    claims = pd.read_csv(os.path.join(ROOT, 'data', 'evaluation_set.csv'))['statement'].fillna('')
+
+    print(f"{'docs':>9} {'build (s)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'exact p50 (ms)':>15}  same scores")
+    for scale in args.scales:
+        corpus = pd.concat([knowledge_base] * scale, ignore_index=True)
+        start = time.perf_counter()
+        built = BM25Index.build(corpus['statement'], corpus['uuid'])
+        build_time = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            built.save(tmp)
+            index = BM25Index.load(tmp)
+            queries = [index.query_terms(claim) for claim in claims]
+
+            latencies, exact_latencies, mismatches = [], [], 0
+            for terms in queries:
+                start = time.perf_counter()
+                results = index.search_terms(terms, args.k)
+                latencies.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                expected = exhaustive_search(index, terms, args.k)
+                exact_latencies.append(time.perf_counter() - start)
+                # Compare scores rather than positions: replicated corpora are full of ties
+                if not np.allclose([s for _, s in results], [s for _, s in expected]):
+                    mismatches += 1
+
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        exact_p50 = np.percentile(exact_latencies, 50) * 1000
+        print(f"{len(index):>9} {build_time:>10.2f} {p50:>9.3f} {p99:>9.3f} {exact_p50:>15.3f}  {mismatches == 0}")
+        if mismatches:
+            sys.exit(f"{mismatches} queries returned different scores than exhaustive search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Out-of-core training of the baseline claim classifier on growing corpora.
+
+For each --scales factor the knowledge base is replicated into a temporary
+directory (written chunk by chunk, as CSV) next to the evaluation set. A fresh
+interpreter then trains the classifier with claim_classifier.train and evaluates
+it. Reports training throughput, the peak RSS of the trainer and of its
+largest worker, and macro-F1. Peak memory should stay flat as the corpus grows,
+since only --chunk-size rows are in flight per worker.
+
+Usage:
+    python benchmarks/bench_classifier.py [--scales 1 10 100] [--n-jobs 4] [--epochs 1] [--credit-history]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def child(base_path, n_jobs, epochs, chunk_size, credit_history):
+    import claim_classifier
+
+    model, stats = claim_classifier.train(base_path, epochs=epochs, chunk_size=chunk_size, n_jobs=n_jobs,
+                                          credit_history=credit_history)
+    history = claim_classifier.load_credit_history(base_path) if credit_history else None
+    results = claim_classifier.evaluate(model, base_path, chunk_size=chunk_size, history=history)
+    main_mib, worker_mib = claim_classifier.peak_rss_mib()
+    return {'rows': stats['rows'], 'seconds': stats['seconds'], 'macro_f1': results['macro_f1'],
+            'peak_rss_mib': main_mib, 'worker_rss_mib': worker_mib}
+
+
+def write_scaled(base_path, scale):
+    knowledge_base = pd.read_csv(os.path.join(ROOT, 'data', 'knowledge_base.csv'))
+    path = os.path.join(base_path, 'knowledge_base.csv')
+    knowledge_base.to_csv(path, index=False)
+    for _ in range(scale - 1):
+        knowledge_base.to_csv(path, mode='a', header=False, index=False)
+    shutil.copy(os.path.join(ROOT, 'data', 'evaluation_set.csv'), base_path)
+    # The credit-history features need the LIAR files, and the preprocessing cache avoids recomputing them
+    for name in ('train.tsv', 'test.tsv', 'valid.tsv', 'preprocessing_cache.sqlite'):
+        if os.path.exists(os.path.join(ROOT, 'data', name)):
+            shutil.copy(os.path.join(ROOT, 'data', name), base_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--n-jobs', type=int, default=4)
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=20000)
+    parser.add_argument('--credit-history', action='store_true')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.n_jobs, args.epochs, args.chunk_size, args.credit_history)))
+        return
+
+    print(f"{'rows':>9} {'train (s)':>9} {'rows/s':>8} {'peak RSS (MiB)':>14} {'worker (MiB)':>12} {'macro-F1':>8}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as base_path:
+            write_scaled(base_path, scale)
+            command = [sys.executable, __file__, '--child', base_path, '--n-jobs', str(args.n_jobs), '--epochs',
+                       str(args.epochs), '--chunk-size', str(args.chunk_size)]
+            if args.credit_history:
+                command.append('--credit-history')
+            completed = subprocess.run(command, capture_output=True, text=True, check=True, cwd=ROOT)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{result['rows']:>9} {result['seconds']:>9.2f} {result['rows'] / result['seconds']:>8.0f} "
+              f"{result['peak_rss_mib']:>14.0f} {result['worker_rss_mib']:>12.0f} {result['macro_f1']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Timing and duplicate rate of the MinHash-LSH near-duplicate stage.
+
+Synthetic corpora are drawn from the vocabulary and statement lengths of
+data/knowledge_base.csv. A share of the rows (--dup-rate) are rewordings of an
+earlier row: one token dropped, replaced or added. The report shows the
+injected and the detected duplicate rates and the time taken.
+
+Usage:
+    python benchmarks/bench_dedup.py [--sizes 10000 100000 1000000] [--dup-rate 0.1]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dedup import duplicate_rate, near_duplicate_clusters  # noqa: E402
+
+MIN_TOKENS = 6
+
+
+def synthetic_statements(n, dup_rate, vocabulary, lengths, rng):
+    statements, originals = [], 0
+    for i in range(n):
+        if i and rng.random() < dup_rate:
+            tokens = statements[rng.integers(i)].split()
+            edit = rng.integers(3)
+            position = rng.integers(len(tokens))
+            if edit == 0:
+                del tokens[position]
+            elif edit == 1:
+                tokens[position] = vocabulary[rng.integers(len(vocabulary))]
+            else:
+                tokens.insert(position, vocabulary[rng.integers(len(vocabulary))])
+        else:
+            originals += 1
+            length = max(MIN_TOKENS, lengths[rng.integers(len(lengths))])
+            tokens = [vocabulary[j] for j in rng.integers(len(vocabulary), size=length)]
+        statements.append(' '.join(tokens))
+    return statements, 1 - originals / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--dup-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    statements = pd.read_csv(os.path.join(ROOT, 'data', 'knowledge_base.csv'))['statement'].dropna().str.split()
+    vocabulary = sorted({token for tokens in statements for token in tokens})
+    lengths = statements.str.len().to_numpy()
+
+    print(f"{'rows':>9} {'injected':>9} {'detected':>9} {'time (s)':>9} {'us/row':>7}")
+    for size in args.sizes:
+        rng = np.random.default_rng(42)
+        corpus, injected = synthetic_statements(size, args.dup_rate, vocabulary, lengths, rng)
+        start = time.perf_counter()
+        clusters = near_duplicate_clusters(corpus)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>9} {injected:>9.2%} {duplicate_rate(clusters):>9.2%} {elapsed:>9.2f} "
+              f"{elapsed / size * 1e6:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
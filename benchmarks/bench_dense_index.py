@@ -0,0 +1,77 @@
+"""
+Recall vs latency of the IVF dense index against exact brute-force search.
+
+Builds the index over data/knowledge_base.csv with the offline TF-IDF + SVD
+encoder (float32 and int8), then queries every evaluation-set claim for a
+range of nprobe values. Recall@k is measured against exact search over the
+float32 vectors, so the int8 rows include the loss from quantization (its
+'exact' row is brute-force search over the int8 vectors).
+
+Usage:
+    python benchmarks/bench_dense_index.py [-k 10] [--nprobe 1 2 4 8 16 32]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dense_index import IVFIndex, TfidfSvdEncoder  # noqa: E402
+
+
+def timed_search(search, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query[None, :])[0])
+        latencies.append(time.perf_counter() - start)
+    return results, np.array(latencies) * 1000
+
+
+def recall(results, expected):
+    hits = [len({i for i, _ in got} & {i for i, _ in want}) / max(len(want), 1) for got, want in zip(results, expected)]
+    return float(np.mean(hits))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    knowledge_base = pd.read_csv(os.path.join(ROOT, 'data', 'knowledge_base.csv'))
+    evaluation_set = pd.read_csv(os.path.join(ROOT, 'data', 'evaluation_set.csv'))
+
+    start = time.perf_counter()
+    encoder = TfidfSvdEncoder().fit(knowledge_base['statement'].fillna(''))
+    vectors = encoder.encode(knowledge_base['statement'].fillna(''))
+    queries = encoder.encode(evaluation_set['statement'].fillna(''))
+    print(f"Encoded {len(vectors)} statements and {len(queries)} queries in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'storage':>8} {'nprobe':>7} {'recall@k':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    expected = None
+    for quantize in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            IVFIndex.create(tmp, vectors, [str(key) for key in knowledge_base['uuid']], quantize=quantize)
+            index = IVFIndex.load(tmp)
+            storage = 'int8' if quantize else 'float32'
+
+            exact, latencies = timed_search(lambda q: index.exact_search(q, args.k), queries)
+            # The float32 pass runs first and provides the ground truth for both
+            expected = expected or exact
+            print(f"{storage:>8} {'exact':>7} {recall(exact, expected):>9.3f} {np.percentile(latencies, 50):>9.3f} "
+                  f"{np.percentile(latencies, 99):>9.3f}")
+            for nprobe in args.nprobe:
+                results, latencies = timed_search(lambda q: index.search(q, args.k, nprobe), queries)
+                print(f"{storage:>8} {nprobe:>7} {recall(results, expected):>9.3f} "
+                      f"{np.percentile(latencies, 50):>9.3f} {np.percentile(latencies, 99):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark the lxml extraction layer against the original BeautifulSoup code.
+
+Runs both over the saved pages in benchmarks/fixtures/ (regenerate them with
+make_fixtures.py) and checks that every page yields the same records. The
+legacy functions below are the scrapers' code before the extraction layer.
+
+Usage:
+    python benchmarks/bench_extraction.py [--repeat 20]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+sys.path.insert(0, os.path.join(ROOT, 'scrape_data'))
+
+import extraction  # noqa: E402
+
+
+def legacy_safe_extract(element, selector, attribute=None):
+    found = element.select_one(selector) if element else None
+    if not found:
+        return None
+    if attribute:
+        return found.get(attribute)
+    return found.get_text(strip=True)
+
+
+def legacy_politifact_statements(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    items = []
+    for article in soup.find_all('article', class_='m-statement'):
+        link_element = article.select_one('.m-statement__content a')
+        items.append({
+            'claim': legacy_safe_extract(article, '.m-statement__quote'),
+            'verdict': legacy_safe_extract(article, '.m-statement__meter img', 'alt'),
+            'source': legacy_safe_extract(article, '.m-statement__meta .m-statement__name'),
+            'link': link_element['href'] if link_element else None,
+        })
+    return items
+
+
+def legacy_politifact_listicle(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    return [{
+        'statement': legacy_safe_extract(article, '.m-statement__quote'),
+        'source': legacy_safe_extract(article, '.m-statement__meta a'),
+        'rating': legacy_safe_extract(article, '.m-statement__content img', 'alt'),
+        'footer': legacy_safe_extract(article, '.m-statement__footer'),
+    } for article in soup.find_all('li', class_='o-listicle__item')]
+
+
+def legacy_politifact_article_text(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    article = soup.find('article', class_='m-textblock')
+    if not article:
+        return None
+    return ' '.join([p.get_text() for p in article.find_all('p')])
+
+
+def legacy_snopes_listing(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    links = [link['href'] for link in soup.find_all('a', class_='outer_article_link_wrapper', href=True)]
+    next_button = soup.find('a', class_='next-button')
+    return links, next_button['href'] if next_button and 'href' in next_button.attrs else None
+
+
+def legacy_snopes_article(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    return {
+        'title': soup.find('h1').text.strip() if soup.find('h1') else None,
+        'author': soup.find('h3', class_='author_name').text.strip() if soup.find('h3', class_='author_name') else None,
+        'date': soup.find('h3', class_='publish_date').text.strip() if soup.find('h3', class_='publish_date') else None,
+        'claim': soup.find('div', class_='claim_cont').text.strip() if soup.find('div', class_='claim_cont') else None,
+        'raw_rating': (soup.find('div', class_='rating_title_wrap').text.strip()
+                       if soup.find('div', class_='rating_title_wrap') else None),
+    }
+
+
+CASES = [
+    ('politifact listing', 'politifact/listing/*.html',
+     legacy_politifact_statements, extraction.extract_politifact_statements),
+    ('politifact listicle', 'politifact/listing/*.html',
+     legacy_politifact_listicle, extraction.extract_politifact_listicle),
+    ('politifact article', 'politifact/articles/*.html',
+     legacy_politifact_article_text, extraction.extract_politifact_article_text),
+    ('snopes listing', 'snopes/listing/*.html', legacy_snopes_listing, extraction.extract_snopes_listing),
+    ('snopes article', 'snopes/articles/*.html', legacy_snopes_article, extraction.extract_snopes_article),
+]
+
+
+def time_pages(function, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            function(page)
+    return (time.perf_counter() - start) / (repeat * len(pages)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'case':<20} {'pages':>5} {'bs4 (ms/page)':>14} {'lxml (ms/page)':>15} {'speedup':>8}  identical")
+    for name, pattern, legacy, current in CASES:
+        paths = sorted(glob.glob(os.path.join(FIXTURES, pattern)))
+        if not paths:
+            sys.exit(f"No fixtures for {pattern}; run benchmarks/make_fixtures.py first")
+        pages = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+
+        identical = all(legacy(page) == current(page) for page in pages)
+        failures += not identical
+        legacy_ms = time_pages(legacy, pages, args.repeat)
+        current_ms = time_pages(current, pages, args.repeat)
+        print(f"{name:<20} {len(pages):>5} {legacy_ms:>14.2f} {current_ms:>15.2f} "
+              f"{legacy_ms / current_ms:>7.1f}x  {identical}")
+
+    if failures:
+        sys.exit(f"{failures} cases extracted different records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Filter and group-count latency of the facet index against a pandas scan.
+
+Builds the index over the cleaned LIAR metadata (optionally replicated --scales
+times to simulate a larger archive), reloads it memory-mapped and runs
+--queries conjunctive filters taken from random rows (label, party, state and
+one of the row's subjects), each followed by a count of the selection per
+state. The first --scan-queries are also answered by boolean masks over the
+frame, as before the index, and the selections compared.
+
+Usage:
+    python benchmarks/bench_facet_index.py [--scales 1 10 100] [--queries 200] [--scan-queries 20]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from facet_index import FacetIndex, load_liar_metadata  # noqa: E402
+
+
+def sample_filters(metadata, num_queries, seed=42):
+    rows = metadata.dropna(subset=['subject']).sample(num_queries, replace=True, random_state=seed)
+    return [{'label': row['label'], 'party': row['party_cleaned'], 'state': row['state_cleaned'],
+             'subject': row['subject'].split(',')[0].strip()} for _, row in rows.iterrows()]
+
+
+def scan(metadata, filters):
+    subject = re.escape(filters['subject'])
+    mask = ((metadata['label'] == filters['label']) & (metadata['party_cleaned'] == filters['party'])
+            & (metadata['state_cleaned'] == filters['state'])
+            & metadata['subject'].astype(object).str.contains(rf'(?:^|,)\s*{subject}\s*(?:,|$)', na=False))
+    return np.flatnonzero(mask.to_numpy()), metadata.loc[mask, 'state_cleaned'].value_counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--scan-queries', type=int, default=20)
+    args = parser.parse_args()
+
+    base = load_liar_metadata(os.path.join(ROOT, 'data'))
+    queries = sample_filters(base, args.queries)
+
+    print(f"{'rows':>9} {'build (s)':>10} {'size (MiB)':>10} {'select p50 (us)':>15} {'p99 (us)':>9} "
+          f"{'count p50 (us)':>14} {'scan p50 (ms)':>13}  same rows")
+    for scale in args.scales:
+        metadata = pd.concat([base] * scale, ignore_index=True)
+        start = time.perf_counter()
+        built = FacetIndex.build(metadata)
+        build_time = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            built.save(tmp)
+            size = sum(entry.stat().st_size for entry in os.scandir(tmp)) / 2 ** 20
+            index = FacetIndex.load(tmp)
+
+            select_latencies, count_latencies, selections = [], [], []
+            for filters in queries:
+                start = time.perf_counter()
+                selected = index.select(**filters)
+                select_latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                index.counts('state', within=selected)
+                count_latencies.append(time.perf_counter() - start)
+                selections.append(selected)
+
+            scan_latencies, mismatches = [], 0
+            for filters, selected in zip(queries[:args.scan_queries], selections):
+                start = time.perf_counter()
+                rows, _ = scan(metadata, filters)
+                scan_latencies.append(time.perf_counter() - start)
+                if not np.array_equal(rows, selected.to_array()):
+                    mismatches += 1
+
+        select_p50, select_p99 = np.percentile(select_latencies, [50, 99]) * 1e6
+        count_p50 = np.percentile(count_latencies, 50) * 1e6
+        scan_p50 = np.percentile(scan_latencies, 50) * 1000 if scan_latencies else float('nan')
+        print(f"{len(index):>9} {build_time:>10.2f} {size:>10.1f} {select_p50:>15.0f} {select_p99:>9.0f} "
+              f"{count_p50:>14.0f} {scan_p50:>13.1f}  {mismatches == 0}")
+        if mismatches:
+            sys.exit(f"{mismatches} queries selected different rows than the pandas scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark state/party normalization against the original per-row code.
+
+Runs both over the LIAR train/test/valid splits in data/ (optionally
+replicated --scale times) and checks that every cleaned column holds the same
+values; the new columns are categorical.
+
+Usage:
+    python benchmarks/bench_normalization.py [--scale 10]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_cleaning import clean_data, load_us_states  # noqa: E402
+
+LIAR_COLUMNS = ['id', 'label', 'statement', 'subject', 'speaker', 'job_title', 'state', 'party',
+                'barely_true_counts', 'false_counts', 'half_true_counts', 'mostly_true_counts',
+                'pants_on_fire_counts', 'context']
+CLEANED_COLUMNS = ['state_cleaned', 'is_us_state', 'flagged_for_review', 'party_cleaned']
+
+
+def legacy_clean_single_state(state, state_mappings):
+    if pd.isna(state):
+        return "Unknown"
+    state = str(state).strip().lower()
+    if re.match(r'washington,?\s*d\.?c\.?', state):
+        return 'Washington D.C.'
+    state_upper = state.upper()
+    if state_upper in state_mappings:
+        return state_mappings[state_upper]
+    state = re.sub(r'\s*-.*$', '', state)
+    misspellings = {
+        'virgina': 'Virginia', 'virgiia': 'Virginia', 'tennesse': 'Tennessee', 'tex': 'Texas',
+        'pa - pennsylvania': 'Pennsylvania', 'rhode island': 'Rhode Island',
+        'washington, d.c.': 'Washington D.C.', 'district of columbia': 'Washington D.C.',
+        'washington dc': 'Washington D.C.', 'washington d.c.': 'Washington D.C.', 'atlanta': 'Georgia',
+        'virgina director, coalition to stop gun violence': 'Virginia', 'the united states': 'Unknown',
+        'china': 'Unknown', 'russia': 'Unknown', 'qatar': 'Unknown', 'united kingdom': 'Unknown'
+    }
+    if state in misspellings:
+        return misspellings[state]
+    return state.title()
+
+
+def legacy_clean_party(party):
+    if pd.isna(party):
+        return 'Unknown'
+    party = str(party).lower().strip()
+    if 'republican' in party:
+        return 'Republican'
+    if 'democrat' in party:
+        return 'Democrat'
+    if 'independent' in party:
+        return 'Independent'
+    for minor in ['libertarian', 'green', 'tea party', 'constitution']:
+        if minor in party:
+            return party.title()
+    return 'Other'
+
+
+def legacy_clean_data(df):
+    state_mappings = load_us_states()
+    df['state_cleaned'] = df['state'].apply(lambda state: legacy_clean_single_state(state, state_mappings))
+    df['is_us_state'] = df['state_cleaned'].isin(state_mappings.values())
+    df['flagged_for_review'] = df['state_cleaned'].apply(lambda x: x == "Unknown")
+    df['party_cleaned'] = df['party'].apply(legacy_clean_party)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'split':<6} {'rows':>8} {'legacy (ms)':>12} {'new (ms)':>9} {'speedup':>8}  identical")
+    failures = 0
+    for split in ('train', 'test', 'valid'):
+        df = pd.read_csv(os.path.join(ROOT, 'data', f'{split}.tsv'), names=LIAR_COLUMNS, sep='\t', header=None)
+        df = pd.concat([df] * args.scale, ignore_index=True)
+
+        start = time.perf_counter()
+        expected = legacy_clean_data(df.copy())
+        legacy_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        result = clean_data(df.copy())
+        new_ms = (time.perf_counter() - start) * 1000
+
+        identical = all(expected[column].tolist() == result[column].tolist() for column in CLEANED_COLUMNS)
+        failures += not identical
+        print(f"{split:<6} {len(df):>8} {legacy_ms:>12.1f} {new_ms:>9.1f} {legacy_ms / new_ms:>7.1f}x  {identical}")
+
+    if failures:
+        sys.exit(f"{failures} splits normalized differently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark the weekly PolitiFact scraper with and without Prefect.
+
+Each mode runs in a fresh interpreter against the fixture stand-in server
+(standin.py), scraping --pages listing pages into a temporary data folder:
+
+    plain    run_pipeline() directly, as `--no-orchestrator` does
+    prefect  the main_flow Prefect flow (one task per coarse stage)
+
+Reports the import time of the scraper module (plus prefect for the flow),
+the pipeline time and the end-to-end process time. A last measurement calls a
+no-op function --calls times as a plain call and as a Prefect task inside a
+flow, which is the overhead every article and field paid when they were tasks.
+
+Usage:
+    python benchmarks/bench_orchestration.py [--pages 2] [--repeat 3] [--calls 200]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(ROOT, 'scrape_data', 'weekly-politifact-scraper.py')
+
+
+def load_scraper():
+    sys.path.insert(0, os.path.join(ROOT, 'scrape_data'))
+    spec = importlib.util.spec_from_file_location('weekly_politifact_scraper', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def child_pipeline(mode, pages):
+    import logging
+    start = time.perf_counter()
+    weekly = load_scraper()
+    if mode == 'prefect':
+        main_flow = weekly.get_main_flow()
+    imported = time.perf_counter()
+    logging.disable(logging.INFO)
+
+    sys.path.insert(0, BENCHMARKS)
+    from standin import FixtureServer
+    with FixtureServer() as server, tempfile.TemporaryDirectory() as data_folder:
+        base_url = f'{server.url}/factchecks/list/'
+        start_run = time.perf_counter()
+        if mode == 'prefect':
+            saved = main_flow(metrics_file=None, base_url=base_url, num_pages=pages, data_folder=data_folder,
+                              rate_per_host=1000.0)
+        else:
+            saved = weekly.run_pipeline(base_url, pages, metrics_file=None, data_folder=data_folder,
+                                        rate_per_host=1000.0)
+        finished = time.perf_counter()
+    return {'import_s': imported - start, 'run_s': finished - start_run, 'saved': saved}
+
+
+def child_task_overhead(calls):
+    from prefect import flow, task
+
+    def noop(value):
+        return value
+
+    noop_task = task(noop, name='noop')
+
+    @flow(name='task_overhead')
+    def as_tasks():
+        start = time.perf_counter()
+        for i in range(calls):
+            noop_task(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(calls):
+        noop(i)
+    plain = time.perf_counter() - start
+    return {'plain_s': plain, 'task_s': as_tasks()}
+
+
+def run_child(*args):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, __file__, '--child', *map(str, args)], capture_output=True,
+                               text=True, check=True)
+    wall = time.perf_counter() - start
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_s'] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--child', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        if args.child[0] == 'task_overhead':
+            result = child_task_overhead(int(args.child[1]))
+        else:
+            result = child_pipeline(args.child[0], int(args.child[1]))
+        print(json.dumps(result))
+        return
+
+    print(f"{'mode':<8} {'saved':>5} {'import (s)':>10} {'pipeline (s)':>12} {'process (s)':>11}")
+    for mode in ('plain', 'prefect'):
+        runs = [run_child(mode, args.pages) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run['process_s'])
+        print(f"{mode:<8} {best['saved']:>5} {best['import_s']:>10.2f} {best['run_s']:>12.2f} {best['process_s']:>11.2f}")
+
+    overhead = run_child('task_overhead', args.calls)
+    per_call = (overhead['task_s'] - overhead['plain_s']) / args.calls * 1000
+    print(f"\n{args.calls} no-op calls: plain {overhead['plain_s'] * 1000:.2f} ms, "
+          f"as Prefect tasks {overhead['task_s'] * 1000:.0f} ms ({per_call:.2f} ms overhead per call)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memory used by the corpus frames with default dtypes versus the typed schema.
+
+Loads the LIAR splits and the PolitiFact/Snopes exports from data/ both ways,
+replicated --scale times, builds the combined corpus (label, statement,
+source, uuid) and prints a per-column memory report for both frames.
+
+Also checks that the LIAR cleaning path (data_cleaning.preprocess_dataset)
+gives the same result on the typed frames as on the default ones.
+
+Usage:
+    python benchmarks/bench_schema.py [--scale 10]
+"""
+import argparse
+import os
+import sys
+import uuid
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_cleaning import preprocess_dataset  # noqa: E402
+from schema import (CORPUS_DTYPES, LIAR_COLUMNS, LIAR_DTYPES, POLITIFACT_DTYPES, SNOPES_DTYPES,  # noqa: E402
+                    apply_schema, concat_frames, memory_report, new_uuids)
+
+
+def load(typed):
+    data = os.path.join(ROOT, 'data')
+    liar = [pd.read_csv(os.path.join(data, f'{split}.tsv'), names=LIAR_COLUMNS, sep='\t', header=None,
+                        dtype=LIAR_DTYPES if typed else None)
+            for split in ('train', 'test', 'valid')]
+    politifact = pd.read_csv(os.path.join(data, 'politifact_factchecks_20240919.csv'),
+                             dtype=POLITIFACT_DTYPES if typed else None)
+    snopes = pd.read_csv(os.path.join(data, 'snopes_factchecks_data.csv'), dtype=SNOPES_DTYPES if typed else None)
+
+    parts = [df.assign(source='LIAR')[['label', 'statement', 'source']] for df in liar]
+    parts.append(politifact.assign(source='PolitiFact')[['rating', 'statement', 'source']]
+                 .rename(columns={'rating': 'label'}))
+    parts.append(snopes.assign(source='Snopes')[['rating', 'claim', 'source']]
+                 .rename(columns={'rating': 'label', 'claim': 'statement'}))
+    return liar, parts
+
+
+def check_cleaning(untyped, typed):
+    untyped = preprocess_dataset(untyped.copy())
+    typed = preprocess_dataset(typed.copy())
+    mismatched = [column for column in untyped.columns
+                  if not untyped[column].astype(object).equals(typed[column].astype(object))]
+    if mismatched:
+        sys.exit(f"Cleaning the typed LIAR splits changed columns {mismatched}")
+    print(f"Cleaning path: same output on {len(typed)} typed LIAR rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=10)
+    args = parser.parse_args()
+
+    frames, splits = {}, {}
+    for typed in (False, True):
+        liar, parts = load(typed)
+        splits[typed] = pd.concat(liar, ignore_index=True)
+        liar = pd.concat(liar * args.scale, ignore_index=True)
+        if typed:
+            liar = apply_schema(liar, LIAR_DTYPES)
+            corpus = concat_frames([apply_schema(df, CORPUS_DTYPES) for df in parts * args.scale])
+            corpus['uuid'] = new_uuids(len(corpus))
+        else:
+            corpus = pd.concat(parts * args.scale, ignore_index=True)
+            corpus['uuid'] = [str(uuid.uuid4()) for _ in range(len(corpus))]
+        frames[typed] = liar, corpus
+
+    print(f"LIAR splits ({len(frames[True][0])} rows), default dtypes vs schema:")
+    print(memory_report(frames[False][0], frames[True][0]))
+    print(f"\nCombined corpus ({len(frames[True][1])} rows), default dtypes vs schema:")
+    print(memory_report(frames[False][1], frames[True][1]))
+    print()
+    check_cleaning(splits[False], apply_schema(splits[True], LIAR_DTYPES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Startup benchmark: import time of the pipeline modules and scrapers.
+
+Each target is imported in a fresh interpreter under `python -X importtime`
+(--repeat times, best run kept). The benchmark reports the total import time
+and the heaviest packages pulled in. It fails (exit status 1) when a target
+imports a dependency that must stay lazy, e.g. nltk for data_preprocessing or
+prefect for a --no-orchestrator scraper run. With --max-ms it also fails when a
+target takes longer than that to import.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--max-ms 1500]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRAPE_DATA = os.path.join(ROOT, 'scrape_data')
+
+LOAD_SCRIPT = (
+    "import importlib.util, sys; sys.path.insert(0, {path!r}); "
+    "spec = importlib.util.spec_from_file_location('script', {file!r}); "
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+)
+
+# name: (code run in the fresh interpreter, packages it must not import)
+TARGETS = {
+    'data_preprocessing': (f"import sys; sys.path.insert(0, {ROOT!r}); import data_preprocessing",
+                           ('nltk', 'pandas', 'scipy')),
+    'data_cleaning': (f"import sys; sys.path.insert(0, {ROOT!r}); import data_cleaning", ('nltk', 'scipy')),
+    'summarizer': (f"import sys; sys.path.insert(0, {SCRAPE_DATA!r}); import summarizer", ('nltk', 'scipy')),
+    'weekly-politifact-scraper': (
+        LOAD_SCRIPT.format(path=SCRAPE_DATA, file=os.path.join(SCRAPE_DATA, 'weekly-politifact-scraper.py')),
+        ('prefect', 'nltk', 'scipy', 'pandas')),
+    'snopes-scrapping': (
+        LOAD_SCRIPT.format(path=SCRAPE_DATA, file=os.path.join(SCRAPE_DATA, 'snopes-scrapping.py')),
+        ('prefect', 'nltk', 'scipy', 'pandas')),
+    # Reference: what every target paid before nltk was made lazy
+    'nltk (reference)': ("import nltk", ()),
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        tuple[float, dict]: Total import time in ms and the cumulative time in ms
+            of each top-level package.
+    """
+    total_us = 0
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        packages[name.strip().split('.')[0]] += int(self_us)
+    return total_us / 1000, {package: us / 1000 for package, us in packages.items()}
+
+
+def measure(code):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                               cwd=ROOT)
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, help="Fail when a target takes longer than this to import")
+    parser.add_argument('--top', type=int, default=4, help="Heaviest packages listed per target")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'target':<26} {'import (ms)':>11}  heaviest packages (ms)")
+    for name, (code, forbidden) in TARGETS.items():
+        total, packages = min((measure(code) for _ in range(args.repeat)), key=lambda run: run[0])
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{name:<26} {total:>11.1f}  " + ", ".join(f"{package} {ms:.0f}" for package, ms in heaviest))
+
+        imported = sorted(set(forbidden) & set(packages))
+        if imported:
+            failures.append(f"{name} imports {', '.join(imported)} at startup")
+        if args.max_ms is not None and forbidden and total > args.max_ms:
+            failures.append(f"{name} takes {total:.0f} ms to import (limit {args.max_ms:.0f} ms)")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nNo lazy dependency is imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare loading 'statement' + 'label' from CSV and from the Parquet storage layer.
+
+A synthetic corpus of --rows rows is sampled from data/knowledge_base.csv and
+written in both formats to a temporary directory. Each loader runs in a fresh
+process so its peak RSS can be measured.
+
+Usage:
+    python benchmarks/bench_storage.py [--rows 1000000]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import uuid
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from storage import load_parquet, save_parquet  # noqa: E402
+
+COLUMNS = ['statement', 'label']
+
+
+def load_csv(path):
+    return pd.read_csv(path, usecols=COLUMNS)
+
+
+def peak_rss():
+    # ru_maxrss survives exec on Linux, so prefer the per-process high-water mark
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_loader(loader, path, queue):
+    baseline = peak_rss()
+    start = time.perf_counter()
+    if loader == 'csv':
+        df = load_csv(path)
+    else:
+        df = load_parquet(path, columns=COLUMNS)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, df.memory_usage(deep=True).sum(), peak_rss() - baseline))
+
+
+def measure(loader, path):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_loader, args=(loader, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    kb = pd.read_csv(os.path.join(ROOT, 'data', 'knowledge_base.csv'))
+    corpus = kb.sample(n=args.rows, replace=True, random_state=42).reset_index(drop=True)
+    corpus['uuid'] = [str(uuid.uuid4()) for _ in range(len(corpus))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'corpus.csv')
+        parquet_path = os.path.join(tmp, 'corpus.parquet')
+        corpus.to_csv(csv_path, index=False)
+        save_parquet(corpus, parquet_path)
+
+        print(f"rows: {args.rows}")
+        print(f"file size: csv {os.path.getsize(csv_path) / 2**20:.1f} MiB, "
+              f"parquet {os.path.getsize(parquet_path) / 2**20:.1f} MiB")
+        results = {loader: measure(loader, path) for loader, path in (('csv', csv_path), ('parquet', parquet_path))}
+
+    print(f"{'format':>8} {'time (s)':>10} {'frame (MiB)':>12} {'peak RSS (MiB)':>15}")
+    for loader, (elapsed, frame_bytes, peak_bytes) in results.items():
+        print(f"{loader:>8} {elapsed:>10.3f} {frame_bytes / 2**20:>12.1f} {peak_bytes / 2**20:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark the vectorized summarizer against the original pairwise loop.
+
+Articles of 10/100/1000 sentences are assembled from the summaries in
+data/politifact_fact_checks.csv. For every size the two implementations must
+return the same summary.
+
+Usage:
+    python benchmarks/bench_summarize.py [--sizes 10 100 1000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from nltk.tokenize import sent_tokenize
+from scipy.spatial.distance import cosine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scrape_data'))
+
+from summarizer import STOP_WORDS, summarize  # noqa: E402
+
+
+def sentence_similarity(sent1, sent2):
+    all_words = list(set(sent1 + sent2))
+    vector1 = [0] * len(all_words)
+    vector2 = [0] * len(all_words)
+
+    for w in sent1:
+        vector1[all_words.index(w)] += 1
+    for w in sent2:
+        vector2[all_words.index(w)] += 1
+
+    return 1 - cosine(vector1, vector2)
+
+
+def summarize_pairwise(text, num_sentences=3):
+    # The original implementation from weekly-politifact-scraper.py
+    sentences = sent_tokenize(text)
+
+    sentence_vectors = []
+    for sentence in sentences:
+        words = [word.lower() for word in sentence.split() if word.lower() not in STOP_WORDS]
+        sentence_vectors.append(words)
+
+    similarity_matrix = np.zeros((len(sentences), len(sentences)))
+    for i in range(len(sentences)):
+        for j in range(len(sentences)):
+            if i != j:
+                similarity_matrix[i][j] = sentence_similarity(sentence_vectors[i], sentence_vectors[j])
+
+    sentence_scores = similarity_matrix.sum(axis=1)
+    ranked_sentences = [sentences[i] for i in np.argsort(sentence_scores)[::-1][:num_sentences]]
+
+    return ' '.join(ranked_sentences)
+
+
+def load_sentences():
+    df = pd.read_csv(os.path.join(ROOT, 'data', 'politifact_fact_checks.csv'))
+    sentences = []
+    for summary in df['summary'].dropna():
+        sentences.extend(sent_tokenize(summary))
+    return sentences
+
+
+def best_time(func, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pool = load_sentences()
+    rng = random.Random(42)
+
+    print(f"{'sentences':>10} {'pairwise (s)':>14} {'vectorized (s)':>15} {'speedup':>9}  match")
+    for size in args.sizes:
+        text = ' '.join(rng.choice(pool) for _ in range(size))
+        # The quadratic loop is far too slow to repeat at the larger sizes
+        old_time, old_summary = best_time(summarize_pairwise, text, args.repeat if size <= 100 else 1)
+        new_time, new_summary = best_time(summarize, text, args.repeat)
+        print(f"{size:>10} {old_time:>14.4f} {new_time:>15.4f} {old_time / new_time:>8.1f}x  {old_summary == new_summary}")
+        if old_summary != new_summary:
+            sys.exit(f"Summaries differ for an article of {size} sentences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Load test for verification_service.py.
+
+Sends every claim of the evaluation set (1,311 claims) to a running service
+with --concurrency requests in flight, --rounds times (later rounds hit the
+service's LRU cache). Prints client-side latency percentiles and throughput
+for each round, then the server's own /stats.
+
+Usage:
+    python verification_service.py &
+    python benchmarks/load_test_service.py [--url http://127.0.0.1:8080] [--concurrency 32] [--rounds 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from storage import load_corpus  # noqa: E402
+
+
+async def run_round(session, url, claims, concurrency, k):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def send(claim):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.post(f'{url}/verify', json={'claim': claim, 'k': k}) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(claim) for claim in claims))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def main_async(args):
+    claims = load_corpus(os.path.join(ROOT, 'data'), 'evaluation_set', columns=['statement'])['statement']
+    claims = claims.fillna('').astype(str).tolist()
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        print(f"{'round':>5} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        for round_number in range(1, args.rounds + 1):
+            latencies, errors, elapsed = await run_round(session, args.url, claims, args.concurrency, args.k)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            print(f"{round_number:>5} {len(claims):>8} {errors:>6} {len(claims) / elapsed:>8.1f} "
+                  f"{p50:>9.2f} {p99:>9.2f}")
+
+        async with session.get(f'{args.url}/stats') as response:
+            print("\nServer stats:")
+            print(json.dumps(await response.json(), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=2)
+    parser.add_argument('-k', type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
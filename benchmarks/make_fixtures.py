@@ -0,0 +1,196 @@
+"""
+Generate the saved HTML fixtures used by the scraper benchmarks.
+
+The pages mirror the markup the scrapers target on politifact.com and
+snopes.com (listing items, article bodies, navigation, scripts and footer
+boilerplate). Their content is filled from the fact checks already in data/.
+Output is deterministic; rerun after changing the templates:
+
+    python benchmarks/make_fixtures.py
+"""
+import html
+import os
+import random
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+LISTING_PAGES = 2
+POLITIFACT_ITEMS_PER_PAGE = 30
+SNOPES_ITEMS_PER_PAGE = 20
+ARTICLES = 8
+
+
+def boilerplate_head(title):
+    scripts = '\n'.join(
+        f'<script type="text/javascript">window.dataLayer = window.dataLayer || []; '
+        f'dataLayer.push({{"event": "load_{i}", "section": "fact-check"}});</script>'
+        for i in range(10)
+    )
+    return (f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{html.escape(title)}</title>\n'
+            f'<link rel="stylesheet" href="/static/css/main.css">\n{scripts}\n</head>\n')
+
+
+def navigation(rng):
+    links = '\n'.join(
+        f'<li class="c-nav__item"><a class="c-nav__link" href="/topic/{rng.randrange(10**6)}/">Topic {i}</a></li>'
+        for i in range(120)
+    )
+    return f'<header class="c-header"><nav class="c-nav"><ul class="c-nav__list">\n{links}\n</ul></nav></header>\n'
+
+
+def footer():
+    columns = '\n'.join(
+        f'<div class="c-footer__column"><h4>Section {i}</h4><ul>'
+        + ''.join(f'<li><a href="/section/{i}/{j}/">Link {j}</a></li>' for j in range(8))
+        + '</ul></div>'
+        for i in range(8)
+    )
+    return (f'<footer class="c-footer">\n{columns}\n<!-- analytics footer -->\n'
+            f'<p class="c-footer__copy">&copy; 2024 All rights reserved.</p></footer>\n')
+
+
+def politifact_item(row, rng):
+    quote = html.escape(str(row['claim']))
+    source = html.escape(str(row['source']))
+    verdict = html.escape(str(row['verdict']))
+    path = str(row['link']).replace('https://www.politifact.com', '')
+    return f'''<li class="o-listicle__item">
+  <article class="m-statement m-statement--is-medium m-statement--{verdict}">
+    <div class="m-statement__author">
+      <div class="m-statement__avatar"><div class="m-statement__image"><div class="c-image" style="padding-top: 119.27710843%;">
+        <img src="/photos/mugs/{rng.randrange(10**5)}.jpg" class="c-image__original" alt="{source}"></div></div></div>
+      <div class="m-statement__meta">
+        <a href="/personalities/{rng.randrange(10**5)}/" class="m-statement__name" title="{source}">
+          {source}
+        </a>
+        <div class="m-statement__desc">
+          stated on September {rng.randint(1, 28)}, 2024 in a post on social media:
+        </div>
+      </div>
+    </div>
+    <div class="m-statement__content">
+      <div class="m-statement__body">
+        <div class="m-statement__quote">
+          <a href="{path}">
+            {quote}
+          </a>
+        </div>
+        <footer class="m-statement__footer">
+          By Staff Writer &bull; October {rng.randint(1, 28)}, 2024
+        </footer>
+      </div>
+      <div class="m-statement__meter">
+        <div class="c-image" style="padding-top: 89.49771689%;">
+          <picture><img src="/meter/{verdict}.jpg" class="c-image__thumb" alt="{verdict}" width="219" height="196"></picture>
+        </div>
+      </div>
+    </div>
+  </article>
+</li>'''
+
+
+def politifact_article(row, rng):
+    sentences = [s for s in str(row['summary']).split('. ') if s]
+    paragraphs = []
+    for i in range(12):
+        sentence = html.escape(rng.choice(sentences).rstrip('.'))
+        if i % 3 == 0:
+            sentence = f'<a href="/factchecks/{rng.randrange(10**5)}/">{sentence}</a>'
+        if i % 4 == 1:
+            sentence = f'{sentence} &mdash; <em>according to the record</em>'
+        paragraphs.append(f'<p>{sentence}. {html.escape(rng.choice(sentences))}</p>')
+    body = '\n'.join(paragraphs)
+    return (boilerplate_head(str(row['claim'])) + '<body>\n' + navigation(rng)
+            + f'<main class="c-main"><section class="o-stage"><div class="m-statement__quote">'
+            f'{html.escape(str(row["claim"]))}</div></section>\n'
+            f'<article class="m-textblock">\n<div class="t-row"><div class="t-row__center">\n{body}\n'
+            f'<div class="artembed"><script>embed();</script></div>\n</div></div>\n</article>\n</main>\n'
+            + footer() + '</body>\n</html>\n')
+
+
+def snopes_listing_link(row, index):
+    slug = f'fixture-article-{index}'
+    return f'''<div class="article_wrapper">
+  <a class="outer_article_link_wrapper" href="/fact-check/{slug}/">
+    <div class="article_img_wrapper"><img class="article_img" src="/uploads/{index}.jpg" alt=""></div>
+    <div class="article_text">
+      <h3 class="article_title">{html.escape(str(row['title']))}</h3>
+      <span class="article_byline">By {html.escape(str(row['author']))}</span>
+    </div>
+  </a>
+</div>'''
+
+
+def snopes_article(row, rng):
+    rating = html.escape(str(row['rating']))
+    return (boilerplate_head(str(row['title'])) + '<body>\n' + navigation(rng)
+            + f'''<main id="article_main">
+<section class="title-container">
+  <h1>
+    {html.escape(str(row['title']))}
+  </h1>
+  <div class="author_info">
+    <h3 class="author_name">
+      {html.escape(str(row['author']))}
+    </h3>
+    <h3 class="publish_date">{html.escape(str(row['date']))}</h3>
+  </div>
+</section>
+<section id="fact_check_rating_container">
+  <div class="claim_wrapper"><div class="claim_cont">
+    {html.escape(str(row['claim']))}
+  </div></div>
+  <a class="rating_link_wrapper" href="/fact-check-ratings/#{rating.lower()}">
+    <div class="rating_img_wrap"><img src="/rating/{rating.lower()}.png" alt="{rating}"></div>
+    <div class="rating_title_wrap">
+      {rating}
+      <span class="rating_info">About this rating</span>
+    </div>
+  </a>
+</section>
+<article id="article-content">
+''' + '\n'.join(f'<p>{html.escape(str(row["claim"]))} <strong>Update {i}</strong>.</p>' for i in range(10))
+            + '\n</article>\n</main>\n' + footer() + '</body>\n</html>\n')
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def main():
+    rng = random.Random(42)
+    politifact = pd.read_csv(os.path.join(ROOT, 'data', 'politifact_fact_checks.csv'))
+    snopes = pd.read_csv(os.path.join(ROOT, 'data', 'snopes_factchecks_data.csv'))
+
+    for page in range(1, LISTING_PAGES + 1):
+        rows = politifact.iloc[(page - 1) * POLITIFACT_ITEMS_PER_PAGE:page * POLITIFACT_ITEMS_PER_PAGE]
+        items = '\n'.join(politifact_item(row, rng) for _, row in rows.iterrows())
+        write(os.path.join(FIXTURES, 'politifact', 'listing', f'page-{page}.html'),
+              boilerplate_head('Fact-checks') + '<body>\n' + navigation(rng)
+              + f'<main class="c-main"><section class="o-listicle"><ul class="o-listicle__list">\n{items}\n'
+              f'</ul></section></main>\n' + footer() + '</body>\n</html>\n')
+
+        rows = snopes.iloc[(page - 1) * SNOPES_ITEMS_PER_PAGE:page * SNOPES_ITEMS_PER_PAGE]
+        links = '\n'.join(snopes_listing_link(row, index) for index, row in rows.iterrows())
+        next_button = (f'<a class="next-button" href="/fact-check/?pagenum={page + 1}">Next</a>'
+                       if page < LISTING_PAGES else '')
+        write(os.path.join(FIXTURES, 'snopes', 'listing', f'page-{page}.html'),
+              boilerplate_head('Fact Checks') + '<body>\n' + navigation(rng)
+              + f'<main><div id="article-list">\n{links}\n</div>\n<div class="pagination">{next_button}</div></main>\n'
+              + footer() + '</body>\n</html>\n')
+
+    for index in range(ARTICLES):
+        write(os.path.join(FIXTURES, 'politifact', 'articles', f'article-{index}.html'),
+              politifact_article(politifact.iloc[index], rng))
+        write(os.path.join(FIXTURES, 'snopes', 'articles', f'article-{index}.html'),
+              snopes_article(snopes.iloc[index], rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Local HTTP stand-in for politifact.com and snopes.com, serving benchmarks/fixtures/.
+
+Routes:
+    /factchecks/list/?page=N       PolitiFact listing page N
+    /archive/factchecks/list/?page=N
+                                   page N of a synthetic PolitiFact archive of
+                                   archive_pages pages, newest first, with
+                                   ARCHIVE_ITEMS_PER_DAY fact checks per day
+    /factchecks/<anything>         a PolitiFact article (chosen from the path)
+    /fact-check/?pagenum=N         Snopes listing page N
+    /fact-check/<slug>/            a Snopes article (chosen from the slug)
+
+Usage as a context manager:
+
+    with FixtureServer() as server:
+        scrape(server.url + '/factchecks/list/')
+
+Pages carry an ETag and answer a matching If-None-Match with 304 Not Modified.
+
+or standalone: python benchmarks/standin.py [--port 8765]
+"""
+import argparse
+import glob
+import html
+import os
+import re
+import threading
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+ARCHIVE_PAGES = 1000
+ARCHIVE_ITEMS_PER_PAGE = 30
+ARCHIVE_ITEMS_PER_DAY = 7
+ARCHIVE_NEWEST = date(2024, 10, 24)
+RATINGS = ('true', 'mostly-true', 'half-true', 'barely-true', 'false', 'pants-fire')
+
+
+def load_pages(pattern):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, pattern))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    politifact_listing = load_pages('politifact/listing/page-*.html')
+    politifact_articles = load_pages('politifact/articles/*.html')
+    snopes_listing = load_pages('snopes/listing/page-*.html')
+    snopes_articles = load_pages('snopes/articles/*.html')
+    archive_pages = ARCHIVE_PAGES
+
+    def page_for(self, url):
+        query = parse_qs(url.query)
+        if url.path == '/factchecks/list/':
+            return self.listing_page(self.politifact_listing, query.get('page', ['1'])[0])
+        if url.path.startswith('/factchecks/'):
+            return self.politifact_articles[zlib.crc32(url.path.encode()) % len(self.politifact_articles)]
+        if url.path == '/fact-check/':
+            return self.listing_page(self.snopes_listing, query.get('pagenum', ['1'])[0])
+        if url.path == '/archive/factchecks/list/':
+            return self.archive_page(query.get('page', ['1'])[0])
+        if url.path.startswith('/fact-check/'):
+            match = re.search(r'(\d+)/?$', url.path)
+            number = int(match.group(1)) if match else zlib.crc32(url.path.encode())
+            return self.snopes_articles[number % len(self.snopes_articles)]
+        return None
+
+    @staticmethod
+    def listing_page(pages, number):
+        try:
+            number = int(number)
+        except ValueError:
+            return None
+        return pages[number - 1] if 1 <= number <= len(pages) else None
+
+    def archive_page(self, number):
+        try:
+            number = int(number)
+        except ValueError:
+            return None
+        if not 1 <= number <= self.archive_pages:
+            return None
+        items = []
+        for index in range((number - 1) * ARCHIVE_ITEMS_PER_PAGE, number * ARCHIVE_ITEMS_PER_PAGE):
+            day = ARCHIVE_NEWEST - timedelta(days=index // ARCHIVE_ITEMS_PER_DAY)
+            items.append(f'''<li class="o-listicle__item"><article class="m-statement">
+  <div class="m-statement__meta"><a href="/personalities/{index % 97}/">Speaker {index % 97}</a></div>
+  <div class="m-statement__content">
+    <div class="m-statement__quote"><a href="/factchecks/archive/{index}/">Archived claim number {index}</a></div>
+    <footer class="m-statement__footer">By Staff Writer &bull; {html.escape(day.strftime('%B %d, %Y'))}</footer>
+    <div class="m-statement__meter"><img alt="{RATINGS[index % len(RATINGS)]}"></div>
+  </div>
+</article></li>''')
+        return (f'<!DOCTYPE html>\n<html><body><ul class="o-listicle__list">\n' + '\n'.join(items)
+                + '\n</ul></body></html>\n').encode('utf-8')
+
+    def do_GET(self):
+        page = self.page_for(urlparse(self.path))
+        if page is None:
+            self.send_error(404)
+            return
+        etag = f'"{zlib.crc32(page):08x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serve the fixtures from a background thread; ``url`` is set once started."""
+
+    def __init__(self, host='127.0.0.1', port=0, archive_pages=ARCHIVE_PAGES):
+        handler = type('ArchiveFixtureHandler', (FixtureHandler,), {'archive_pages': archive_pages})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--archive-pages', type=int, default=ARCHIVE_PAGES)
+    args = parser.parse_args()
+    with FixtureServer(args.host, args.port, args.archive_pages) as server:
+        print(f"Serving fixtures on {server.url}")
+        server.thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+End-to-end benchmark suite for the data pipeline and the scrapers.
+
+Every stage runs in a fresh process on the bundled data/ files, scaled by each
+--scales factor with synthetic rows (each replica of a statement gets its own
+marker word, so replicas are near duplicates, not exact copies). The scraper
+stages crawl the saved pages in benchmarks/fixtures/ through the local stand-in
+server (standin.py) and only run at scale 1.
+
+For each stage and scale the suite records wall time, peak RSS and rows/s,
+appends the run to benchmarks/results/history.jsonl and compares it with
+benchmarks/results/baseline.json. It exits with status 1 when a stage is
+slower or uses more memory than the baseline by more than --threshold.
+
+Usage:
+    python benchmarks/suite.py [--scales 1 10 100] [--stages preprocess clean_data ...]
+                               [--threshold 0.25] [--update-baseline]
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import importlib.abc
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS)
+DATA = os.path.join(ROOT, 'data')
+RESULTS = os.path.join(BENCHMARKS, 'results')
+HISTORY_PATH = os.path.join(RESULTS, 'history.jsonl')
+BASELINE_PATH = os.path.join(RESULTS, 'baseline.json')
+
+LIAR_SPLITS = ('train', 'test', 'valid')
+# Regressions smaller than this are treated as noise
+MIN_WALL_DELTA = 0.05
+MIN_RSS_DELTA_MIB = 16
+
+for path in (ROOT, os.path.join(ROOT, 'scrape_data'), BENCHMARKS):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def peak_rss():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def reset_peak_rss():
+    # Linux: restart the high-water mark from the current RSS, so setup is not counted
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+# The hyphenated scrape_data/ scripts, importable under these module names
+SCRIPTS = {
+    'snopes_scraper': 'snopes-scrapping.py',
+    'weekly_politifact_scraper': 'weekly-politifact-scraper.py',
+}
+
+
+class ScriptFinder(importlib.abc.MetaPathFinder):
+    """
+    Import the scrape_data/ scripts by their SCRIPTS name. Installed at import time,
+    so the spawned process-pool workers (which re-import this file) can unpickle
+    the scripts' functions too.
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname not in SCRIPTS:
+            return None
+        return importlib.util.spec_from_file_location(fullname, os.path.join(ROOT, 'scrape_data', SCRIPTS[fullname]))
+
+
+sys.meta_path.append(ScriptFinder())
+
+
+def load_liar(scale):
+    from schema import LIAR_COLUMNS
+    df = pd.concat([pd.read_csv(os.path.join(DATA, f'{split}.tsv'), names=LIAR_COLUMNS, sep='\t', header=None)
+                    for split in LIAR_SPLITS], ignore_index=True)
+    return scale_rows(df, scale)
+
+
+def scale_rows(df, scale):
+    if scale == 1:
+        return df
+    replicas = []
+    for replica in range(scale):
+        part = df.copy()
+        if replica:
+            part['statement'] = part['statement'].astype(str) + f' replica{replica}'
+        replicas.append(part)
+    return pd.concat(replicas, ignore_index=True)
+
+
+# Each stage is (setup, run): setup(scale, tmp) imports the code and prepares the input
+# outside the measurement; run(state) does the work and returns the number of rows processed
+
+def setup_preprocess(scale, tmp):
+    import data_preprocessing  # noqa: F401
+    return load_liar(scale)['statement']
+
+
+def run_preprocess(statements):
+    from data_preprocessing import preprocess_series
+    preprocess_series(statements)
+    return len(statements)
+
+
+def setup_clean_data(scale, tmp):
+    import data_cleaning  # noqa: F401
+    return load_liar(scale)
+
+
+def run_clean_data(df):
+    from data_cleaning import clean_data
+    clean_data(df)
+    return len(df)
+
+
+def setup_summarize(scale, tmp):
+    import scipy.sparse  # noqa: F401
+    import summarizer  # noqa: F401
+    from nltk.tokenize import sent_tokenize
+    summaries = pd.read_csv(os.path.join(DATA, 'politifact_fact_checks.csv'))['summary'].dropna()
+    sentences = [sentence for summary in summaries for sentence in sent_tokenize(summary)]
+    articles, size = [], 40
+    for i in range(20 * scale):
+        start = (i * size) % max(len(sentences) - size, 1)
+        articles.append(' '.join(sentences[start:start + size]))
+    return articles
+
+
+def run_summarize(articles):
+    from summarizer import summarize
+    for article in articles:
+        summarize(article)
+    return len(articles)
+
+
+def setup_extract_article_data(scale, tmp):
+    from standin import load_pages
+    snopes = importlib.import_module('snopes_scraper')
+    return snopes, load_pages('snopes/articles/*.html') * 25 * scale
+
+
+def run_extract_article_data(state):
+    snopes, pages = state
+    for page in pages:
+        snopes.extract_article_data(page)
+    return len(pages)
+
+
+def setup_data_building(scale, tmp, streaming=False):
+    from schema import LIAR_COLUMNS
+    import data_building
+    data = os.path.join(tmp, 'data')
+    os.makedirs(data)
+    for split in LIAR_SPLITS:
+        df = pd.read_csv(os.path.join(DATA, f'{split}.tsv'), names=LIAR_COLUMNS, sep='\t', header=None)
+        scale_rows(df, scale).to_csv(os.path.join(data, f'{split}.tsv'), sep='\t', header=False, index=False)
+    for name in ('politifact_factchecks_20240919.csv', 'snopes_factchecks_data.csv'):
+        shutil.copy(os.path.join(DATA, name), data)
+    return data_building, tmp, streaming
+
+
+def run_data_building(state):
+    data_building, tmp, streaming = state
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if streaming:
+                data_building.main_streaming('data')
+            else:
+                data_building.main()
+    finally:
+        os.chdir(cwd)
+    return sum(len(pd.read_csv(os.path.join(tmp, 'data', f'{name}.csv'), usecols=['uuid']))
+               for name in ('knowledge_base', 'evaluation_set'))
+
+
+def setup_data_building_streaming(scale, tmp):
+    return setup_data_building(scale, tmp, streaming=True)
+
+
+def setup_politifact_scraper(scale, tmp):
+    return importlib.import_module('weekly_politifact_scraper')
+
+
+def run_politifact_scraper(weekly):
+    from standin import FixtureServer
+    with FixtureServer() as server:
+        fact_checks = asyncio.run(weekly.scrape_politifact_async(
+            f'{server.url}/factchecks/list/', 2, set(), rate_per_host=1000.0, summary_workers=2))
+    return len(fact_checks)
+
+
+def setup_snopes_crawl(scale, tmp):
+    return importlib.import_module('snopes_scraper'), tmp
+
+
+def run_snopes_crawl(state):
+    from standin import FixtureServer
+    snopes, tmp = state
+    with FixtureServer() as server:
+        return asyncio.run(snopes.crawl(f'{server.url}/fact-check/', os.path.join(tmp, 'snopes.csv'), 2,
+                                        workers=4, rate_per_host=1000.0))
+
+
+STAGES = {
+    # name: (setup, run, scalable)
+    'preprocess': (setup_preprocess, run_preprocess, True),
+    'clean_data': (setup_clean_data, run_clean_data, True),
+    'summarize': (setup_summarize, run_summarize, True),
+    'extract_article_data': (setup_extract_article_data, run_extract_article_data, True),
+    'data_building': (setup_data_building, run_data_building, True),
+    'data_building_streaming': (setup_data_building_streaming, run_data_building, True),
+    'politifact_scraper': (setup_politifact_scraper, run_politifact_scraper, False),
+    'snopes_crawl': (setup_snopes_crawl, run_snopes_crawl, False),
+}
+
+
+def run_stage(name, scale, queue):
+    import logging
+    logging.disable(logging.CRITICAL)
+    setup, run, _ = STAGES[name]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            state = setup(scale, tmp)
+            reset_peak_rss()
+            start = time.perf_counter()
+            rows = run(state)
+            wall = time.perf_counter() - start
+            queue.put({'rows': rows, 'wall_s': wall, 'peak_rss_mib': peak_rss() / 2 ** 20})
+    except Exception as e:
+        queue.put({'error': f'{type(e).__name__}: {e}'})
+
+
+def measure(name, scale):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_stage, args=(name, scale, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Return a description of every stage that regressed against the baseline."""
+    previous = {(entry['stage'], entry['scale']): entry for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in results:
+        base = previous.get((entry['stage'], entry['scale']))
+        if base is None or 'error' in entry or 'error' in base:
+            continue
+        if (entry['wall_s'] > base['wall_s'] * (1 + threshold)
+                and entry['wall_s'] - base['wall_s'] > MIN_WALL_DELTA):
+            regressions.append(f"{entry['stage']} x{entry['scale']}: wall time {base['wall_s']:.2f}s -> "
+                               f"{entry['wall_s']:.2f}s")
+        if (entry['peak_rss_mib'] > base['peak_rss_mib'] * (1 + threshold)
+                and entry['peak_rss_mib'] - base['peak_rss_mib'] > MIN_RSS_DELTA_MIB):
+            regressions.append(f"{entry['stage']} x{entry['scale']}: peak RSS {base['peak_rss_mib']:.0f} MiB -> "
+                               f"{entry['peak_rss_mib']:.0f} MiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed relative increase of wall time and peak RSS")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'stage':<24} {'scale':>5} {'rows':>9} {'wall (s)':>9} {'rows/s':>10} {'peak RSS (MiB)':>15}")
+    for name in args.stages:
+        scales = args.scales if STAGES[name][2] else [1]
+        for scale in scales:
+            entry = {'stage': name, 'scale': scale, **measure(name, scale)}
+            if 'error' in entry:
+                print(f"{name:<24} {scale:>5} failed: {entry['error']}")
+            else:
+                entry['rows_per_s'] = entry['rows'] / entry['wall_s'] if entry['wall_s'] else None
+                print(f"{name:<24} {scale:>5} {entry['rows']:>9} {entry['wall_s']:>9.2f} "
+                      f"{entry['rows_per_s']:>10.0f} {entry['peak_rss_mib']:>15.0f}")
+            results.append(entry)
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    os.makedirs(RESULTS, exist_ok=True)
+    with open(HISTORY_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.update_baseline or not baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+    elif regressions:
+        print(f"\nRegressions against the baseline from {baseline.get('timestamp')} ({baseline.get('commit')}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    else:
+        print(f"\nNo regression beyond {args.threshold:.0%} against the baseline from {baseline.get('timestamp')}")
+
+    if any('error' in entry for entry in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
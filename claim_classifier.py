@@ -0,0 +1,337 @@
+import argparse
+import json
+import os
+import resource
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from preprocessing_cache import PreprocessingCache
+from schema import COUNT_COLUMNS, LIAR_COLUMNS, LIAR_DTYPES
+from storage import iter_corpus
+
+DEFAULT_MODEL_PATH = os.path.join('data', 'claim_classifier.npz')
+MODEL_FORMAT_VERSION = 1
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_CHUNK_SIZE = 20000
+# Labels with fewer training rows are left out; most Snopes ratings only have a handful
+DEFAULT_MIN_LABEL_COUNT = 50
+# log1p(count) / CREDIT_SCALE keeps the credit features close to the scale of the
+# l2-normalized text features
+CREDIT_SCALE = 10.0
+
+
+def normalize_labels(labels):
+    # Snopes capitalizes the ratings that LIAR and PolitiFact write in lowercase
+    return labels.astype(object).str.strip().str.lower()
+
+
+def hashing_vectorizer(n_features=DEFAULT_N_FEATURES, ngram_max=2):
+    # Stateless: the same parameters give the same features in every process
+    return HashingVectorizer(n_features=n_features, ngram_range=(1, ngram_max), token_pattern=r'\S+',
+                             alternate_sign=False, norm='l2', dtype=np.float32)
+
+
+def vectorize(statements, n_features=DEFAULT_N_FEATURES, ngram_max=2):
+    return hashing_vectorizer(n_features, ngram_max).transform(statements)
+
+
+def load_credit_history(base_path='data'):
+    """
+    Load the speaker credit-history counts of the LIAR statements.
+
+    The statements are preprocessed (through the preprocessing cache) the way
+    data_building.py does it, so they match the corpus rows they came from.
+    Note that LIAR's counts include the verdict of the statement itself, which
+    makes them a somewhat optimistic feature.
+
+    Returns:
+        pd.DataFrame: The COUNT_COLUMNS as float32, indexed by preprocessed statement.
+    """
+    frames = [pd.read_csv(os.path.join(base_path, name), names=LIAR_COLUMNS, sep='\t', header=None,
+                          dtype=LIAR_DTYPES, usecols=['statement', *COUNT_COLUMNS])
+              for name in ('train.tsv', 'test.tsv', 'valid.tsv')]
+    liar = pd.concat(frames, ignore_index=True)
+    with PreprocessingCache(os.path.join(base_path, 'preprocessing_cache.sqlite')) as cache:
+        statements = cache.preprocess(liar['statement'])
+    counts = liar[COUNT_COLUMNS].astype(np.float32).set_axis(statements.to_numpy(), axis=0)
+    return counts[counts.index.notna() & ~counts.index.duplicated()]
+
+
+def credit_features(statements, history):
+    """Return the scaled credit-history features of each statement (zeros when unknown)."""
+    counts = history.reindex(statements.to_numpy()).to_numpy()
+    known = ~np.isnan(counts).all(axis=1)
+    features = np.log1p(np.nan_to_num(counts, nan=0.0)) / CREDIT_SCALE
+    return np.column_stack([features, known]).astype(np.float32)
+
+
+def iter_features(chunks, n_features=DEFAULT_N_FEATURES, ngram_max=2, n_jobs=1, history=None):
+    """
+    Turn corpus chunks into feature matrices.
+
+    With several jobs the hashing runs in worker processes while the caller
+    consumes earlier chunks; at most 2 * n_jobs chunks are in flight, so the
+    corpus is never read far ahead.
+
+    Args:
+        chunks (iterable[pd.DataFrame]): Chunks with a 'statement' column.
+        n_features (int): Width of the hashed text features.
+        ngram_max (int): Longest word n-gram hashed.
+        n_jobs (int): Number of worker processes.
+        history (pd.DataFrame, optional): Credit-history counts appended as features.
+
+    Yields:
+        tuple[pd.DataFrame, scipy.sparse.csr_matrix]: Each chunk with its features.
+    """
+    def with_credit(chunk, features):
+        if history is None:
+            return chunk, features
+        return chunk, sp.hstack([features, credit_features(chunk['statement'], history)], format='csr')
+
+    if n_jobs <= 1:
+        for chunk in chunks:
+            yield with_credit(chunk, vectorize(chunk['statement'].fillna('').tolist(), n_features, ngram_max))
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(vectorize, chunk['statement'].fillna('').tolist(), n_features,
+                                                   ngram_max)))
+            if len(pending) >= 2 * n_jobs:
+                chunk, future = pending.popleft()
+                yield with_credit(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield with_credit(chunk, future.result())
+
+
+class ClaimClassifier:
+    """
+    Linear claim classifier over hashed word n-grams, stored compactly for CPU inference.
+
+    The hashing vectorizer has no fitted state, so a saved model is just the
+    weight matrix (float16, compressed: n-grams never seen in training have zero
+    weights), the intercepts, the class names and the vectorizer parameters.
+    Prediction is one sparse-dense product per batch.
+
+    Args:
+        coef (np.ndarray): Weights, one row per class.
+        intercept (np.ndarray): Intercept of each class.
+        classes (np.ndarray): Class names.
+        n_features (int): Width of the hashed text features.
+        ngram_max (int): Longest word n-gram hashed.
+        credit_history (bool): The model expects the credit-history features.
+    """
+
+    def __init__(self, coef, intercept, classes, n_features=DEFAULT_N_FEATURES, ngram_max=2, credit_history=False):
+        coef = np.asarray(coef, dtype=np.float32)
+        intercept = np.asarray(intercept, dtype=np.float32)
+        if len(classes) == 2 and len(coef) == 1:
+            # Binary models have a single score: the second class wins when it is positive
+            coef, intercept = np.vstack([-coef, coef]), np.concatenate([-intercept, intercept])
+        self.coef = coef
+        self.intercept = intercept
+        self.classes = np.asarray(classes, dtype=object)
+        self.n_features = n_features
+        self.ngram_max = ngram_max
+        self.credit_history = credit_history
+
+    def features(self, statements, history=None):
+        """Build the features of raw (preprocessed) statements, as in training."""
+        features = vectorize(statements.fillna('').tolist(), self.n_features, self.ngram_max)
+        if self.credit_history:
+            if history is None:
+                raise ValueError("This model needs the credit-history counts; pass load_credit_history()")
+            features = sp.hstack([features, credit_features(statements, history)], format='csr')
+        return features
+
+    def decision_function(self, features):
+        return features @ self.coef.T + self.intercept
+
+    def predict_codes(self, features):
+        return np.argmax(self.decision_function(features), axis=1)
+
+    def predict(self, statements, history=None):
+        """
+        Predict the label of preprocessed statements.
+
+        Args:
+            statements (pd.Series): Statements preprocessed like the knowledge base.
+            history (pd.DataFrame, optional): Credit-history counts, for models trained with them.
+
+        Returns:
+            np.ndarray: The predicted labels.
+        """
+        return self.classes[self.predict_codes(self.features(statements, history))]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        meta = {'version': MODEL_FORMAT_VERSION, 'n_features': self.n_features, 'ngram_max': self.ngram_max,
+                'credit_history': self.credit_history}
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, coef=self.coef.astype(np.float16), intercept=self.intercept,
+                                classes=self.classes.astype(str), meta=json.dumps(meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            meta = json.loads(str(saved['meta']))
+            if meta['version'] != MODEL_FORMAT_VERSION:
+                raise ValueError(f"Unsupported model version {meta['version']} in {path}")
+            return cls(saved['coef'], saved['intercept'], saved['classes'], meta['n_features'], meta['ngram_max'],
+                       meta['credit_history'])
+
+
+def label_counts(base_path='data', name='knowledge_base', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Count the normalized labels of a corpus, reading only its label column."""
+    counts = Counter()
+    for chunk in iter_corpus(base_path, name, ['label'], chunk_size):
+        counts.update(normalize_labels(chunk['label'].dropna()))
+    return counts
+
+
+def train(base_path='data', n_features=DEFAULT_N_FEATURES, ngram_max=2, epochs=3, chunk_size=DEFAULT_CHUNK_SIZE,
+          n_jobs=1, credit_history=False, min_label_count=DEFAULT_MIN_LABEL_COUNT, alpha=1e-4, random_state=42):
+    """
+    Train the classifier on the knowledge base without loading it into memory.
+
+    A first pass reads only the labels, to fix the classes and weight them
+    inversely to their frequency (``partial_fit`` has no ``class_weight='balanced'``).
+    Every epoch then streams the corpus chunk by chunk into ``SGDClassifier.partial_fit``;
+    the hashing is spread over ``n_jobs`` processes and the one-vs-rest fits over
+    as many threads.
+
+    SGD drifts towards whatever the last chunks contain, so each epoch reads the
+    Parquet row groups in a new order seeded from ``random_state``. A CSV corpus
+    is read in file order and must be pre-shuffled: the in-memory build's
+    knowledge base is (its split shuffles rows), the streaming build's is grouped
+    by source file.
+
+    Args:
+        base_path (str): Directory of knowledge_base.parquet/.csv.
+        n_features (int): Width of the hashed text features.
+        ngram_max (int): Longest word n-gram hashed.
+        epochs (int): Passes over the corpus.
+        chunk_size (int): Rows per chunk.
+        n_jobs (int): Number of worker processes (and fitting threads).
+        credit_history (bool): Add the LIAR speaker credit-history counts as features.
+        min_label_count (int): Labels with fewer rows are left out.
+        alpha (float): L2 regularization strength.
+        random_state (int): Seed of the SGD and row-group shuffling.
+
+    Returns:
+        tuple[ClaimClassifier, dict]: The model, and the 'rows' fitted (over all
+            epochs), 'seconds' and 'skipped' rows of the run.
+    """
+    counts = label_counts(base_path, chunk_size=chunk_size)
+    classes = np.array(sorted(label for label, count in counts.items() if count >= min_label_count), dtype=object)
+    if not len(classes):
+        raise ValueError(f"No label has at least {min_label_count} rows")
+    kept = sum(counts[label] for label in classes)
+    class_weights = pd.Series({label: kept / (len(classes) * counts[label]) for label in classes})
+    history = load_credit_history(base_path) if credit_history else None
+
+    model = SGDClassifier(alpha=alpha, random_state=random_state, n_jobs=n_jobs)
+    rows = skipped = 0
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        chunks = iter_corpus(base_path, 'knowledge_base', ['label', 'statement'], chunk_size,
+                             seed=random_state + epoch)
+        for chunk, features in iter_features(chunks, n_features, ngram_max, n_jobs, history):
+            labels = normalize_labels(chunk['label'])
+            keep = labels.isin(classes).to_numpy()
+            skipped += int((~keep).sum())
+            if keep.any():
+                labels = labels[keep]
+                model.partial_fit(features[keep], labels.to_numpy(), classes=classes,
+                                  sample_weight=class_weights[labels].to_numpy())
+                rows += int(keep.sum())
+    stats = {'rows': rows, 'seconds': time.perf_counter() - start, 'skipped': skipped // max(epochs, 1)}
+    return ClaimClassifier(model.coef_, model.intercept_, classes, n_features, ngram_max, credit_history), stats
+
+
+def macro_f1(confusion):
+    """Macro-averaged F1 of a confusion matrix (rows: true, columns: predicted), over the labels that occur."""
+    true_positives = np.diag(confusion).astype(np.float64)
+    actual, predicted = confusion.sum(axis=1), confusion.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f1 = np.nan_to_num(2 * true_positives / (actual + predicted))
+    present = (actual + predicted) > 0
+    return float(f1[present].mean()) if present.any() else 0.0
+
+
+def evaluate(model, base_path='data', name='evaluation_set', chunk_size=DEFAULT_CHUNK_SIZE, history=None):
+    """
+    Evaluate a model on a corpus streamed chunk by chunk.
+
+    Rows whose label the model does not know are left out and counted.
+
+    Returns:
+        dict: 'macro_f1', 'accuracy', 'rows', 'skipped', 'seconds' and the 'confusion' matrix.
+    """
+    classes = pd.Index(model.classes)
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    skipped = 0
+    start = time.perf_counter()
+    for chunk in iter_corpus(base_path, name, ['label', 'statement'], chunk_size):
+        codes = classes.get_indexer(normalize_labels(chunk['label']))
+        keep = codes >= 0
+        skipped += int((~keep).sum())
+        if keep.any():
+            predicted = model.predict_codes(model.features(chunk['statement'][keep], history))
+            confusion += np.bincount(codes[keep] * len(classes) + predicted,
+                                     minlength=len(classes) ** 2).reshape(confusion.shape)
+    rows = int(confusion.sum())
+    return {'macro_f1': macro_f1(confusion), 'accuracy': np.trace(confusion) / rows if rows else 0.0, 'rows': rows,
+            'skipped': skipped, 'seconds': time.perf_counter() - start, 'confusion': confusion}
+
+
+def peak_rss_mib():
+    """Peak resident memory of this process and of its largest finished worker, in MiB."""
+    to_mib = 1 / 1024  # ru_maxrss is in KiB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * to_mib,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * to_mib)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the baseline claim classifier out of core and evaluate it.")
+    parser.add_argument('--base-path', default='data', help="Directory of the knowledge base and evaluation set")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Output model file")
+    parser.add_argument('--n-features', type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument('--ngram-max', type=int, default=2)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--alpha', type=float, default=1e-4)
+    parser.add_argument('--min-label-count', type=int, default=DEFAULT_MIN_LABEL_COUNT)
+    parser.add_argument('--credit-history', action='store_true',
+                        help="Add the LIAR speaker credit-history counts as features")
+    args = parser.parse_args()
+
+    model, stats = train(args.base_path, args.n_features, args.ngram_max, args.epochs, args.chunk_size, args.n_jobs,
+                         args.credit_history, args.min_label_count, args.alpha)
+    model.save(args.model)
+    print(f"Trained on {stats['rows']} rows ({args.epochs} epochs, {len(model.classes)} labels, "
+          f"{stats['skipped']} rows with rare labels left out) in {stats['seconds']:.2f}s: "
+          f"{stats['rows'] / stats['seconds']:,.0f} rows/s")
+    print(f"Model: {os.path.getsize(args.model) / 2 ** 20:.1f} MiB in {args.model}")
+
+    model = ClaimClassifier.load(args.model)
+    history = load_credit_history(args.base_path) if model.credit_history else None
+    results = evaluate(model, args.base_path, chunk_size=args.chunk_size, history=history)
+    print(f"Evaluation set: macro-F1 {results['macro_f1']:.4f}, accuracy {results['accuracy']:.4f} on "
+          f"{results['rows']} rows ({results['skipped']} with unknown labels), "
+          f"{results['rows'] / results['seconds']:,.0f} rows/s")
+    main_mib, worker_mib = peak_rss_mib()
+    print(f"Peak RSS: {main_mib:.0f} MiB, largest worker {worker_mib:.0f} MiB")
+    print(pd.DataFrame(results['confusion'], index=model.classes, columns=model.classes).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+from data_preprocessing import preprocess_dataset
+
+INDEX_FORMAT_VERSION = 1
+DEFAULT_INDEX_PATH = os.path.join('data', 'claim_index')
+
+
+class BM25Index:
+    """
+    Inverted BM25 index over the preprocessed statements of the knowledge base.
+
+    Postings are stored in flat arrays (CSR layout): for term ``t`` the documents
+    are ``doc_ids[offsets[t]:offsets[t + 1]]``, sorted, and the matching
+    ``impacts`` hold the precomputed BM25 term score of each posting. Queries are
+    scored with MaxScore pruning: once no unseen document can reach the current
+    top-k, the remaining terms only update existing candidates.
+    """
+
+    def __init__(self, vocabulary, offsets, doc_ids, impacts, doc_keys, k1=1.5, b=0.75, keys_digest=None):
+        # Plain ndarray views of memory-mapped arrays avoid np.memmap's per-slice overhead
+        self.vocabulary = vocabulary
+        self.offsets = np.asarray(offsets)
+        self.doc_ids = np.asarray(doc_ids)
+        self.impacts = np.asarray(impacts)
+        self.doc_keys = np.asarray(doc_keys)
+        self.k1 = k1
+        self.b = b
+        self._keys_digest = keys_digest
+        # Upper bound of each term's contribution, used for pruning
+        self.max_impacts = (np.maximum.reduceat(self.impacts, self.offsets[:-1]) if len(self.impacts)
+                            else np.zeros(0, np.float32))
+
+    @classmethod
+    def build(cls, statements, doc_keys, k1=1.5, b=0.75):
+        """
+        Build the index from already preprocessed statements.
+
+        Args:
+            statements (pd.Series): Preprocessed statements (space-separated tokens).
+            doc_keys (pd.Series): Identifier of each statement, e.g. the 'uuid' column.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 length normalization.
+
+        Returns:
+            BM25Index: The built index.
+        """
+        vocabulary = {}
+        term_ids, doc_positions = [], []
+        doc_lengths = np.zeros(len(statements), dtype=np.int32)
+        for position, statement in enumerate(statements.fillna('')):
+            tokens = statement.split()
+            doc_lengths[position] = len(tokens)
+            for token in tokens:
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_positions.append(position)
+
+        # Sort (term, doc) pairs and collapse repeats into term frequencies
+        pairs = np.array(term_ids, dtype=np.int64) * len(statements) + np.array(doc_positions, dtype=np.int64)
+        pairs, tfs = np.unique(pairs, return_counts=True)
+        posting_terms = pairs // len(statements) if len(statements) else pairs
+        doc_ids = (pairs % len(statements)).astype(np.int32) if len(statements) else pairs.astype(np.int32)
+
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(posting_terms, minlength=len(vocabulary)))
+
+        num_docs = len(statements)
+        doc_freqs = np.diff(offsets)
+        idf = np.log(1 + (num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        avg_length = doc_lengths.mean() if num_docs and doc_lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * doc_lengths[doc_ids] / avg_length)
+        impacts = (np.repeat(idf, doc_freqs) * tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+
+        return cls(vocabulary, offsets, doc_ids, impacts, encode_keys(doc_keys), k1, b)
+
+    def __len__(self):
+        return len(self.doc_keys)
+
+    @property
+    def keys_digest(self):
+        """Digest of the document keys in index order, saved in meta.json."""
+        if self._keys_digest is None:
+            self._keys_digest = keys_digest(self.doc_keys)
+        return self._keys_digest
+
+    def is_built_from(self, doc_keys):
+        """
+        Check that the index was built from these documents, in this order.
+
+        Positions returned by ``search`` are only valid for the corpus the index was
+        built from; a rebuilt knowledge base with the same size but other rows or
+        another order must not reuse it.
+
+        Args:
+            doc_keys (pd.Series): Identifier of each statement, e.g. the 'uuid' column.
+        """
+        keys = encode_keys(doc_keys)
+        return len(keys) == len(self) and keys_digest(keys) == self.keys_digest
+
+    def query_terms(self, claim):
+        """Preprocess a raw claim and return ``(term_id, query_tf)`` pairs for known terms."""
+        counts = Counter(preprocess_dataset(claim).split())
+        return [(self.vocabulary[token], tf) for token, tf in counts.items() if token in self.vocabulary]
+
+    def search(self, claim, k=10, within=None):
+        """
+        Return the top-k documents for a raw claim.
+
+        Args:
+            claim (str): The claim, preprocessed with the same logic as the statements.
+            k (int): Number of results.
+            within (np.ndarray, optional): Boolean mask of the documents that may be
+                returned, e.g. a ``FacetIndex`` selection as ``to_mask(len(index))``.
+
+        Returns:
+            list[tuple[int, float]]: ``(doc_position, score)`` pairs, best first.
+        """
+        return self.search_terms(self.query_terms(claim), k, within)
+
+    def search_terms(self, terms, k=10, within=None):
+        if not terms or k <= 0:
+            return []
+
+        # Highest upper bound first, so the threshold rises as early as possible
+        terms = sorted(terms, key=lambda term: self.max_impacts[term[0]] * term[1], reverse=True)
+        bounds = np.array([self.max_impacts[term] * tf for term, tf in terms], dtype=np.float64)
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+
+        candidates = np.zeros(0, dtype=np.int32)
+        scores = np.zeros(0, dtype=np.float64)
+        threshold = 0.0
+        for i, (term, tf) in enumerate(terms):
+            start, end = self.offsets[term], self.offsets[term + 1]
+            docs = self.doc_ids[start:end]
+            contributions = self.impacts[start:end].astype(np.float64) * tf
+            if within is not None:
+                # The upper bounds stay valid for a subset of the postings
+                allowed = within[docs]
+                docs, contributions = docs[allowed], contributions[allowed]
+                if not len(docs):
+                    continue
+
+            if not len(candidates):
+                candidates, scores = docs, contributions
+            elif len(candidates) < k or remaining[i] >= threshold:
+                # Unseen documents can still reach the top-k: merge the whole posting list
+                merged = np.concatenate([candidates, docs])
+                candidates, inverse = np.unique(merged, return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate([scores, contributions]),
+                                     minlength=len(candidates))
+            else:
+                # Only the current candidates can still make it: look them up in the postings
+                positions = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                found = docs[positions] == candidates
+                scores[found] += contributions[positions[found]]
+
+            if len(scores) >= k:
+                threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                keep = scores + remaining[i + 1] >= threshold
+                candidates, scores = candidates[keep], scores[keep]
+
+        top = np.argsort(-scores, kind='stable')[:k]
+        return [(int(candidates[j]), float(scores[j])) for j in top]
+
+    def save(self, path):
+        """Persist the index as a directory of ``.npy`` arrays plus JSON metadata."""
+        os.makedirs(path, exist_ok=True)
+        for name in ('offsets', 'doc_ids', 'impacts', 'doc_keys'):
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_FORMAT_VERSION, 'k1': self.k1, 'b': self.b, 'num_docs': len(self),
+                       'keys_digest': self.keys_digest, 'vocabulary': self.vocabulary}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a saved index; the arrays are memory-mapped unless ``mmap`` is False."""
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index version {meta['version']} in {path}")
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in ('offsets', 'doc_ids', 'impacts', 'doc_keys')}
+        return cls(meta['vocabulary'], k1=meta['k1'], b=meta['b'], keys_digest=meta.get('keys_digest'), **arrays)
+
+
+def encode_keys(doc_keys):
+    return np.array(pd.Series(doc_keys).astype(str).tolist(), dtype=np.bytes_)
+
+
+def keys_digest(keys):
+    # Fixed-width byte strings: equal digests mean the same keys in the same order
+    keys = np.ascontiguousarray(keys)
+    return hashlib.blake2b(keys.tobytes() + str(keys.dtype).encode(), digest_size=16).hexdigest()
+
+
+def load_or_build(knowledge_base, path=DEFAULT_INDEX_PATH, rebuild=False):
+    """
+    Load the saved index, or build and save it when it is missing, forced or stale.
+
+    Args:
+        knowledge_base (pd.DataFrame): 'statement' and 'uuid' columns.
+        path (str): Index directory.
+        rebuild (bool): Rebuild even if a matching index is saved.
+
+    Returns:
+        tuple[BM25Index, bool]: The index and whether it was (re)built.
+    """
+    if not rebuild and os.path.exists(os.path.join(path, 'meta.json')):
+        index = BM25Index.load(path)
+        if index.is_built_from(knowledge_base['uuid']):
+            return index, False
+        logging.warning(f"Index at {path} was built from another knowledge base, rebuilding it")
+    index = BM25Index.build(knowledge_base['statement'], knowledge_base['uuid'])
+    index.save(path)
+    return index, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the BM25 claim index.")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="Index directory")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index from knowledge_base.csv")
+    parser.add_argument('-k', type=int, default=5, help="Number of results")
+    parser.add_argument('claim', nargs='?', help="Claim to look up")
+    args = parser.parse_args()
+
+    knowledge_base = pd.read_csv(os.path.join('data', 'knowledge_base.csv'))
+    start = time.perf_counter()
+    index, built = load_or_build(knowledge_base, args.index, args.rebuild)
+    if built:
+        print(f"Built index over {len(index)} statements in {time.perf_counter() - start:.2f}s")
+
+    if args.claim:
+        # Results are looked up by key, not position, so they can never point at another row
+        rows = knowledge_base.set_index(knowledge_base['uuid'].astype(str))
+        for position, score in index.search(args.claim, args.k):
+            row = rows.loc[index.doc_keys[position].decode()]
+            print(f"{score:6.2f}  [{row['label']}] ({row['source']}) {row['statement']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,58 @@
+import argparse
+import hashlib
 import os
+import time
+from collections import Counter
+import numpy as np
 import pandas as pd
-import uuid
 from sklearn.model_selection import train_test_split
-from data_preprocessing import preprocess_dataset  # Import from your data_preprocessing.py
+from data_preprocessing import preprocess_series  # Import from your data_preprocessing.py
+from preprocessing_cache import PreprocessingCache
+from storage import CorpusWriter, load_corpus, save_corpus
+from dedup import duplicate_rate, near_duplicate_clusters
+from schema import (CORPUS_DTYPES, LIAR_COLUMNS, LIAR_DTYPES, POLITIFACT_DTYPES, SNOPES_DTYPES, apply_schema,
+                    concat_frames, content_keys, content_uuids, memory_report, uuids_to_str)
 
+# Rows read per chunk in streaming mode
+DEFAULT_CHUNK_SIZE = 50_000
+# Seed of the hash-based split, the counterpart of train_test_split's random_state
+SPLIT_SEED = 42
 
-def load_datasets():
-    # Define columns and base path
-    columns = ['id', 'label', 'statement', 'subject', 'speaker', 'job_title', 'state', 'party',
-               'barely_true_counts', 'false_counts', 'half_true_counts', 'mostly_true_counts', 'pants_on_fire_counts',
-               'context']
 
+def load_datasets():
     base_path = 'data'
 
-    # Load the datasets, assuming no headers in the TSV files
-    train_df = pd.read_csv(os.path.join(base_path, 'train.tsv'), names=columns, sep='\t', header=None)
-    test_df = pd.read_csv(os.path.join(base_path, 'test.tsv'), names=columns, sep='\t', header=None)
-    val_df = pd.read_csv(os.path.join(base_path, 'valid.tsv'), names=columns, sep='\t', header=None)
-    politifact_df = pd.read_csv(os.path.join(base_path, 'politifact_factchecks_20240919.csv'))
-    snopes_df = pd.read_csv(os.path.join(base_path, 'snopes_factchecks_data.csv'))
+    # Load the datasets, assuming no headers in the TSV files; columns are typed
+    # as they are read (see schema.py)
+    train_df = pd.read_csv(os.path.join(base_path, 'train.tsv'), names=LIAR_COLUMNS, sep='\t', header=None,
+                           dtype=LIAR_DTYPES)
+    test_df = pd.read_csv(os.path.join(base_path, 'test.tsv'), names=LIAR_COLUMNS, sep='\t', header=None,
+                          dtype=LIAR_DTYPES)
+    val_df = pd.read_csv(os.path.join(base_path, 'valid.tsv'), names=LIAR_COLUMNS, sep='\t', header=None,
+                         dtype=LIAR_DTYPES)
+    politifact_df = pd.read_csv(os.path.join(base_path, 'politifact_factchecks_20240919.csv'),
+                                dtype=POLITIFACT_DTYPES)
+    snopes_df = pd.read_csv(os.path.join(base_path, 'snopes_factchecks_data.csv'), dtype=SNOPES_DTYPES)
     return train_df, test_df, val_df, politifact_df, snopes_df
 
 
-def preprocess_datasets(df):
+def preprocess_datasets(df, n_jobs=1, cache=None):
     """
-    Apply preprocessing to each statement in the dataframe.
+    Apply preprocessing to all statements in the dataframe in one batch.
 
     Args:
         df (pd.DataFrame): The dataframe with a 'statement' column to preprocess.
+        n_jobs (int): Number of worker processes for large dataframes.
+        cache (PreprocessingCache, optional): Cache of already preprocessed
+            statements; only statements missing from it are processed.
 
     Returns:
         pd.DataFrame: The dataframe with cleaned 'statement' data.
     """
-    df['statement'] = df['statement'].apply(preprocess_dataset)
+    if cache is not None:
+        df['statement'] = cache.preprocess(df['statement'], n_jobs=n_jobs)
+    else:
+        df['statement'] = preprocess_series(df['statement'], n_jobs=n_jobs)
     return df
 
 
@@ -52,24 +72,201 @@ def preprocess_snopes(df):
 
 
 def combine_datasets(dfs):
-    return pd.concat(dfs, ignore_index=True)
+    # Cast each part first so the combined frame is never materialized as objects
+    return concat_frames([apply_schema(df, CORPUS_DTYPES) for df in dfs])
 
 
 def create_unique_ids(df):
-    df['uuid'] = [str(uuid.uuid4()) for _ in range(len(df))]
+    # 16-byte binary UUIDs derived from source, statement and label, so a rebuild
+    # gives unchanged rows the same ID; formatted as strings only when written to CSV
+    df['uuid'] = content_uuids(df)
     return df
 
 
-def split_for_evaluation(df, eval_size=0.1):
-    knowledge_base, eval_set = train_test_split(df, test_size=eval_size, random_state=42, stratify=df['source'])
-    return knowledge_base, eval_set
+def uuid_mapping(base_path, df):
+    """
+    Map the UUIDs of the previous build to the UUIDs of ``df``.
+
+    The previous knowledge base and evaluation set are read back and matched to
+    ``df`` by content key, so IDs from builds that used random UUIDs can be
+    translated. The new UUIDs are those of ``df``, whose duplicates are numbered
+    in build order, before the split; previous copies of a duplicated row are
+    matched to them in the order of their old UUIDs, so the mapping does not
+    depend on how either build was split. Rows that are no longer in ``df`` map
+    to a missing UUID.
+
+    Args:
+        base_path (str): Directory containing the previous build.
+        df (pd.DataFrame): The new corpus, with content UUIDs, in build order.
+
+    Returns:
+        pd.DataFrame: 'old_uuid' and 'uuid' string columns, or None without a previous build.
+    """
+    columns = ['label', 'statement', 'source', 'uuid']
+    try:
+        previous = concat_frames([load_corpus(base_path, name, columns)
+                                  for name in ('knowledge_base', 'evaluation_set')])
+    except (OSError, ValueError):
+        return None
+
+    old_ids = uuids_to_str(previous['uuid']).astype(str)
+    previous = previous.iloc[np.argsort(old_ids.to_numpy(), kind='stable')]
+    new_ids = pd.Series(uuids_to_str(df['uuid']).to_numpy(), index=content_keys(df).to_numpy())
+    return pd.DataFrame({'old_uuid': uuids_to_str(previous['uuid']).astype(str).to_numpy(),
+                         'uuid': content_keys(previous).map(new_ids).to_numpy()})
+
+
+def split_for_evaluation(df, eval_size=0.1, groups=None):
+    if groups is None:
+        knowledge_base, eval_set = train_test_split(df, test_size=eval_size, random_state=42, stratify=df['source'])
+        return knowledge_base, eval_set
+
+    # Split whole groups (clusters of near-duplicate statements), stratified by the
+    # source of their first row, so every group stays on one side of the split
+    first_rows = pd.Series(np.arange(len(df))).groupby(np.asarray(groups)).first()
+    _, eval_groups = train_test_split(first_rows.index.to_numpy(), test_size=eval_size, random_state=42,
+                                      stratify=df['source'].to_numpy()[first_rows.to_numpy()])
+    is_eval = np.isin(groups, eval_groups)
+    return df[~is_eval], df[is_eval]
+
+
+def source_files(base_path='data'):
+    """
+    List the input files of the corpus with how to read and normalize each one.
+
+    Returns:
+        list[tuple]: ``(path, read_csv kwargs, id column or None, normalize function)``.
+    """
+    liar_kwargs = {'names': LIAR_COLUMNS, 'sep': '\t', 'header': None, 'dtype': LIAR_DTYPES}
+    return [
+        (os.path.join(base_path, 'train.tsv'), liar_kwargs, 'id', preprocess_liar),
+        (os.path.join(base_path, 'test.tsv'), liar_kwargs, 'id', preprocess_liar),
+        (os.path.join(base_path, 'valid.tsv'), liar_kwargs, 'id', preprocess_liar),
+        (os.path.join(base_path, 'politifact_factchecks_20240919.csv'), {'dtype': POLITIFACT_DTYPES}, None,
+         preprocess_politifact),
+        (os.path.join(base_path, 'snopes_factchecks_data.csv'), {'dtype': SNOPES_DTYPES}, None, preprocess_snopes),
+    ]
+
+
+def row_digest(key, purpose, seed=SPLIT_SEED):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16, key=str(seed).encode(),
+                           person=purpose).digest()
+
+
+def hash_split(keys, sources, eval_size=0.1, seed=SPLIT_SEED):
+    """
+    Assign rows to the evaluation set from a hash of their key, stratified by source.
+
+    Each row lands in the evaluation set when the hash of ``(source, key)`` falls
+    in the lowest ``eval_size`` of the hash range, so every source contributes
+    about ``eval_size`` of its rows. The assignment depends only on the row and
+    the seed, never on the other rows, so no global shuffle is needed.
+
+    Args:
+        keys (iterable[str]): Stable identifier of each row.
+        sources (iterable[str]): Stratum of each row.
+        eval_size (float): Fraction of rows to put in the evaluation set.
+        seed (int): Seed of the hash.
+
+    Returns:
+        np.ndarray: Boolean mask, True for evaluation rows.
+    """
+    threshold = int(eval_size * 2 ** 64)
+    return np.array([int.from_bytes(row_digest(f'{source}\x00{key}', b'split', seed)[:8], 'little') < threshold
+                     for key, source in zip(keys, sources)], dtype=bool)
+
+
+def iter_corpus_chunks(base_path='data', chunk_size=DEFAULT_CHUNK_SIZE, cache=None, n_jobs=1, seed=SPLIT_SEED,
+                       keep_raw=False):
+    """
+    Read, normalize and preprocess the sources chunk by chunk.
+
+    Rows are keyed by file name and LIAR id (row number for the other sources);
+    the key seeds the split assignment. UUIDs are the same content UUIDs as in
+    ``create_unique_ids``, with duplicates numbered across chunks, so both builds
+    give every row the same ID.
+
+    Yields:
+        tuple[pd.DataFrame, list[str]]: A corpus chunk (label, statement, source,
+            uuid, and raw_statement with ``keep_raw``) and the key of each of its rows.
+    """
+    seen = {}
+    for path, read_kwargs, id_column, normalize in source_files(base_path):
+        file_name = os.path.basename(path)
+        offset = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_size, **read_kwargs):
+            ids = chunk[id_column].astype(str) if id_column else range(offset, offset + len(chunk))
+            keys = [f'{file_name}:{row_id}' for row_id in ids]
+            offset += len(chunk)
+
+            chunk = normalize(chunk).copy()
+            raw = chunk['statement']
+            chunk = apply_schema(preprocess_datasets(chunk, n_jobs=n_jobs, cache=cache), CORPUS_DTYPES)
+            chunk['uuid'] = content_uuids(chunk, seen=seen)
+            if keep_raw:
+                chunk['raw_statement'] = raw
+            yield chunk, keys
+
+
+def raw_statements(base_path='data', chunk_size=DEFAULT_CHUNK_SIZE, cache=None, n_jobs=1):
+    """
+    Recover the statements of the built corpus as they were before preprocessing.
+
+    The knowledge base and evaluation set only keep preprocessed statements, so
+    the sources are read again and keyed by the same content UUIDs.
+
+    Returns:
+        pd.Series: Raw statements indexed by UUID string.
+    """
+    parts = [pd.Series(chunk['raw_statement'].to_numpy(), index=uuids_to_str(chunk['uuid']).to_numpy())
+             for chunk, _ in iter_corpus_chunks(base_path, chunk_size, cache, n_jobs, keep_raw=True)]
+    return pd.concat(parts) if parts else pd.Series(dtype=object)
+
 
+def build_streaming(base_path='data', chunk_size=DEFAULT_CHUNK_SIZE, eval_size=0.1, seed=SPLIT_SEED,
+                    cache=None, n_jobs=1, formats=('parquet', 'csv')):
+    """
+    Build the knowledge base and evaluation set without loading the corpus in memory.
+
+    Each source is read ``chunk_size`` rows at a time, preprocessed, split with
+    ``hash_split`` and appended to the output files, so peak memory depends on
+    the chunk size rather than on the corpus size. The result is deterministic
+    for a given seed.
+
+    Near-duplicate statements are not clustered, since that needs the whole
+    corpus: rewordings of one claim may land on both sides of the split.
+
+    Returns:
+        dict[str, Counter]: Rows written per source, for 'knowledge_base' and 'evaluation_set'.
+    """
+    counts = {'knowledge_base': Counter(), 'evaluation_set': Counter()}
+    with CorpusWriter(base_path, 'knowledge_base', formats) as kb_writer, \
+            CorpusWriter(base_path, 'evaluation_set', formats) as eval_writer:
+        for chunk, keys in iter_corpus_chunks(base_path, chunk_size, cache, n_jobs, seed):
+            is_eval = hash_split(keys, chunk['source'], eval_size, seed)
+            kb_writer.write(chunk[~is_eval])
+            eval_writer.write(chunk[is_eval])
+            counts['knowledge_base'].update(chunk['source'][~is_eval])
+            counts['evaluation_set'].update(chunk['source'][is_eval])
+    return counts
+
+
+def save_datasets(knowledge_base, eval_set, base_path='data', formats=('parquet', 'csv')):
+    save_corpus(knowledge_base, base_path, 'knowledge_base', formats)
+    save_corpus(eval_set, base_path, 'evaluation_set', formats)
+
+def main_streaming(base_path='data', chunk_size=DEFAULT_CHUNK_SIZE):
+    with PreprocessingCache(os.path.join(base_path, 'preprocessing_cache.sqlite')) as cache:
+        counts = build_streaming(base_path, chunk_size, cache=cache)
+        print(cache.report())
+
+    print("Data processing complete. Files saved: knowledge_base.parquet/.csv, evaluation_set.parquet/.csv")
+    for name, label in (('knowledge_base', 'knowledge base'), ('evaluation_set', 'evaluation set')):
+        total = sum(counts[name].values())
+        print(f"\nSource distribution in {label} ({total} rows):")
+        for source, count in counts[name].most_common():
+            print(f"{source:<12} {count / total:.6f}")
 
-def save_datasets(knowledge_base, eval_set, base_path='data'):
-    knowledge_base_path = os.path.join(base_path, 'knowledge_base.csv')
-    eval_set_path = os.path.join(base_path, 'evaluation_set.csv')
-    knowledge_base.to_csv(knowledge_base_path, index=False)
-    eval_set.to_csv(eval_set_path, index=False)
 
 def main():
 
@@ -77,17 +274,19 @@ def main():
     # Load datasets
     train_df, test_df, val_df, politifact_df, snopes_df = load_datasets()
 
-    # Preprocess LIAR datasets
-    train_df = preprocess_datasets(train_df)
-    test_df = preprocess_datasets(test_df)
-    val_df = preprocess_datasets(val_df)
+    with PreprocessingCache(os.path.join(base_path, 'preprocessing_cache.sqlite')) as cache:
+        # Preprocess LIAR datasets
+        train_df = preprocess_datasets(train_df, cache=cache)
+        test_df = preprocess_datasets(test_df, cache=cache)
+        val_df = preprocess_datasets(val_df, cache=cache)
 
-    # Preprocess PolitiFact dataset
-    politifact_df = preprocess_datasets(preprocess_politifact(politifact_df))
+        # Preprocess PolitiFact dataset
+        politifact_df = preprocess_datasets(preprocess_politifact(politifact_df), cache=cache)
 
-    # Rename 'claim' to 'statement' first, then preprocess the Snopes dataset
-    snopes_df = preprocess_snopes(snopes_df)
-    snopes_df = preprocess_datasets(snopes_df)
+        # Rename 'claim' to 'statement' first, then preprocess the Snopes dataset
+        snopes_df = preprocess_snopes(snopes_df)
+        snopes_df = preprocess_datasets(snopes_df, cache=cache)
+        print(cache.report())
 
     # Combine all datasets
     liar_dfs = [preprocess_liar(df) for df in (train_df, test_df, val_df)]
@@ -98,16 +297,29 @@ def main():
     combined_df = create_unique_ids(combined_df)
     print(combined_df.isna().sum())
     print(combined_df.shape)
+    print(memory_report(combined_df))
+
+    # Find near-duplicate statements across sources, so they do not leak between the sets
+    start = time.perf_counter()
+    clusters = near_duplicate_clusters(combined_df['statement'])
+    print(f"Near-duplicate rate: {duplicate_rate(clusters):.2%} "
+          f"({len(clusters) - len(np.unique(clusters))} rows) in {time.perf_counter() - start:.2f}s")
 
     # Split for knowledge base and evaluation
-    knowledge_base, eval_set = split_for_evaluation(combined_df)
+    knowledge_base, eval_set = split_for_evaluation(combined_df, groups=clusters)
     print(knowledge_base.shape)
     print(eval_set.shape)
 
+    # Record how the IDs of the previous build translate before overwriting it
+    mapping = uuid_mapping(base_path, combined_df)
+    if mapping is not None:
+        mapping.to_csv(os.path.join(base_path, 'uuid_mapping.csv'), index=False)
+        print(f"UUID mapping: {mapping['uuid'].notna().sum()} of {len(mapping)} previous rows kept their content")
+
     # Save datasets
     save_datasets(knowledge_base, eval_set, base_path)
 
-    print("Data processing complete. Files saved: knowledge_base.csv, evaluation_set.csv")
+    print("Data processing complete. Files saved: knowledge_base.parquet/.csv, evaluation_set.parquet/.csv")
 
     # Print some statistics
     print(f"Knowledge base size: {len(knowledge_base)}")
@@ -119,7 +331,17 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build the knowledge base and evaluation set.")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Read the sources in chunks and write the outputs incrementally. Skips "
+                             "near-duplicate clustering, so rewordings of a claim can leak into both sets")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in streaming mode")
+    parser.add_argument('--base-path', default='data', help="Streaming mode input and output directory")
+    args = parser.parse_args()
+    if args.streaming:
+        main_streaming(args.base_path, args.chunk_size)
+    else:
+        main()
 
 
 
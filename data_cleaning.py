@@ -1,13 +1,10 @@
+import numpy as np
 import pandas as pd
 import re
 from typing import Dict
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from data_preprocessing import SPECIAL_CHARS_PATTERN, STOP_WORDS, preprocess_series
 
 
-# Load stopwords once to improve performance
-STOP_WORDS = set(stopwords.words('english'))
-
 def load_us_states() -> Dict[str, str]:
     """Load a dictionary of US states and territories with abbreviations."""
     return {
@@ -25,53 +22,82 @@ def load_us_states() -> Dict[str, str]:
         'MP': 'Northern Mariana Islands'
     }
 
+WASHINGTON_DC_PATTERN = re.compile(r'washington,?\s*d\.?c\.?')
+NON_STATE_QUALIFIER_PATTERN = re.compile(r'\s*-.*$')
+
+# Common misspellings and variations of raw state values
+STATE_MISSPELLINGS = {
+    'virgina': 'Virginia',
+    'virgiia': 'Virginia',
+    'tennesse': 'Tennessee',
+    'tex': 'Texas',
+    'pa - pennsylvania': 'Pennsylvania',
+    'rhode island': 'Rhode Island',
+    'washington, d.c.': 'Washington D.C.',
+    'district of columbia': 'Washington D.C.',
+    'washington dc': 'Washington D.C.',
+    'washington d.c.': 'Washington D.C.',
+    'atlanta': 'Georgia',
+    'virgina director, coalition to stop gun violence': 'Virginia',
+    'the united states': 'Unknown',
+    'china': 'Unknown',
+    'russia': 'Unknown',
+    'qatar': 'Unknown',
+    'united kingdom': 'Unknown'
+}
+
+MAJOR_PARTIES = [('republican', 'Republican'), ('democrat', 'Democrat'), ('independent', 'Independent')]
+# Minor parties kept under their own name
+MINOR_PARTIES = ['libertarian', 'green', 'tea party', 'constitution']
+
+
+def normalize_unique(values: pd.Series, normalize) -> pd.Series:
+    """
+    Apply a scalar normalization once per distinct value and map the results back.
+
+    Args:
+        values (pd.Series): Raw values, typically with few distinct entries.
+        normalize (callable): Function of a single raw value (NaN included).
+
+    Returns:
+        pd.Series: Categorical series of normalized values, aligned with ``values``.
+    """
+    codes, uniques = pd.factorize(values)
+    results = [normalize(value) for value in uniques]
+    missing = normalize(None)
+
+    # Several raw values can normalize to the same category
+    result_codes, categories = pd.factorize(pd.Series(results + [missing], dtype=object))
+    codes = np.where(codes >= 0, result_codes[:-1][codes], result_codes[-1])
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=values.index, name=values.name)
+
+
+def clean_single_state(state, state_mappings: Dict[str, str]) -> str:
+    if pd.isna(state):
+        return "Unknown"
+
+    state = str(state).strip().lower()
+
+    # Handle Washington D.C. variations
+    if WASHINGTON_DC_PATTERN.match(state):
+        return 'Washington D.C.'
+
+    # Handle state abbreviations
+    state_upper = state.upper()
+    if state_upper in state_mappings:
+        return state_mappings[state_upper]
+
+    # Remove non-state qualifiers
+    state = NON_STATE_QUALIFIER_PATTERN.sub('', state)
+
+    if state in STATE_MISSPELLINGS:
+        return STATE_MISSPELLINGS[state]
+
+    return state.title()
+
 def clean_state(state: pd.Series, state_mappings: Dict[str, str]) -> pd.Series:
-    def clean_single_state(state):
-        if pd.isna(state):
-            return "Unknown"
-
-        state = str(state).strip().lower()
-
-        # Handle Washington D.C. variations
-        if re.match(r'washington,?\s*d\.?c\.?', state):
-            return 'Washington D.C.'
-
-        # Handle state abbreviations
-        state_upper = state.upper()
-        if state_upper in state_mappings:
-            return state_mappings[state_upper]
-
-        # Remove non-state qualifiers
-        state = re.sub(r'\s*-.*$', '', state)
-
-        # Correct common misspellings and variations
-        misspellings = {
-            'virgina': 'Virginia',
-            'virgiia': 'Virginia',
-            'tennesse': 'Tennessee',
-            'tex': 'Texas',
-            'pa - pennsylvania': 'Pennsylvania',
-            'rhode island': 'Rhode Island',
-            'washington, d.c.': 'Washington D.C.',
-            'district of columbia': 'Washington D.C.',
-            'washington dc': 'Washington D.C.',
-            'washington d.c.': 'Washington D.C.',
-            'atlanta': 'Georgia',
-            'virgina director, coalition to stop gun violence': 'Virginia',
-            'the united states': 'Unknown',
-            'china': 'Unknown',
-            'russia': 'Unknown',
-            'qatar': 'Unknown',
-            'united kingdom': 'Unknown'
-        }
-
-        if state in misspellings:
-            return misspellings[state]
-
-        return state.title()
-
-    # Apply the cleaning function to the state column
-    return state.apply(clean_single_state)
+    # Each distinct raw value is cleaned once
+    return normalize_unique(state, lambda value: clean_single_state(value, state_mappings))
 
 def clean_party(party):
     if pd.isna(party):
@@ -80,16 +106,12 @@ def clean_party(party):
     party = str(party).lower().strip()
 
     # Major parties
-    if 'republican' in party:
-        return 'Republican'
-    if 'democrat' in party:
-        return 'Democrat'
-    if 'independent' in party:
-        return 'Independent'
+    for name, label in MAJOR_PARTIES:
+        if name in party:
+            return label
 
     # Minor parties to keep
-    minor_parties = ['libertarian', 'green', 'tea party', 'constitution']
-    for minor in minor_parties:
+    for minor in MINOR_PARTIES:
         if minor in party:
             return party.title()
 
@@ -107,10 +129,10 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     df['is_us_state'] = df['state_cleaned'].isin(state_mappings.values())
 
     # Flag non-standard entries (not US states or flagged as 'Unknown')
-    df['flagged_for_review'] = df['state_cleaned'].apply(lambda x: x == "Unknown")
+    df['flagged_for_review'] = df['state_cleaned'] == "Unknown"
 
     # Clean party column
-    df['party_cleaned'] = df['party'].apply(clean_party)
+    df['party_cleaned'] = normalize_unique(df['party'], clean_party)
 
     return df
 
@@ -128,7 +150,7 @@ def clean_text(text):
     Returns:
         str: The cleaned text.
     """
-    text = re.sub(r'[^\w\s]', '', text)  # Remove special characters
+    text = SPECIAL_CHARS_PATTERN.sub('', text)  # Remove special characters
     return text.lower().strip()  # Convert to lowercase and strip whitespace
 
 
@@ -142,6 +164,7 @@ def remove_stopwords(text):
     Returns:
         str: The text with stopwords removed.
     """
+    from nltk.tokenize import word_tokenize
     words = word_tokenize(text)
     return ' '.join([word for word in words if word not in STOP_WORDS])
 
@@ -174,7 +197,12 @@ def handle_missing_values(df):
     """
     # Columns with a high percentage of missing values
     high_missing_cols = ['job_title', 'state', 'context']
-    df[high_missing_cols] = df[high_missing_cols].fillna('Unknown')
+    for column in high_missing_cols:
+        values = df[column]
+        # Categorical columns (see schema.LIAR_DTYPES) only accept known categories
+        if isinstance(values.dtype, pd.CategoricalDtype) and 'Unknown' not in values.cat.categories:
+            values = values.cat.add_categories('Unknown')
+        df[column] = values.fillna('Unknown')
 
     # Columns with low missing values (we assume forward fill is appropriate here)
     low_missing_cols = ['subject', 'speaker', 'party', 'barely_true_counts', 'false_counts',
@@ -199,7 +227,7 @@ def preprocess_dataset(df):
     df = handle_missing_values(df)
 
     # Apply text preprocessing to the 'statement' column
-    df['processed_statement'] = df['statement'].apply(preprocess_statement)
+    df['processed_statement'] = preprocess_series(df['statement'])
 
     return df
 
@@ -0,0 +1,177 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+MERSENNE_PRIME = (1 << 61) - 1
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+# Minimum token-set Jaccard similarity for two statements to be near duplicates
+DEFAULT_THRESHOLD = 0.7
+# Statements hashed per block, bounding the size of the intermediate matrices
+BLOCK_SIZE = 20_000
+# Members of an LSH bucket each statement is compared with, bounding the pairs of large buckets
+DEFAULT_MAX_NEIGHBORS = 8
+
+
+def tokenize(statements):
+    """
+    Map the tokens of each statement to integer ids.
+
+    Args:
+        statements (iterable[str]): Preprocessed statements (space-separated tokens).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, int]: ``offsets`` and ``token_ids`` in CSR
+            layout (the distinct tokens of statement ``i`` are
+            ``token_ids[offsets[i]:offsets[i + 1]]``) and the vocabulary size.
+    """
+    vocabulary = {}
+    token_ids, lengths = [], []
+    for statement in statements:
+        # dict.fromkeys keeps first-seen order, so ids do not depend on string hashing
+        tokens = dict.fromkeys(statement.split()) if isinstance(statement, str) else ()
+        lengths.append(len(tokens))
+        token_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths)
+    return offsets, np.array(token_ids, dtype=np.int64), len(vocabulary)
+
+
+def permutation_table(vocabulary_size, num_perm=DEFAULT_NUM_PERM, seed=42):
+    """
+    Hash every token id with ``num_perm`` random universal hash functions.
+
+    Returns:
+        np.ndarray: ``(vocabulary_size, num_perm)`` uint32 hash values.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+    ids = np.arange(vocabulary_size, dtype=np.uint64)[:, None]
+    return ((ids * a + b) % MERSENNE_PRIME).astype(np.uint32)
+
+
+def band_keys(offsets, token_ids, table, bands=DEFAULT_BANDS):
+    """
+    Compute the MinHash signature of each statement and hash it into LSH bands.
+
+    Signatures are built block by block and reduced to one 64-bit key per band
+    right away, so only the ``(n, bands)`` keys are kept.
+
+    Returns:
+        np.ndarray: ``(n, bands)`` uint64 band keys. Rows of empty statements are zero.
+    """
+    num_docs, num_perm = len(offsets) - 1, table.shape[1]
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    rows = num_perm // bands
+
+    keys = np.zeros((num_docs, bands), dtype=np.uint64)
+    lengths = np.diff(offsets)
+    for start in range(0, num_docs, BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, num_docs)
+        docs = np.flatnonzero(lengths[start:end]) + start
+        if not len(docs):
+            continue
+        hashes = table[token_ids[offsets[start]:offsets[end]]]
+        signatures = np.minimum.reduceat(hashes, offsets[docs] - offsets[start], axis=0)
+
+        # Combine the rows of each band into one key (wrapping uint64 arithmetic)
+        banded = signatures.astype(np.uint64).reshape(len(docs), bands, rows)
+        block_keys = np.zeros((len(docs), bands), dtype=np.uint64)
+        for row in range(rows):
+            block_keys = block_keys * np.uint64(0x100000001B3) + banded[:, :, row] + np.uint64(1)
+        keys[docs] = block_keys
+    return keys
+
+
+def candidate_pairs(keys, max_neighbors=DEFAULT_MAX_NEIGHBORS):
+    """
+    Find the pairs of statements that share at least one band key.
+
+    Within each bucket, in sorted order, every member is paired with the next
+    ``max_neighbors`` members. Buckets of up to ``max_neighbors + 1`` statements
+    (nearly all of them) thus yield all their pairs. Larger buckets yield
+    overlapping windows that still chain every member to the next ones, so a
+    member that fails verification with one neighbor is still compared with the
+    others. Pairs within a large bucket that are further apart than the window
+    are only found through another band or through a chain of confirmed pairs.
+
+    Args:
+        keys (np.ndarray): ``(n, bands)`` band keys from ``band_keys``.
+        max_neighbors (int): Following bucket members each statement is paired with.
+
+    Returns:
+        np.ndarray: ``(m, 2)`` array of distinct ``(i, j)`` pairs with ``i < j``.
+    """
+    pairs = []
+    for band in range(keys.shape[1]):
+        column = keys[:, band]
+        order = np.argsort(column, kind='stable')
+        sorted_keys = column[order]
+        # Buckets are contiguous runs of sorted_keys, so equal keys d apart share a bucket
+        for distance in range(1, max_neighbors + 1):
+            same = (sorted_keys[distance:] == sorted_keys[:-distance]) & (sorted_keys[distance:] != 0)
+            if not same.any():
+                break
+            pairs.append(np.stack([order[:-distance][same], order[distance:][same]], axis=1))
+
+    pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    pairs.sort(axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def jaccard(offsets, token_ids, pairs):
+    """Exact token-set Jaccard similarity of each pair."""
+    sets = {}
+
+    def token_set(i):
+        if i not in sets:
+            sets[i] = set(token_ids[offsets[i]:offsets[i + 1]].tolist())
+        return sets[i]
+
+    similarities = np.empty(len(pairs), dtype=np.float64)
+    for k, (i, j) in enumerate(pairs):
+        a, b = token_set(i), token_set(j)
+        similarities[k] = len(a & b) / len(a | b)
+    return similarities
+
+
+def near_duplicate_clusters(statements, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                            bands=DEFAULT_BANDS, seed=42, max_neighbors=DEFAULT_MAX_NEIGHBORS):
+    """
+    Group near-duplicate statements with MinHash and LSH banding.
+
+    Candidates come from statements sharing a band of their MinHash signatures,
+    which takes roughly linear time; each candidate pair is then confirmed with
+    its exact token-set Jaccard similarity. Clusters are the connected
+    components of the confirmed pairs.
+
+    Args:
+        statements (iterable[str]): Preprocessed statements.
+        threshold (float): Minimum Jaccard similarity of a duplicate pair.
+        num_perm (int): Number of MinHash permutations.
+        bands (int): Number of LSH bands; ``num_perm`` must be a multiple of it.
+        seed (int): Seed of the hash functions.
+        max_neighbors (int): Bucket members each statement is compared with, see ``candidate_pairs``.
+
+    Returns:
+        np.ndarray: Cluster label of each statement; unique statements get their own label.
+    """
+    offsets, token_ids, vocabulary_size = tokenize(statements)
+    num_docs = len(offsets) - 1
+    keys = band_keys(offsets, token_ids, permutation_table(vocabulary_size, num_perm, seed), bands)
+    pairs = candidate_pairs(keys, max_neighbors)
+    pairs = pairs[jaccard(offsets, token_ids, pairs) >= threshold]
+
+    graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+                       shape=(num_docs, num_docs))
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+def duplicate_rate(labels):
+    """Fraction of rows that duplicate an earlier row of their cluster."""
+    labels = np.asarray(labels)
+    return (len(labels) - len(np.unique(labels))) / len(labels) if len(labels) else 0.0
@@ -0,0 +1,372 @@
+import argparse
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from data_preprocessing import preprocess_series
+
+DEFAULT_INDEX_PATH = os.path.join('data', 'dense_index')
+INDEX_FORMAT_VERSION = 1
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class TfidfSvdEncoder:
+    """
+    Offline fallback encoder: TF-IDF over the statements reduced with truncated SVD (LSA).
+
+    Args:
+        dim (int): Embedding dimension.
+        random_state (int): Seed for the SVD.
+    """
+
+    name = 'tfidf-svd'
+
+    def __init__(self, dim=256, random_state=42):
+        self.dim = dim
+        self.vectorizer = TfidfVectorizer(sublinear_tf=True, min_df=2, token_pattern=r'\S+')
+        self.svd = TruncatedSVD(n_components=dim, random_state=random_state)
+
+    def fit(self, statements):
+        self.svd.fit(self.vectorizer.fit_transform(statements))
+        return self
+
+    def encode(self, statements, batch_size=4096):
+        batches = [
+            self.svd.transform(self.vectorizer.transform(statements[start:start + batch_size]))
+            for start in range(0, len(statements), batch_size)
+        ]
+        return normalize_rows(np.vstack(batches)) if batches else np.zeros((0, self.dim), np.float32)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+
+class SentenceTransformerEncoder:
+    """
+    Encoder backed by a small local sentence-transformers model, run on CPU.
+
+    Requires the optional ``sentence-transformers`` package and the model files.
+    """
+
+    name = 'sentence-transformers'
+
+    def __init__(self, model_name='all-MiniLM-L6-v2'):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def fit(self, statements):
+        return self
+
+    def encode(self, statements, batch_size=64):
+        vectors = self.model.encode(list(statements), batch_size=batch_size, convert_to_numpy=True)
+        return normalize_rows(vectors)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump({'model_name': self.model_name}, f)
+
+
+def make_encoder(kind='tfidf-svd', dim=256, model_name='all-MiniLM-L6-v2'):
+    if kind == SentenceTransformerEncoder.name:
+        return SentenceTransformerEncoder(model_name)
+    return TfidfSvdEncoder(dim)
+
+
+def load_encoder(path, kind):
+    with open(path, 'rb') as f:
+        saved = pickle.load(f)
+    if kind == SentenceTransformerEncoder.name:
+        return SentenceTransformerEncoder(saved['model_name'])
+    return saved
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) index over L2-normalized vectors for approximate top-k
+    cosine search.
+
+    Vectors live in a raw memory-mapped file, either float32 or int8-quantized with
+    a per-dimension scale, and are appended to in place by ``add``. A k-means
+    coarse quantizer assigns each vector to a list; a query only scores the
+    vectors of its ``nprobe`` closest lists.
+    """
+
+    def __init__(self, path, meta, centroids, scale):
+        self.path = path
+        self.meta = meta
+        self.centroids = centroids
+        self.scale = scale
+        self._open()
+
+    @property
+    def dim(self):
+        return self.meta['dim']
+
+    @property
+    def dtype(self):
+        return np.dtype(self.meta['dtype'])
+
+    def __len__(self):
+        return self.meta['count']
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _open(self):
+        # Only the first ``count`` entries are committed: an interrupted add may have written more
+        count = self.meta['count']
+        self.vectors = (np.memmap(self._file('vectors.bin'), dtype=self.dtype, mode='r', shape=(count, self.dim))
+                        if count else np.zeros((0, self.dim), self.dtype))
+        self.assignments = np.fromfile(self._file('assignments.bin'), dtype=np.int32, count=count)
+        with open(self._file('keys.txt'), encoding='utf-8') as f:
+            self.keys = f.read().splitlines()[:count]
+
+        # Group vector ids by list
+        self.list_order = np.argsort(self.assignments, kind='stable')
+        self.list_offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        self.list_offsets[1:] = np.cumsum(np.bincount(self.assignments, minlength=len(self.centroids)))
+
+    def _truncate(self):
+        # Drop what an add interrupted before its meta.json update appended past the committed count
+        count = self.meta['count']
+        for name, size in (('vectors.bin', count * self.dim * self.dtype.itemsize), ('assignments.bin', count * 4)):
+            if os.path.getsize(self._file(name)) > size:
+                os.truncate(self._file(name), size)
+        with open(self._file('keys.txt'), 'rb+') as f:
+            lines = f.readlines()
+            if len(lines) > count:
+                f.truncate(sum(len(line) for line in lines[:count]))
+
+    def _write_meta(self):
+        tmp_path = self._file('meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._file('meta.json'))
+
+    @classmethod
+    def create(cls, path, vectors, keys, nlist=None, quantize=False, random_state=42):
+        """
+        Train the coarse quantizer on ``vectors`` and write a new index.
+
+        Args:
+            path (str): Index directory.
+            vectors (np.ndarray): L2-normalized float32 vectors.
+            keys (list[str]): Identifier of each vector.
+            nlist (int, optional): Number of lists; defaults to sqrt(len(vectors)).
+            quantize (bool): Store vectors as int8 instead of float32.
+            random_state (int): Seed for k-means.
+
+        Returns:
+            IVFIndex: The new index.
+        """
+        os.makedirs(path, exist_ok=True)
+        nlist = nlist or max(1, int(np.sqrt(len(vectors))))
+        kmeans = KMeans(n_clusters=nlist, n_init=1, random_state=random_state).fit(vectors)
+        centroids = normalize_rows(kmeans.cluster_centers_)
+        if quantize:
+            scale = (np.abs(vectors).max(axis=0) / 127).astype(np.float32)
+            scale[scale == 0] = 1.0
+        else:
+            scale = np.ones(vectors.shape[1], dtype=np.float32)
+
+        np.save(os.path.join(path, 'centroids.npy'), centroids)
+        np.save(os.path.join(path, 'scale.npy'), scale)
+        for name in ('vectors.bin', 'assignments.bin', 'keys.txt'):
+            open(os.path.join(path, name), 'wb').close()
+
+        meta = {'version': INDEX_FORMAT_VERSION, 'dim': int(vectors.shape[1]),
+                'dtype': 'int8' if quantize else 'float32', 'count': 0}
+        index = cls(path, meta, centroids, scale)
+        index._write_meta()
+        index.add(vectors, keys)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index version {meta['version']} in {path}")
+        return cls(path, meta, np.load(os.path.join(path, 'centroids.npy')), np.load(os.path.join(path, 'scale.npy')))
+
+    def _store(self, vectors):
+        if self.dtype == np.int8:
+            return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+        return vectors.astype(np.float32)
+
+    def add(self, vectors, keys):
+        """
+        Append vectors to the index, assigning each to its closest list.
+
+        The trained centroids are kept; rebuild with ``create`` if the data drifts far
+        from the corpus they were trained on. The data files are appended first and
+        meta.json, which holds the count, is replaced last, so an interrupted add
+        leaves the index as it was; its partial writes are truncated by the next add.
+        """
+        if not len(vectors):
+            return
+        self._truncate()
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+        with open(self._file('vectors.bin'), 'ab') as f:
+            f.write(self._store(vectors).tobytes())
+        with open(self._file('assignments.bin'), 'ab') as f:
+            f.write(assignments.tobytes())
+        with open(self._file('keys.txt'), 'a', encoding='utf-8') as f:
+            f.writelines(f'{key}\n' for key in keys)
+
+        self.meta['count'] += len(vectors)
+        self._write_meta()
+        self._open()
+
+    def _score(self, ids, query):
+        # Dequantize lazily: (v_int8 * scale) . q == v_int8 . (scale * q)
+        return self.vectors[ids].astype(np.float32) @ (query * self.scale)
+
+    def search(self, queries, k=10, nprobe=8):
+        """
+        Approximate top-k search.
+
+        Args:
+            queries (np.ndarray): L2-normalized query vectors, shape (n, dim).
+            k (int): Number of neighbours.
+            nprobe (int): Number of lists scanned per query.
+
+        Returns:
+            list[list[tuple[int, float]]]: ``(vector_id, score)`` pairs per query, best first.
+        """
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        results = []
+        for query, lists in zip(queries, probes):
+            # Sorted ids turn the gather into a forward scan of the memory-mapped file
+            ids = np.sort(np.concatenate([self.list_order[self.list_offsets[l]:self.list_offsets[l + 1]]
+                                          for l in lists]))
+            results.append(self._top_k(ids, self._score(ids, query), k))
+        return results
+
+    def exact_search(self, queries, k=10):
+        """Brute-force top-k search over every stored vector."""
+        ids = np.arange(len(self))
+        return [self._top_k(ids, self._score(ids, query), k) for query in queries]
+
+    @staticmethod
+    def _top_k(ids, scores, k):
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+def build_index(path, statements, keys, encoder_kind='tfidf-svd', quantize=False, nlist=None):
+    """
+    Fit an encoder on the statements, encode them in batches and build the IVF index.
+
+    Args:
+        path (str): Index directory.
+        statements (pd.Series): Preprocessed statements.
+        keys (pd.Series): Identifier of each statement.
+        encoder_kind (str): 'tfidf-svd' (offline fallback) or 'sentence-transformers'.
+        quantize (bool): Store int8 instead of float32 vectors.
+        nlist (int, optional): Number of IVF lists.
+
+    Returns:
+        tuple[encoder, IVFIndex]: The fitted encoder and the index.
+    """
+    statements = statements.fillna('')
+    encoder = make_encoder(encoder_kind).fit(statements)
+    index = IVFIndex.create(path, encoder.encode(statements), keys.astype(str).tolist(),
+                            nlist=nlist, quantize=quantize)
+    encoder.save(os.path.join(path, 'encoder.pkl'))
+    index.meta['encoder'] = encoder.name
+    index._write_meta()
+    return encoder, index
+
+
+def load_index(path):
+    index = IVFIndex.load(path)
+    return load_encoder(os.path.join(path, 'encoder.pkl'), index.meta['encoder']), index
+
+
+def add_claims(path, claims, keys):
+    """
+    Insert raw claims that are not in the index yet, e.g. after a weekly scrape.
+
+    Args:
+        path (str): Index directory.
+        claims (pd.Series): Raw claims; they are preprocessed before encoding.
+        keys (pd.Series): Identifier of each claim (e.g. the article link).
+
+    Returns:
+        int: Number of claims inserted; claims whose key is already indexed, or
+            repeats an earlier key of the batch, are skipped.
+    """
+    encoder, index = load_index(path)
+    # Keys seen earlier in the batch count as existing, so a repeated key is stored once (its first claim)
+    existing = set(index.keys)
+    new = []
+    for claim, key in zip(claims, keys.astype(str)):
+        if key not in existing and pd.notna(claim):
+            existing.add(key)
+            new.append((claim, key))
+    if new:
+        statements = preprocess_series(pd.Series([claim for claim, _ in new], dtype=object))
+        index.add(encoder.encode(statements), [key for _, key in new])
+    return len(new)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build, update or query the dense claim index.")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="Index directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Build the index from knowledge_base.csv")
+    build.add_argument('--encoder', default='tfidf-svd', choices=['tfidf-svd', 'sentence-transformers'])
+    build.add_argument('--quantize', action='store_true', help="Store int8 vectors")
+    build.add_argument('--nlist', type=int)
+
+    add = subparsers.add_parser('add', help="Insert new claims from a CSV, e.g. the weekly PolitiFact scrape")
+    add.add_argument('csv')
+    add.add_argument('--text-column', default='claim')
+    add.add_argument('--key-column', default='link')
+
+    query = subparsers.add_parser('query', help="Find the prior claims most similar to a claim")
+    query.add_argument('claim')
+    query.add_argument('-k', type=int, default=5)
+    query.add_argument('--nprobe', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        knowledge_base = pd.read_csv(os.path.join('data', 'knowledge_base.csv'))
+        _, index = build_index(args.index, knowledge_base['statement'], knowledge_base['uuid'],
+                               args.encoder, args.quantize, args.nlist)
+        print(f"Indexed {len(index)} statements in {len(index.centroids)} lists")
+    elif args.command == 'add':
+        new_claims = pd.read_csv(args.csv)
+        inserted = add_claims(args.index, new_claims[args.text_column], new_claims[args.key_column])
+        print(f"Inserted {inserted} new claims")
+    else:
+        encoder, index = load_index(args.index)
+        knowledge_base = pd.read_csv(os.path.join('data', 'knowledge_base.csv'))
+        statements = dict(zip(knowledge_base['uuid'].astype(str), knowledge_base['statement']))
+        statement = preprocess_series(pd.Series([args.claim], dtype=object))
+        for vector_id, score in index.search(encoder.encode(statement), args.k, args.nprobe)[0]:
+            key = index.keys[vector_id]
+            print(f"{score:.3f}  {statements.get(key, key)}")
+
+
+if __name__ == "__main__":
+    main()
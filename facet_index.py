@@ -0,0 +1,421 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from data_cleaning import clean_data
+from schema import LIAR_COLUMNS, LIAR_DTYPES, concat_frames
+
+INDEX_FORMAT_VERSION = 1
+DEFAULT_INDEX_PATH = os.path.join('data', 'facet_index')
+
+# Rows are split into chunks of 2**16 by their high 16 bits, as in Roaring bitmaps
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# A chunk with fewer members is a sorted uint16 array, otherwise 1024 64-bit words;
+# a word container is 4096 uint16 long, so the two kinds are told apart by length
+ARRAY_LIMIT = 4096
+
+# facet: (column of the cleaned LIAR frame, comma-separated multi-valued column)
+LIAR_FACETS = {
+    'label': ('label', False),
+    'speaker': ('speaker', False),
+    'party': ('party_cleaned', False),
+    'state': ('state_cleaned', False),
+    'subject': ('subject', True),
+    'context': ('context', False),
+}
+
+
+def _words_from_low(low):
+    bits = np.zeros(1 << CHUNK_BITS, dtype=bool)
+    bits[low] = True
+    return np.packbits(bits, bitorder='little').view('<u8')
+
+
+def _low_from_words(words):
+    # Only unpack the non-zero words, which is most of the work for sparse results
+    nonzero = np.flatnonzero(words)
+    word, bit = np.nonzero(np.unpackbits(words[nonzero].view(np.uint8), bitorder='little').reshape(-1, 64))
+    return (nonzero[word] * 64 + bit).astype(np.uint16)
+
+
+def _container(low):
+    return low if len(low) < ARRAY_LIMIT else _words_from_low(low)
+
+
+def _is_array(container):
+    return container.itemsize == 2
+
+
+def _cardinality(container):
+    return len(container) if _is_array(container) else int(np.bitwise_count(container).sum())
+
+
+def _and(a, b):
+    if _is_array(a) and _is_array(b):
+        return np.intersect1d(a, b, assume_unique=True)
+    if not _is_array(a) and not _is_array(b):
+        # Kept as words even when sparse: results are short-lived, and unpacking costs more than the AND
+        words = a & b
+        return words if words.any() else a[:0]
+    low, words = (a, b) if _is_array(a) else (b, a)
+    return low[(words[low >> 6] >> (low & 63).astype(np.uint64)) & 1 == 1]
+
+
+def _or(a, b):
+    if _is_array(a) and _is_array(b):
+        return _container(np.union1d(a, b))
+    a = _words_from_low(a) if _is_array(a) else a
+    b = _words_from_low(b) if _is_array(b) else b
+    return a | b
+
+
+class RoaringBitmap:
+    """
+    Compressed set of row positions in the layout of Roaring bitmaps.
+
+    Positions are grouped by their high 16 bits; each non-empty chunk is stored
+    as a sorted uint16 array of the low bits while it holds fewer than 4096 rows
+    and as a 8 KiB bitset above that. Sparse facet values thus cost two bytes per
+    row and dense ones one bit, and intersections work chunk by chunk. The
+    cardinality is computed once and cached.
+
+    Args:
+        containers (dict): Chunk key -> container, in increasing key order.
+    """
+
+    __slots__ = ('containers', '_cardinality')
+
+    def __init__(self, containers=None):
+        self.containers = containers if containers is not None else {}
+        self._cardinality = None
+
+    @classmethod
+    def from_positions(cls, positions):
+        """Build a bitmap from row positions (any order, duplicates allowed)."""
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        keys, starts = np.unique(positions >> CHUNK_BITS, return_index=True)
+        low = (positions & CHUNK_MASK).astype(np.uint16)
+        bounds = np.append(starts, len(positions))
+        return cls({int(key): _container(low[start:end]) for key, start, end in zip(keys, bounds[:-1], bounds[1:])})
+
+    def __len__(self):
+        if self._cardinality is None:
+            self._cardinality = sum(_cardinality(container) for container in self.containers.values())
+        return self._cardinality
+
+    def __and__(self, other):
+        if len(other.containers) < len(self.containers):
+            self, other = other, self
+        containers = {}
+        for key, container in self.containers.items():
+            if key in other.containers:
+                result = _and(container, other.containers[key])
+                if len(result):
+                    containers[key] = result
+        return RoaringBitmap(containers)
+
+    @staticmethod
+    def intersection(bitmaps):
+        """
+        Intersect several bitmaps at once.
+
+        Per chunk, the bitset containers are ANDed word by word first, which is
+        cheap, and only the smallest array container is then filtered by the other
+        arrays and the combined bitset.
+        """
+        bitmaps = sorted(bitmaps, key=lambda bitmap: len(bitmap.containers))
+        if not bitmaps:
+            return RoaringBitmap()
+        containers = {}
+        for key, first in bitmaps[0].containers.items():
+            chunk = [first]
+            for bitmap in bitmaps[1:]:
+                container = bitmap.containers.get(key)
+                if container is None:
+                    break
+                chunk.append(container)
+            else:
+                arrays = sorted((c for c in chunk if _is_array(c)), key=len)
+                words = None
+                for container in chunk:
+                    if not _is_array(container):
+                        words = container if words is None else words & container
+                if arrays:
+                    result = arrays[0]
+                    for array in arrays[1:]:
+                        result = _and(result, array)
+                    result = _and(result, words) if words is not None and len(result) else result
+                else:
+                    result = words if words.any() else words[:0]
+                if len(result):
+                    containers[key] = result
+        return RoaringBitmap(containers)
+
+    def __or__(self, other):
+        containers = dict(self.containers)
+        for key, container in other.containers.items():
+            containers[key] = _or(containers[key], container) if key in containers else container
+        return RoaringBitmap(dict(sorted(containers.items())))
+
+    def to_array(self):
+        """Return the row positions as a sorted int64 array."""
+        parts = [(key << CHUNK_BITS) + (container if _is_array(container) else _low_from_words(container))
+                 .astype(np.int64) for key, container in self.containers.items()]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def to_mask(self, num_rows):
+        """Return a boolean mask of length ``num_rows``, e.g. to pre-filter ``BM25Index.search``."""
+        mask = np.zeros(num_rows, dtype=bool)
+        mask[self.to_array()] = True
+        return mask
+
+
+def _facet_values(values, multi):
+    """Return ``(row positions, normalized values)`` of one facet column, skipping missing values."""
+    # Indexed by row position; exploding repeats the position of a multi-valued row
+    values = pd.Series(np.asarray(values, dtype=object))
+    if multi:
+        values = values.str.split(',').explode()
+    values = values.str.strip()
+    present = (values.notna() & (values != '')).to_numpy()
+    return values.index.to_numpy()[present], values.to_numpy()[present]
+
+
+class FacetIndex:
+    """
+    Bitmap index over the metadata columns of a corpus, for boolean filters and
+    group counts without scanning the frame.
+
+    Each distinct value of each facet has a ``RoaringBitmap`` of the rows holding
+    it; multi-valued facets (comma-separated, like the LIAR subjects) set a row
+    in the bitmap of every listed value. A query intersects the bitmaps of the
+    requested values chunk by chunk. Row positions are those of the indexed
+    frame, so a selection can pre-filter a text index built over the same rows.
+
+    Args:
+        facets (dict): Facet name -> {value: RoaringBitmap}.
+        multi_valued (set[str]): Names of the multi-valued facets.
+        codes (dict): Single-valued facet -> int32 array of each row's value
+            number (-1 when missing), used for group counts.
+        num_rows (int): Number of indexed rows.
+    """
+
+    def __init__(self, facets, multi_valued, codes, num_rows):
+        self.facets = facets
+        self.multi_valued = set(multi_valued)
+        self.codes = codes
+        self.num_rows = num_rows
+        self.values = {name: list(bitmaps) for name, bitmaps in facets.items()}
+
+    @classmethod
+    def build(cls, df, facets=None):
+        """
+        Build the index over a frame.
+
+        Args:
+            df (pd.DataFrame): Frame with the facet columns.
+            facets (dict, optional): Facet name -> (column, multi-valued); LIAR_FACETS by default.
+
+        Returns:
+            FacetIndex: The built index.
+        """
+        facets = LIAR_FACETS if facets is None else facets
+        bitmaps, codes, multi_valued = {}, {}, set()
+        for name, (column, multi) in facets.items():
+            rows, values = _facet_values(df[column], multi)
+            value_codes, uniques = pd.factorize(values, sort=True)
+            # Rows grouped by value, ascending within each value
+            order = np.argsort(value_codes, kind='stable')
+            bounds = np.zeros(len(uniques) + 1, dtype=np.int64)
+            bounds[1:] = np.cumsum(np.bincount(value_codes, minlength=len(uniques)))
+            bitmaps[name] = {str(value): RoaringBitmap.from_positions(rows[order[bounds[i]:bounds[i + 1]]])
+                             for i, value in enumerate(uniques)}
+            if multi:
+                multi_valued.add(name)
+            else:
+                codes[name] = np.full(len(df), -1, dtype=np.int32)
+                codes[name][rows] = value_codes
+        return cls(bitmaps, multi_valued, codes, len(df))
+
+    def __len__(self):
+        return self.num_rows
+
+    def bitmap(self, facet, value):
+        """Return the rows of one facet value (empty for an unknown value)."""
+        if facet not in self.facets:
+            raise KeyError(f"Unknown facet {facet!r}; expected one of {sorted(self.facets)}")
+        return self.facets[facet].get(str(value), RoaringBitmap())
+
+    def select(self, **filters):
+        """
+        Select the rows matching every filter.
+
+        Args:
+            **filters: Facet name -> value, or a list of values of which any may match.
+
+        Returns:
+            RoaringBitmap: The matching rows; all rows when there is no filter.
+        """
+        selections = []
+        for facet, value in filters.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                bitmap = RoaringBitmap()
+                for item in value:
+                    bitmap = bitmap | self.bitmap(facet, item)
+            else:
+                bitmap = self.bitmap(facet, value)
+            selections.append(bitmap)
+        if not selections:
+            return RoaringBitmap.from_positions(np.arange(self.num_rows))
+
+        return RoaringBitmap.intersection(selections)
+
+    def counts(self, facet, within=None):
+        """
+        Count the rows of each value of a facet.
+
+        Args:
+            facet (str): The facet to group by.
+            within (RoaringBitmap, optional): Only count these rows, e.g. a ``select`` result.
+
+        Returns:
+            pd.Series: Row count per value, largest first, without zero counts.
+        """
+        if facet not in self.facets:
+            raise KeyError(f"Unknown facet {facet!r}; expected one of {sorted(self.facets)}")
+        if within is None:
+            counts = [len(bitmap) for bitmap in self.facets[facet].values()]
+        elif facet in self.codes:
+            # One code per row: a bincount over the selected rows beats one intersection per value
+            codes = self.codes[facet][within.to_array()]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.values[facet]))
+        else:
+            counts = [len(bitmap & within) for bitmap in self.facets[facet].values()]
+
+        counts = np.asarray(counts, dtype=np.int64)
+        order = np.flatnonzero(counts)
+        order = order[np.argsort(-counts[order], kind='stable')]
+        values = self.values[facet]
+        return pd.Series(counts[order], index=pd.Index([values[i] for i in order], dtype=object), name=facet)
+
+    def save(self, path):
+        """Persist the index as a directory of ``.npy`` arrays plus JSON metadata."""
+        os.makedirs(path, exist_ok=True)
+        # All containers of all bitmaps, facet by facet and value by value, in one uint16 pool
+        bitmap_offsets, container_keys, container_offsets, pool = [0], [], [0], []
+        for bitmaps in self.facets.values():
+            for bitmap in bitmaps.values():
+                for key, container in bitmap.containers.items():
+                    container_keys.append(key)
+                    pool.append(container if _is_array(container) else container.view(np.uint16))
+                    container_offsets.append(container_offsets[-1] + len(pool[-1]))
+                bitmap_offsets.append(len(container_keys))
+
+        arrays = {
+            'bitmap_offsets': np.array(bitmap_offsets, dtype=np.int64),
+            'container_keys': np.array(container_keys, dtype=np.int64),
+            'container_offsets': np.array(container_offsets, dtype=np.int64),
+            'pool': np.concatenate(pool) if pool else np.zeros(0, dtype=np.uint16),
+        }
+        for name, values in arrays.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+        for facet, codes in self.codes.items():
+            np.save(os.path.join(path, f'codes_{facet}.npy'), codes)
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_FORMAT_VERSION, 'num_rows': self.num_rows, 'values': self.values,
+                       'multi_valued': sorted(self.multi_valued)}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a saved index; containers are views of the memory-mapped pool unless ``mmap`` is False."""
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index version {meta['version']} in {path}")
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in ('bitmap_offsets', 'container_keys', 'container_offsets', 'pool')}
+        bitmap_offsets = arrays['bitmap_offsets'].tolist()
+        container_keys = arrays['container_keys'].tolist()
+        container_offsets = arrays['container_offsets'].tolist()
+        pool = np.asarray(arrays['pool'])
+
+        facets, codes, bitmap_number = {}, {}, 0
+        for facet, values in meta['values'].items():
+            facets[facet] = {}
+            for value in values:
+                containers = {}
+                for c in range(bitmap_offsets[bitmap_number], bitmap_offsets[bitmap_number + 1]):
+                    container = pool[container_offsets[c]:container_offsets[c + 1]]
+                    containers[container_keys[c]] = (container if len(container) < ARRAY_LIMIT
+                                                     else container.view('<u8'))
+                facets[facet][value] = RoaringBitmap(containers)
+                bitmap_number += 1
+            if facet not in meta['multi_valued']:
+                codes[facet] = np.load(os.path.join(path, f'codes_{facet}.npy'), mmap_mode=mmap_mode)
+        return cls(facets, meta['multi_valued'], codes, meta['num_rows'])
+
+
+def load_liar_metadata(base_path='data'):
+    """Load the LIAR train, test and validation files as one frame with cleaned state and party columns."""
+    frames = [pd.read_csv(os.path.join(base_path, name), names=LIAR_COLUMNS, sep='\t', header=None,
+                          dtype=LIAR_DTYPES)
+              for name in ('train.tsv', 'test.tsv', 'valid.tsv')]
+    return clean_data(concat_frames(frames))
+
+
+def parse_filters(expressions):
+    """Parse ``facet=value[|value...]`` expressions into ``select`` keyword arguments."""
+    filters = {}
+    for expression in expressions:
+        facet, _, value = expression.partition('=')
+        values = value.split('|')
+        filters[facet.strip()] = values if len(values) > 1 else value
+    return filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the facet index over the LIAR metadata.")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="Index directory")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index from the LIAR files")
+    parser.add_argument('--where', action='append', default=[],
+                        help="Filter as facet=value, or facet=a|b for any of several values; repeatable")
+    parser.add_argument('--count', help="Facet to count the selected rows by")
+    parser.add_argument('-k', type=int, default=5, help="Number of results")
+    parser.add_argument('claim', nargs='?', help="Claim to look up among the selected rows")
+    args = parser.parse_args()
+
+    metadata = load_liar_metadata()
+    if args.rebuild or not os.path.exists(os.path.join(args.index, 'meta.json')):
+        start = time.perf_counter()
+        index = FacetIndex.build(metadata)
+        index.save(args.index)
+        print(f"Built facet index over {len(index)} rows in {time.perf_counter() - start:.2f}s")
+    else:
+        index = FacetIndex.load(args.index)
+
+    start = time.perf_counter()
+    selected = index.select(**parse_filters(args.where))
+    print(f"{len(selected)} rows selected in {(time.perf_counter() - start) * 1e6:.0f}us")
+    if args.count:
+        print(index.counts(args.count, within=selected).head(20).to_string())
+
+    if args.claim:
+        # The text index covers the same rows, so the selection applies as a mask
+        from claim_index import BM25Index
+        from data_preprocessing import preprocess_series
+        text_index = BM25Index.build(preprocess_series(metadata['statement']), metadata['id'])
+        for position, score in text_index.search(args.claim, args.k, within=selected.to_mask(len(text_index))):
+            row = metadata.iloc[position]
+            print(f"{score:6.2f}  [{row['label']}] ({row['speaker']}, {row['party_cleaned']}) {row['statement']}")
+    else:
+        for position in selected.to_array()[:args.k]:
+            row = metadata.iloc[position]
+            print(f"[{row['label']}] ({row['speaker']}, {row['party_cleaned']}) {row['statement']}")
+
+
+if __name__ == "__main__":
+    main()
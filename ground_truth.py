@@ -0,0 +1,312 @@
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from data_building import raw_statements
+from preprocessing_cache import PreprocessingCache
+from storage import load_corpus
+
+DEFAULT_MODEL = 'meta-llama/Llama-2-7b-chat-hf'
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MAX_NEW_TOKENS = 64
+DEFAULT_CACHE_PATH = os.path.join('data', 'ground_truth_cache.sqlite')
+DEFAULT_OUTPUT_PATH = os.path.join('data', 'ground_truth.csv')
+
+LABELS = ['pants-fire', 'false', 'barely-true', 'half-true', 'mostly-true', 'true']
+LABEL_PATTERN = re.compile(r'\b(' + '|'.join(sorted(LABELS, key=len, reverse=True)) + r')\b')
+PROMPT_TEMPLATE = (
+    "[INST] You are a fact-checking assistant. Rate the claim below as one of: {labels}. "
+    "Answer with the rating first, then a one-sentence explanation.\n"
+    "Claim: {statement} [/INST]"
+)
+
+
+def build_prompt(statement):
+    return PROMPT_TEMPLATE.format(labels=', '.join(LABELS), statement=statement)
+
+
+def parse_label(completion):
+    """Return the first rating mentioned in a completion, or None."""
+    match = LABEL_PATTERN.search(completion.lower())
+    return match.group(1) if match else None
+
+
+class StubBackend:
+    """
+    Deterministic stand-in for a model: whitespace tokens, canned completions.
+
+    Used for tests and dry runs. ``seconds_per_token`` simulates generation time.
+    """
+
+    name = 'stub'
+
+    def __init__(self, model_name='stub', seconds_per_token=0.0):
+        self.model_name = model_name
+        self.seconds_per_token = seconds_per_token
+
+    def count_tokens(self, prompts):
+        return [len(prompt.split()) for prompt in prompts]
+
+    def generate(self, prompts, max_new_tokens=DEFAULT_MAX_NEW_TOKENS):
+        completions = []
+        for prompt in prompts:
+            digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=8).digest()
+            label = LABELS[digest[0] % len(LABELS)]
+            words = f"{label}. Stub explanation {digest.hex()}".split()[:max_new_tokens]
+            completions.append((' '.join(words), len(words)))
+        if self.seconds_per_token:
+            time.sleep(self.seconds_per_token * max(tokens for _, tokens in completions))
+        return completions
+
+
+class TransformersBackend:
+    """
+    Causal language model from Hugging Face ``transformers``, batched with left padding.
+
+    Requires the optional ``transformers`` and ``torch`` packages (and
+    ``bitsandbytes`` with a GPU for ``load_in_4bit``). On CPU, use a small model.
+    """
+
+    name = 'transformers'
+
+    def __init__(self, model_name=DEFAULT_MODEL, device='cpu', load_in_4bit=False):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.torch = torch
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, padding_side='left')
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        kwargs = {}
+        if load_in_4bit:
+            from transformers import BitsAndBytesConfig
+            kwargs['quantization_config'] = BitsAndBytesConfig(load_in_4bit=True,
+                                                               bnb_4bit_compute_dtype=torch.float16)
+        self.model = AutoModelForCausalLM.from_pretrained(model_name, **kwargs)
+        if not load_in_4bit:
+            self.model.to(device)
+        self.model.eval()
+        self.device = self.model.device
+
+    def count_tokens(self, prompts):
+        return [len(ids) for ids in self.tokenizer(list(prompts))['input_ids']]
+
+    def generate(self, prompts, max_new_tokens=DEFAULT_MAX_NEW_TOKENS):
+        inputs = self.tokenizer(list(prompts), return_tensors='pt', padding=True).to(self.device)
+        with self.torch.inference_mode():
+            output = self.model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False,
+                                         pad_token_id=self.tokenizer.pad_token_id)
+        generated = output[:, inputs['input_ids'].shape[1]:]
+        completions = []
+        for ids in generated:
+            ids = ids[ids != self.tokenizer.pad_token_id]
+            completions.append((self.tokenizer.decode(ids, skip_special_tokens=True).strip(), len(ids)))
+        return completions
+
+
+def make_backend(kind='stub', model_name=None, load_in_4bit=False):
+    if kind == TransformersBackend.name:
+        return TransformersBackend(model_name or DEFAULT_MODEL, load_in_4bit=load_in_4bit)
+    return StubBackend(model_name or 'stub')
+
+
+class CompletionCache:
+    """
+    SQLite cache of completions keyed by (model, prompt hash).
+
+    Every batch is committed as soon as it is generated, so the cache doubles as
+    the checkpoint of a run: an interrupted run restarted with the same model
+    only generates the prompts that are still missing.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                model TEXT NOT NULL,
+                prompt_hash BLOB NOT NULL,
+                completion TEXT NOT NULL,
+                generated_tokens INTEGER NOT NULL,
+                PRIMARY KEY (model, prompt_hash)
+            ) WITHOUT ROWID
+        """)
+
+    @staticmethod
+    def key(prompt):
+        return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, model, keys):
+        found = {}
+        # Stay under SQLite's limit on bound parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f'SELECT prompt_hash, completion FROM completions WHERE model = ? AND prompt_hash IN ({placeholders})',
+                [model, *batch])
+            found.update(rows)
+        return found
+
+    def put_many(self, model, items):
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)',
+                                  [(model, key, completion, tokens) for key, completion, tokens in items])
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def length_buckets(lengths, batch_size):
+    """
+    Group prompts of similar length into batches to cut padding.
+
+    Args:
+        lengths (list[int]): Token count of each prompt.
+        batch_size (int): Prompts per batch.
+
+    Returns:
+        list[np.ndarray]: Prompt positions of each batch, longest prompts first.
+    """
+    order = np.argsort(-np.asarray(lengths), kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def padding_ratio(lengths, batches):
+    """Fraction of the padded batch tensors taken by padding."""
+    lengths = np.asarray(lengths)
+    padded = sum(lengths[batch].max() * len(batch) for batch in batches)
+    return 1 - lengths.sum() / padded if padded else 0.0
+
+
+class RunStats:
+    def __init__(self):
+        self.prompts = 0
+        self.cached = 0
+        self.generated_tokens = 0
+        self.prompt_tokens = 0
+        self.batch_latencies = []
+        self.padding = 0.0
+
+    def report(self):
+        elapsed = sum(self.batch_latencies)
+        lines = [f"Prompts: {self.prompts} ({self.cached} cached, {self.prompts - self.cached} generated)"]
+        if self.batch_latencies:
+            p50, p95 = np.percentile(self.batch_latencies, [50, 95]) * 1000
+            lines += [
+                f"Batches: {len(self.batch_latencies)}, latency p50 {p50:.1f} ms, p95 {p95:.1f} ms",
+                f"Throughput: {self.generated_tokens / elapsed:.1f} generated tokens/s, "
+                f"{(self.prompt_tokens + self.generated_tokens) / elapsed:.1f} total tokens/s",
+                f"Padding: {self.padding:.1%} of the batched prompt tokens",
+            ]
+        return '\n'.join(lines)
+
+
+def generate_ground_truth(claims, backend, cache, batch_size=DEFAULT_BATCH_SIZE,
+                          max_new_tokens=DEFAULT_MAX_NEW_TOKENS, stats=None, log=print):
+    """
+    Generate a completion for every claim, reusing cached ones.
+
+    The model is prompted with the claims as written, and completions are cached
+    under the model name and a hash of the exact prompt, so only identical
+    prompts share a generation. Distinct uncached prompts are batched by length and each batch is written to
+    the cache as soon as it is done.
+
+    Args:
+        claims (pd.Series): The claims as written, used in the prompts.
+        backend: A ``StubBackend`` or ``TransformersBackend``.
+        cache (CompletionCache): Completion cache and checkpoint.
+        batch_size (int): Prompts per batch.
+        max_new_tokens (int): Generation budget per prompt.
+        stats (RunStats, optional): Filled with counts and timings.
+        log (callable): Progress output.
+
+    Returns:
+        pd.Series: The completion of each claim, with the same index.
+    """
+    stats = stats if stats is not None else RunStats()
+    prompts = [build_prompt(claim) for claim in claims.fillna('')]
+    keys = [cache.key(prompt) for prompt in prompts]
+    completions = cache.get_many(backend.model_name, list(set(keys)))
+
+    pending = {}
+    for key, prompt in zip(keys, prompts):
+        if key not in completions and key not in pending:
+            pending[key] = prompt
+    stats.prompts += len(prompts)
+    stats.cached += sum(key in completions for key in keys)
+
+    pending_keys, pending_prompts = list(pending), list(pending.values())
+    lengths = backend.count_tokens(pending_prompts) if pending_prompts else []
+    batches = length_buckets(lengths, batch_size)
+    stats.padding = padding_ratio(lengths, batches)
+
+    for number, batch in enumerate(batches, 1):
+        start = time.perf_counter()
+        outputs = backend.generate([pending_prompts[i] for i in batch], max_new_tokens)
+        latency = time.perf_counter() - start
+
+        items = [(pending_keys[i], text, tokens) for i, (text, tokens) in zip(batch, outputs)]
+        cache.put_many(backend.model_name, items)
+        completions.update((key, text) for key, text, _ in items)
+
+        stats.batch_latencies.append(latency)
+        stats.prompt_tokens += sum(lengths[i] for i in batch)
+        stats.generated_tokens += sum(tokens for _, _, tokens in items)
+        if number % 10 == 0 or number == len(batches):
+            log(f"Batch {number}/{len(batches)}: {len(batch)} prompts in {latency * 1000:.0f} ms")
+
+    return pd.Series([completions[key] for key in keys], index=claims.index, dtype=object)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate LLM ground-truth ratings for the evaluation set.")
+    parser.add_argument('--backend', default='stub', choices=['stub', 'transformers'])
+    parser.add_argument('--model', help="Model name or path (transformers backend)")
+    parser.add_argument('--load-in-4bit', action='store_true', help="Quantize with bitsandbytes (GPU only)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--max-new-tokens', type=int, default=DEFAULT_MAX_NEW_TOKENS)
+    parser.add_argument('--limit', type=int, help="Only the first N claims")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help="Completion cache / checkpoint")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_PATH)
+    args = parser.parse_args()
+
+    eval_set = load_corpus('data', 'evaluation_set', columns=['uuid', 'statement', 'label'])
+    if args.limit:
+        eval_set = eval_set.head(args.limit)
+
+    # The evaluation set only has preprocessed statements, which make poor prompts
+    with PreprocessingCache(os.path.join('data', 'preprocessing_cache.sqlite')) as preprocessing_cache:
+        claims = eval_set['uuid'].astype(str).map(raw_statements('data', cache=preprocessing_cache))
+    missing = claims.isna() & eval_set['statement'].notna()
+    if missing.any():
+        print(f"{missing.sum()} claims not found in the sources (evaluation set from an older build?), "
+              f"prompting with their preprocessed statement")
+        claims = claims.where(~missing, eval_set['statement'])
+
+    backend = make_backend(args.backend, args.model, args.load_in_4bit)
+    stats = RunStats()
+    with CompletionCache(args.cache) as cache:
+        completions = generate_ground_truth(claims, backend, cache, args.batch_size, args.max_new_tokens, stats)
+
+    eval_set['completion'] = completions
+    eval_set['predicted_label'] = completions.map(parse_label)
+    eval_set.to_csv(args.output, index=False)
+    print(stats.report())
+    print(f"Saved {len(eval_set)} completions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
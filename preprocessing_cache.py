@@ -0,0 +1,102 @@
+import hashlib
+import sqlite3
+import pandas as pd
+from data_preprocessing import PREPROCESSING_VERSION, preprocess_series
+
+# SQLite limits the number of bound parameters per statement
+QUERY_BATCH_SIZE = 900
+
+
+class PreprocessingCache:
+    """
+    Persistent cache of preprocessed statements, keyed by a hash of the raw
+    statement and the preprocessing version.
+
+    Args:
+        path (str): Path of the SQLite file; created if missing.
+        version (int): Preprocessing version mixed into every key.
+    """
+
+    def __init__(self, path, version=PREPROCESSING_VERSION):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS statements (key BLOB PRIMARY KEY, processed TEXT NOT NULL) WITHOUT ROWID'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def key(self, statement):
+        return hashlib.blake2b(f'{self.version}\0{statement}'.encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, keys):
+        """
+        Look up cached results.
+
+        Args:
+            keys (list[bytes]): Keys as returned by ``key``.
+
+        Returns:
+            dict: Mapping of the keys found to their preprocessed statement.
+        """
+        found = {}
+        for start in range(0, len(keys), QUERY_BATCH_SIZE):
+            batch = keys[start:start + QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            found.update(self.conn.execute(
+                f'SELECT key, processed FROM statements WHERE key IN ({placeholders})', batch
+            ))
+        return found
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO statements (key, processed) VALUES (?, ?)', items)
+
+    def preprocess(self, statements, n_jobs=1):
+        """
+        Preprocess a Series of statements, computing only the ones not cached yet.
+
+        Args:
+            statements (pd.Series): The raw statements.
+            n_jobs (int): Number of worker processes for the uncached statements.
+
+        Returns:
+            pd.Series: The preprocessed statements, with the same index.
+        """
+        present = statements.notna()
+        raw = statements[present]
+        keys = [self.key(statement) for statement in raw]
+
+        cached = self.get_many(list(set(keys)))
+        is_hit = [key in cached for key in keys]
+        self.hits += sum(is_hit)
+        self.misses += len(keys) - sum(is_hit)
+
+        new = {}
+        for key, statement, hit in zip(keys, raw, is_hit):
+            if not hit and key not in new:
+                new[key] = statement
+        if new:
+            processed = preprocess_series(pd.Series(list(new.values()), dtype=object), n_jobs=n_jobs)
+            computed = dict(zip(new.keys(), processed))
+            self.put_many(computed.items())
+            cached.update(computed)
+
+        result = statements.astype(object).copy()
+        result[present] = [cached[key] for key in keys]
+        return result
+
+    def report(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        return f"Preprocessing cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1%} hit rate)"
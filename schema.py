@@ -0,0 +1,203 @@
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.util import hash_array
+
+LIAR_COLUMNS = ['id', 'label', 'statement', 'subject', 'speaker', 'job_title', 'state', 'party',
+                'barely_true_counts', 'false_counts', 'half_true_counts', 'mostly_true_counts',
+                'pants_on_fire_counts', 'context']
+COUNT_COLUMNS = ['barely_true_counts', 'false_counts', 'half_true_counts', 'mostly_true_counts',
+                 'pants_on_fire_counts']
+
+TEXT_DTYPE = pd.StringDtype('pyarrow')
+UUID_DTYPE = pd.ArrowDtype(pa.binary(16))
+# Credit-history counts are small non-negative integers with a few missing values
+COUNT_DTYPE = pd.UInt16Dtype()
+
+# Columns with few distinct values are categorical; free text stays Arrow-backed
+LIAR_DTYPES = {
+    'id': TEXT_DTYPE,
+    'label': 'category',
+    'statement': TEXT_DTYPE,
+    'subject': 'category',
+    'speaker': 'category',
+    'job_title': 'category',
+    'state': 'category',
+    'party': 'category',
+    'context': 'category',
+    **{column: COUNT_DTYPE for column in COUNT_COLUMNS},
+}
+
+POLITIFACT_DTYPES = {'statement': TEXT_DTYPE, 'rating': 'category'}
+SNOPES_DTYPES = {'claim': TEXT_DTYPE, 'rating': 'category'}
+
+CORPUS_DTYPES = {
+    'label': 'category',
+    'statement': TEXT_DTYPE,
+    'source': 'category',
+    'uuid': UUID_DTYPE,
+}
+
+# Fields a content-derived UUID is computed from
+CONTENT_ID_FIELDS = ('source', 'statement', 'label')
+# 16-character SipHash keys of the two 64-bit halves of a content UUID; changing
+# them changes every ID
+CONTENT_ID_KEYS = ('fact-check-id-hi', 'fact-check-id-lo')
+
+
+def apply_schema(df, dtypes):
+    """
+    Cast the columns of a dataframe to the given dtypes.
+
+    Columns not in ``dtypes`` and dtypes for absent columns are ignored.
+
+    Args:
+        df (pd.DataFrame): The dataframe to convert.
+        dtypes (dict): Column name to dtype.
+
+    Returns:
+        pd.DataFrame: The converted dataframe.
+    """
+    return df.astype({column: dtype for column, dtype in dtypes.items() if column in df.columns})
+
+
+def concat_frames(dfs):
+    """
+    Concatenate dataframes, keeping categorical columns categorical.
+
+    ``pd.concat`` falls back to object dtype when the categories differ, so the
+    categories of each categorical column are unified first.
+
+    Args:
+        dfs (list[pd.DataFrame]): Frames with the same columns.
+
+    Returns:
+        pd.DataFrame: The concatenated frame with a fresh index.
+    """
+    dfs = list(dfs)
+    for column in dfs[0].columns:
+        if not all(isinstance(df[column].dtype, pd.CategoricalDtype) for df in dfs):
+            continue
+        categories = pd.Index([])
+        for df in dfs:
+            categories = categories.union(df[column].cat.categories, sort=False)
+        dfs = [df.assign(**{column: df[column].cat.set_categories(categories)}) for df in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def new_uuids(n):
+    """Return ``n`` random UUIDs as a 16-byte binary array."""
+    return pd.array([uuid.uuid4().bytes for _ in range(n)], dtype=UUID_DTYPE)
+
+
+def content_keys(df, fields=CONTENT_ID_FIELDS, seen=None):
+    """
+    Build the normalized content key of each row.
+
+    Fields are joined with a unit separator after collapsing whitespace and
+    lowercasing the label; missing values become empty strings. Rows whose key
+    already appeared get their occurrence number appended, so exact duplicates
+    keep distinct keys (the first occurrence is unaffected). The string work
+    runs in Arrow compute kernels.
+
+    Occurrence numbers follow row order: reordering exact duplicates swaps their
+    keys, while every row without a duplicate keeps its key whatever its
+    position. To number the occurrences of a corpus read in chunks as if it were
+    one frame, pass the same ``seen`` dict for every chunk, in order.
+
+    Args:
+        df (pd.DataFrame): Frame with the ``fields`` columns.
+        fields (tuple[str]): Columns identifying a row.
+        seen (dict, optional): Occurrences so far per 64-bit hash of a key,
+            updated in place.
+
+    Returns:
+        pd.Series: Object series of keys, with the same index.
+    """
+    parts = []
+    for field in fields:
+        values = pc.fill_null(pa.array(df[field].astype(TEXT_DTYPE)).cast(pa.large_string()), '')
+        values = pc.utf8_trim_whitespace(pc.replace_substring_regex(values, r'\s+', ' '))
+        parts.append(pc.utf8_lower(values) if field == 'label' else values)
+    keys = pc.binary_join_element_wise(*parts, pa.scalar('\x1f', pa.large_string()))
+    keys = keys.to_numpy(zero_copy_only=False)
+
+    codes, uniques = pd.factorize(keys)
+    occurrence = pd.Series(codes).groupby(codes, sort=False).cumcount().to_numpy()
+    if seen is not None:
+        hashes = hash_array(uniques, encoding='utf8', hash_key=CONTENT_ID_KEYS[0], categorize=False).tolist()
+        previous = np.array([seen.get(h, 0) for h in hashes], dtype=np.int64)
+        seen.update(zip(hashes, (previous + np.bincount(codes, minlength=len(uniques))).tolist()))
+        occurrence = occurrence + previous[codes]
+    for i in np.flatnonzero(occurrence):
+        keys[i] = f'{keys[i]}\x1f{occurrence[i]}'
+    return pd.Series(keys, index=df.index, dtype=object)
+
+
+def content_uuids(df, fields=CONTENT_ID_FIELDS, seen=None):
+    """
+    Derive a UUID from the content of each row, for the whole frame at once.
+
+    The 128 bits are two SipHash-2-4 digests of the row's ``content_keys`` (with
+    the two CONTENT_ID_KEYS), computed by pandas' vectorized ``hash_array``; the
+    version and variant bits are then set as for a UUIDv8. Unchanged rows keep
+    their UUID across rebuilds, whatever their position.
+
+    Args:
+        df (pd.DataFrame): Frame with the ``fields`` columns.
+        fields (tuple[str]): Columns identifying a row.
+        seen (dict, optional): Occurrence counts shared across chunks, see ``content_keys``.
+
+    Returns:
+        pd.arrays.ArrowExtensionArray: 16-byte binary UUIDs.
+    """
+    keys = content_keys(df, fields, seen).to_numpy(dtype=object)
+    digests = np.empty((len(keys), 2), dtype='>u8')
+    for half, hash_key in enumerate(CONTENT_ID_KEYS):
+        digests[:, half] = hash_array(keys, encoding='utf8', hash_key=hash_key, categorize=False)
+
+    raw = digests.view(np.uint8).reshape(len(keys), 16)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x80  # version 8
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    array = pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), len(keys), [None, pa.py_buffer(raw.tobytes())])
+    return pd.arrays.ArrowExtensionArray(array)
+
+
+def uuids_to_str(values):
+    """
+    Format UUIDs as the usual 36-character strings.
+
+    Args:
+        values (pd.Series): UUIDs as 16-byte values or already as strings.
+
+    Returns:
+        pd.Series: The UUID strings, with the same index.
+    """
+    if values.dtype != UUID_DTYPE:
+        return values
+    return pd.Series([str(uuid.UUID(bytes=value)) for value in values], index=values.index, dtype=object)
+
+
+def memory_report(before, after=None):
+    """
+    Describe the memory used by each column of a dataframe.
+
+    Args:
+        before (pd.DataFrame): The frame to report on.
+        after (pd.DataFrame, optional): The same data with another schema; the
+            report then compares both.
+
+    Returns:
+        str: A printable table, one line per column plus the total.
+    """
+    usage = {'before': before.memory_usage(deep=True)}
+    if after is not None:
+        usage['after'] = after.memory_usage(deep=True)
+    report = pd.DataFrame(usage).fillna(0) / 2 ** 20
+    report.loc['total'] = report.sum()
+    if after is not None:
+        report['ratio'] = report['after'] / report['before']
+    return report.round(3).rename(columns={'before': 'MiB' if after is None else 'before MiB',
+                                           'after': 'after MiB'}).to_string()
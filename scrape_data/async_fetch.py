@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from http_cache import CacheMiss, ResponseCache
+from metrics import FETCH
+
+# Defaults shared by the scrapers
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE_PER_HOST = 1.0  # requests per second
+DEFAULT_BURST = 2
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for a single host.
+
+    Args:
+        rate (float): Tokens added per second. ``None`` or ``0`` disables limiting.
+        capacity (int): Maximum number of tokens, i.e. the allowed burst.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """
+    Asyncio HTTP fetcher with pooled keep-alive connections, a global
+    concurrency limit and a token-bucket rate limit per host.
+
+    Use as an async context manager:
+
+        async with AsyncFetcher(concurrency=8, rate_per_host=1.0) as fetcher:
+            content = await fetcher.fetch(url)
+
+    With ``metrics`` (a ``RunMetrics``), time spent waiting on the rate and
+    concurrency limits and on the network is recorded as the 'throttle' and 'fetch' stages, along with
+    request, byte, retry and error counters.
+
+    With ``cache`` (a ``ResponseCache``), cached URLs are revalidated with a
+    conditional request and a 304 answer is served from the cache; an offline
+    cache replays its responses without any network traffic.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate_per_host=DEFAULT_RATE_PER_HOST,
+                 burst=DEFAULT_BURST, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, headers=None,
+                 metrics=None, cache=None):
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.timeout = timeout
+        self.retries = retries
+        self.headers = headers
+        self.metrics = metrics
+        self.cache = cache
+        self._buckets = {}
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=self.headers,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    async def fetch(self, url):
+        """
+        Fetch a URL and return the raw response body.
+
+        Retries on connection errors and on 429/5xx responses with exponential
+        backoff; raises the last error once retries are exhausted.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            bytes: The response body.
+
+        Raises:
+            CacheMiss: The cache is offline and ``url`` is not in it.
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if self.cache is not None and self.cache.offline:
+            if entry is None:
+                raise CacheMiss(url)
+            self.cache.stats['replayed'] += 1
+            self._count('cache_replayed')
+            return entry.body
+
+        headers = ResponseCache.revalidation_headers(entry)
+        bucket = self._bucket(urlsplit(url).netloc)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count('retries')
+            waited = time.perf_counter()
+            await bucket.acquire()
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    self._observe('throttle', started - waited)
+                    try:
+                        async with self._session.get(url, headers=headers) as response:
+                            self._count('requests')
+                            if response.status == 304 and entry is not None:
+                                self.cache.stats['not_modified'] += 1
+                                self._count('not_modified')
+                                return entry.body
+                            if response.status in RETRY_STATUSES and attempt < self.retries:
+                                logging.warning(f"Got HTTP {response.status} for {url}, retrying")
+                            else:
+                                response.raise_for_status()
+                                content = await response.read()
+                                self._count('bytes', len(content))
+                                if self.cache is not None:
+                                    self.cache.put(url, content, response.headers)
+                                return content
+                    finally:
+                        self._observe(FETCH, time.perf_counter() - started)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    self._count('fetch_errors')
+                    raise
+                logging.warning(f"Error fetching {url}: {e!r}, retrying")
+            except aiohttp.ClientResponseError:
+                self._count('fetch_errors')
+                raise
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    def _count(self, name, value=1):
+        if self.metrics is not None:
+            self.metrics.incr(name, value)
+
+    def _observe(self, stage, seconds):
+        if self.metrics is not None:
+            self.metrics.observe(stage, seconds)
@@ -0,0 +1,215 @@
+import lxml.html
+from bs4.dammit import UnicodeDammit
+from lxml import etree
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Selectors are compiled once; each one is evaluated relative to its context element
+POLITIFACT_STATEMENTS = etree.XPath(f"//article[{_has_class('m-statement')}]")
+POLITIFACT_LISTICLE_ITEMS = etree.XPath(f"//li[{_has_class('o-listicle__item')}]")
+STATEMENT_QUOTE = etree.XPath(f".//*[{_has_class('m-statement__quote')}]")
+STATEMENT_LINK = etree.XPath(f".//*[{_has_class('m-statement__content')}]//a")
+STATEMENT_CONTENT_IMAGE = etree.XPath(f".//*[{_has_class('m-statement__content')}]//img")
+STATEMENT_METER_IMAGE = etree.XPath(f".//*[{_has_class('m-statement__meter')}]//img")
+STATEMENT_NAME = etree.XPath(f".//*[{_has_class('m-statement__meta')}]//*[{_has_class('m-statement__name')}]")
+STATEMENT_META_LINK = etree.XPath(f".//*[{_has_class('m-statement__meta')}]//a")
+STATEMENT_FOOTER = etree.XPath(f".//*[{_has_class('m-statement__footer')}]")
+POLITIFACT_ARTICLE_BODY = etree.XPath(f"(//article[{_has_class('m-textblock')}])[1]")
+
+SNOPES_ARTICLE_LINKS = etree.XPath(f"//a[{_has_class('outer_article_link_wrapper')}][@href]/@href")
+SNOPES_NEXT_BUTTON = etree.XPath(f"(//a[{_has_class('next-button')}])[1]")
+SNOPES_ARTICLE_FIELDS = {
+    # field: (tag, class or None for the first tag of that kind)
+    'title': ('h1', None),
+    'author': ('h3', 'author_name'),
+    'date': ('h3', 'publish_date'),
+    'claim': ('div', 'claim_cont'),
+    'raw_rating': ('div', 'rating_title_wrap'),
+}
+
+
+def parse_html(content):
+    """
+    Parse an HTML document with lxml.
+
+    Bytes are decoded the way BeautifulSoup does it (declared encoding, then
+    UTF-8, then Windows-1252), so both parsers see the same text.
+
+    Args:
+        content (bytes | str): The raw document.
+
+    Returns:
+        lxml.html.HtmlElement | None: The root element, or None for an empty document.
+    """
+    if isinstance(content, bytes):
+        content = UnicodeDammit(content, is_html=True).unicode_markup
+    if not content or not content.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(content)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml.html.document_fromstring(content.encode('utf-8'))
+    except etree.ParserError:
+        return None
+
+
+def iter_strings(element):
+    """Yield the text nodes under an element in document order, skipping comments and scripts."""
+    if element.text and element.tag not in NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        # Comments and processing instructions have a non-string tag
+        if isinstance(child.tag, str):
+            yield from iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def text(element):
+    """Equivalent of BeautifulSoup's ``tag.text``."""
+    return ''.join(iter_strings(element))
+
+
+def stripped_text(element):
+    """Equivalent of BeautifulSoup's ``tag.get_text(strip=True)``."""
+    return ''.join(string.strip() for string in iter_strings(element))
+
+
+def _first(selector, element):
+    found = selector(element)
+    return found[0] if found else None
+
+
+def _first_text(selector, element):
+    found = _first(selector, element)
+    return stripped_text(found) if found is not None else None
+
+
+def _first_attribute(selector, element, attribute):
+    found = _first(selector, element)
+    return found.get(attribute) if found is not None else None
+
+
+def extract_politifact_statements(content):
+    """
+    Extract every statement of a PolitiFact listing page.
+
+    Missing fields are None; callers pick their own placeholder.
+
+    Args:
+        content (bytes | str): The listing page.
+
+    Returns:
+        list[dict]: One dict per ``article.m-statement`` with 'claim', 'verdict',
+            'source' and 'link' (the raw href).
+    """
+    root = parse_html(content)
+    if root is None:
+        return []
+    return [{
+        'claim': _first_text(STATEMENT_QUOTE, article),
+        'verdict': _first_attribute(STATEMENT_METER_IMAGE, article, 'alt'),
+        'source': _first_text(STATEMENT_NAME, article),
+        'link': _first_attribute(STATEMENT_LINK, article, 'href'),
+    } for article in POLITIFACT_STATEMENTS(root)]
+
+
+def extract_politifact_listicle(content):
+    """
+    Extract every ``li.o-listicle__item`` of a PolitiFact listing page.
+
+    Args:
+        content (bytes | str): The listing page.
+
+    Returns:
+        list[dict]: 'statement', 'source', 'rating' and the raw 'footer' text of
+            each item, None where missing.
+    """
+    root = parse_html(content)
+    if root is None:
+        return []
+    return [{
+        'statement': _first_text(STATEMENT_QUOTE, item),
+        'source': _first_text(STATEMENT_META_LINK, item),
+        'rating': _first_attribute(STATEMENT_CONTENT_IMAGE, item, 'alt'),
+        'footer': _first_text(STATEMENT_FOOTER, item),
+    } for item in POLITIFACT_LISTICLE_ITEMS(root)]
+
+
+def extract_politifact_article_text(content):
+    """
+    Return the text of a PolitiFact article body: its ``<p>`` texts joined by spaces.
+
+    Args:
+        content (bytes | str): The article page.
+
+    Returns:
+        str | None: The body text, or None when the page has no ``article.m-textblock``.
+    """
+    root = parse_html(content)
+    article = _first(POLITIFACT_ARTICLE_BODY, root) if root is not None else None
+    if article is None:
+        return None
+    return ' '.join(text(p) for p in article.iter('p'))
+
+
+def extract_snopes_listing(content):
+    """
+    Extract the article links and the "Next" link of a Snopes listing page.
+
+    Args:
+        content (bytes | str): The listing page.
+
+    Returns:
+        tuple[list[str], str | None]: The raw article hrefs and the next page href.
+    """
+    root = parse_html(content)
+    if root is None:
+        return [], None
+    next_button = _first(SNOPES_NEXT_BUTTON, root)
+    return [str(href) for href in SNOPES_ARTICLE_LINKS(root)], next_button.get('href') if next_button is not None else None
+
+
+def extract_snopes_article(content):
+    """
+    Extract the fields of a Snopes fact check in a single pass over the document.
+
+    Args:
+        content (bytes | str): The article page.
+
+    Returns:
+        dict: 'title', 'author', 'date', 'claim' and 'raw_rating' (stripped text),
+            None where missing.
+    """
+    fields = dict.fromkeys(SNOPES_ARTICLE_FIELDS)
+    root = parse_html(content)
+    if root is None:
+        return fields
+
+    wanted = {tag: [] for tag, _ in SNOPES_ARTICLE_FIELDS.values()}
+    for field, (tag, class_name) in SNOPES_ARTICLE_FIELDS.items():
+        wanted[tag].append((field, class_name))
+
+    remaining = len(fields)
+    for element in root.iter(*wanted):
+        classes = None
+        for field, class_name in wanted[element.tag]:
+            if fields[field] is not None:
+                continue
+            if class_name is not None:
+                if classes is None:
+                    classes = element.get('class', '').split()
+                if class_name not in classes:
+                    continue
+            fields[field] = text(element).strip()
+            remaining -= 1
+        if not remaining:
+            break
+    return fields
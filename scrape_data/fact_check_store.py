@@ -0,0 +1,154 @@
+import csv
+import glob
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class FactCheckStore:
+    """
+    Append-only store for scraped fact checks.
+
+    The main CSV is never rewritten on the hot path: each ``append`` writes the new
+    records to a small segment file next to it and records their links in a SQLite
+    index, so a run does I/O proportional to the new articles only. ``compact``
+    later folds the segments back into the main CSV, newest first.
+
+    Layout for ``data/politifact_fact_checks.csv``:
+        data/politifact_fact_checks.csv                main file
+        data/politifact_fact_checks.segments/*.csv     appended segments
+        data/politifact_fact_checks.links.sqlite       link index
+
+    Args:
+        csv_path (str): Path of the main CSV file.
+        key (str): Column that identifies a record.
+    """
+
+    def __init__(self, csv_path, key='link'):
+        self.csv_path = csv_path
+        self.key = key
+        stem, _ = os.path.splitext(csv_path)
+        self.segment_dir = f'{stem}.segments'
+        self.index_path = f'{stem}.links.sqlite'
+        self._local = threading.local()
+        self._compact_lock = threading.Lock()
+        self._ensure_index()
+
+    # The connection is per thread and not picklable; only the paths are kept
+    def __getstate__(self):
+        return {'csv_path': self.csv_path, 'key': self.key}
+
+    def __setstate__(self, state):
+        self.__init__(state['csv_path'], state['key'])
+
+    @property
+    def conn(self):
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(self.index_path)
+        return self._local.conn
+
+    def _ensure_index(self):
+        # pandas is only needed off the hot path (first indexing, reads, compaction),
+        # so it is imported there to keep a scraper run with nothing new fast to start
+        import pandas as pd
+        os.makedirs(os.path.dirname(self.csv_path) or '.', exist_ok=True)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS links (link TEXT PRIMARY KEY) WITHOUT ROWID')
+        if self.conn.execute('SELECT 1 FROM links LIMIT 1').fetchone():
+            return
+
+        # First run against an existing archive: index it once
+        links = []
+        for path in [self.csv_path] + self.segments():
+            try:
+                links.extend(pd.read_csv(path, usecols=[self.key], encoding='utf-8')[self.key].dropna())
+            except (FileNotFoundError, pd.errors.EmptyDataError):
+                continue
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO links (link) VALUES (?)', ((link,) for link in links))
+        if links:
+            logging.info(f"Indexed {len(links)} existing links from {self.csv_path}")
+
+    def __contains__(self, link):
+        return self.conn.execute('SELECT 1 FROM links WHERE link = ?', (link,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM links').fetchone()[0]
+
+    def segments(self):
+        return sorted(glob.glob(os.path.join(self.segment_dir, '*.csv')))
+
+    def append(self, records):
+        """
+        Append the records whose link is not stored yet.
+
+        Args:
+            records (list[dict]): New fact checks, newest first.
+
+        Returns:
+            int: Number of records written.
+        """
+        new_records, seen = [], set()
+        for record in records:
+            link = record[self.key]
+            if link not in seen and link not in self:
+                seen.add(link)
+                new_records.append(record)
+        if not new_records:
+            return 0
+
+        os.makedirs(self.segment_dir, exist_ok=True)
+        segment_path = os.path.join(self.segment_dir, f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.csv")
+        # The segment only appears under its *.csv name once complete, so a concurrent
+        # compact never reads it half-written; the links are committed after that
+        tmp_path = f'{segment_path}.tmp'
+        with self.conn:
+            self.conn.executemany('INSERT INTO links (link) VALUES (?)', ((link,) for link in seen))
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=list(new_records[0].keys()))
+                writer.writeheader()
+                writer.writerows(new_records)
+            os.replace(tmp_path, segment_path)
+        return len(new_records)
+
+    def read_all(self):
+        """Return every stored record, newest first, as a DataFrame."""
+        import pandas as pd
+        frames = [pd.read_csv(path, encoding='utf-8') for path in reversed(self.segments())]
+        if os.path.exists(self.csv_path):
+            try:
+                frames.append(pd.read_csv(self.csv_path, encoding='utf-8'))
+            except pd.errors.EmptyDataError:
+                pass
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def compact(self):
+        """
+        Fold the current segments into the main CSV (newest first) and remove them.
+
+        Returns:
+            int: Number of segments compacted.
+        """
+        import pandas as pd
+        with self._compact_lock:
+            segments = self.segments()
+            if not segments:
+                return 0
+
+            frames = [pd.read_csv(path, encoding='utf-8') for path in reversed(segments)]
+            if os.path.exists(self.csv_path):
+                try:
+                    frames.append(pd.read_csv(self.csv_path, encoding='utf-8'))
+                except pd.errors.EmptyDataError:
+                    pass
+            combined_df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=[self.key], keep='first')
+
+            tmp_path = f'{self.csv_path}.tmp'
+            combined_df.to_csv(tmp_path, index=False, encoding='utf-8')
+            os.replace(tmp_path, self.csv_path)
+            for path in segments:
+                os.remove(path)
+
+            logging.info(f"Compacted {len(segments)} segments into {self.csv_path}")
+            return len(segments)
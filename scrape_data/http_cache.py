@@ -0,0 +1,218 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, namedtuple
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_CACHE_PATH = os.path.join(DATA_FOLDER, 'http_cache.sqlite')
+# Compressed bytes kept before the least recently used responses are evicted
+DEFAULT_MAX_BYTES = 512 * 2 ** 20
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'last_modified'])
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode for a URL that is not in the cache."""
+
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP response bodies for the scrapers.
+
+    Bodies are stored zlib-compressed in SQLite with their ``ETag`` and
+    ``Last-Modified`` headers, which the fetchers send back as ``If-None-Match``
+    and ``If-Modified-Since``; a ``304 Not Modified`` answer is served from the
+    cache. When the stored bodies exceed ``max_bytes`` the least recently used
+    responses are evicted.
+
+    In offline mode the fetchers never touch the network: cached URLs are
+    replayed and any other URL raises ``CacheMiss``. This allows re-running the
+    parsers over everything crawled before.
+
+    Args:
+        path (str): Path of the SQLite file; created if missing.
+        max_bytes (int): Size bound of the compressed bodies.
+        offline (bool): Serve only from the cache.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = Counter()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Shared by the event loop and the Prefect task threads, hence the lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)')
+        self._size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def get(self, url):
+        """Return the cached response for ``url``, or None."""
+        with self._lock, self.conn:
+            row = self.conn.execute('SELECT body, etag, last_modified FROM responses WHERE url = ?',
+                                    (url,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('UPDATE responses SET last_used = ? WHERE url = ?', (time.time(), url))
+        body, etag, last_modified = row
+        return CachedResponse(zlib.decompress(body), etag, last_modified)
+
+    def put(self, url, body, headers):
+        """Store a 200 response; ``headers`` is the response's header mapping."""
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock, self.conn:
+            previous = self.conn.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self.conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                              (url, compressed, len(compressed), headers.get('ETag'), headers.get('Last-Modified'),
+                               now, now))
+            self._size += len(compressed) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+        self.stats['stored'] += 1
+
+    def _evict(self):
+        # Drop the least recently used responses until the cache is 90% full
+        target = self.max_bytes * 0.9
+        evicted = 0
+        rows = self.conn.execute('SELECT url, size FROM responses ORDER BY last_used').fetchall()
+        for url, size in rows:
+            if self._size <= target:
+                break
+            self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._size -= size
+            evicted += 1
+        self.stats['evicted'] += evicted
+
+    @staticmethod
+    def revalidation_headers(entry):
+        """Conditional request headers for a cached response (empty without validators)."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def report(self):
+        return (f"HTTP cache: {self.stats['replayed']} replayed, {self.stats['not_modified']} not modified, "
+                f"{self.stats['stored']} stored, {self.stats['evicted']} evicted "
+                f"({self._size / 2 ** 20:.1f} MiB in {self.path})")
+
+
+def open_cache(path=DEFAULT_CACHE_PATH, offline=False):
+    """Open the response cache for a scraper run; None when ``path`` is None and the run is online."""
+    if path is None:
+        if offline:
+            raise ValueError("Offline mode needs a response cache")
+        return None
+    return ResponseCache(path, offline=offline)
+
+
+class CachedSession:
+    """
+    Synchronous fetcher over a pooled ``requests.Session``, with an optional
+    ``ResponseCache`` and retries on connection errors and 429/5xx responses.
+    It can be shared by threads; the delay then applies across all of them.
+
+    Args:
+        cache (ResponseCache, optional): Response cache; None fetches everything.
+        delay (float): Minimum seconds between two network requests. Responses
+            replayed from the cache are not delayed.
+        pool_size (int): Keep-alive connections kept per host.
+        timeout (float): Request timeout in seconds.
+        retries (int): Retries of a failed request.
+        headers (dict, optional): Headers sent with every request.
+    """
+
+    def __init__(self, cache=None, delay=0.0, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, headers=None):
+        # Imported here: the asyncio scrapers use the cache but never this session
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.cache = cache
+        self.delay = delay
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=RETRY_STATUSES,
+                                                respect_retry_after_header=True))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self._last_request = 0.0
+        self._throttle = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def fetch(self, url):
+        """
+        Fetch a URL and return the raw response body.
+
+        Raises:
+            requests.RequestException: The request failed or returned an error status.
+            CacheMiss: Offline mode and ``url`` is not cached.
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if self.cache is not None and self.cache.offline:
+            if entry is None:
+                raise CacheMiss(url)
+            self.cache.stats['replayed'] += 1
+            return entry.body
+
+        with self._throttle:
+            wait = self._last_request + self.delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+        response = self.session.get(url, headers=ResponseCache.revalidation_headers(entry), timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            self.cache.stats['not_modified'] += 1
+            return entry.body
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.put(url, response.content, response.headers)
+        return response.content
@@ -0,0 +1,173 @@
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import Counter
+
+# Stages timed by the scrapers
+FETCH = 'fetch'
+PARSE = 'parse'
+SUMMARIZE = 'summarize'
+CSV_IO = 'csv_io'
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+class RunMetrics:
+    """
+    Counters and per-stage timings of one scraper run.
+
+    Stages are timed with ``time(stage)``; work done in a process pool records
+    into its own ``RunMetrics`` that is returned with the result and folded in
+    with ``merge``. Export with ``to_json`` or ``to_prometheus``, or ``write``
+    to a file whose extension (.json or .prom) selects the format.
+
+        metrics = RunMetrics()
+        with metrics.time(FETCH):
+            content = fetch(url)
+        metrics.incr('bytes', len(content))
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    # The lock is not picklable; metrics travel back from pool workers by value
+    def __getstate__(self):
+        return {'counters': self.counters, 'seconds': self.seconds, 'calls': self.calls, 'started': self.started}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, stage, seconds, calls=1):
+        with self._lock:
+            self.seconds[stage] += seconds
+            self.calls[stage] += calls
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def merge(self, other):
+        with self._lock:
+            self.counters.update(other.counters)
+            self.seconds.update(other.seconds)
+            self.calls.update(other.calls)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'started': self.started,
+                'wall_seconds': time.time() - self.started,
+                'counters': dict(self.counters),
+                'stages': {stage: {'seconds': self.seconds[stage], 'calls': self.calls[stage]}
+                           for stage in sorted(self.seconds)},
+            }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_prometheus(self, namespace='scraper'):
+        """Render the metrics in the Prometheus text exposition format (e.g. for the node_exporter textfile collector)."""
+        data = self.as_dict()
+        lines = [
+            f'# HELP {namespace}_run_wall_seconds Wall time of the run.',
+            f'# TYPE {namespace}_run_wall_seconds gauge',
+            f'{namespace}_run_wall_seconds {data["wall_seconds"]:.6f}',
+            f'# HELP {namespace}_stage_seconds_total Time spent in each stage, summed over calls.',
+            f'# TYPE {namespace}_stage_seconds_total counter',
+        ]
+        lines += [f'{namespace}_stage_seconds_total{{stage="{stage}"}} {values["seconds"]:.6f}'
+                  for stage, values in data['stages'].items()]
+        lines += [
+            f'# HELP {namespace}_stage_calls_total Number of timed calls of each stage.',
+            f'# TYPE {namespace}_stage_calls_total counter',
+        ]
+        lines += [f'{namespace}_stage_calls_total{{stage="{stage}"}} {values["calls"]}'
+                  for stage, values in data['stages'].items()]
+        for name, value in sorted(data['counters'].items()):
+            lines += [f'# TYPE {namespace}_{name}_total counter', f'{namespace}_{name}_total {value}']
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, namespace='scraper'):
+        """Write the metrics to ``path``: Prometheus text for a .prom file, JSON otherwise."""
+        content = self.to_prometheus(namespace) if path.endswith('.prom') else self.to_json()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Written then renamed, so a collector never reads a partial file
+        with open(f'{path}.tmp', 'w') as f:
+            f.write(content)
+        os.replace(f'{path}.tmp', path)
+
+    def log_summary(self):
+        data = self.as_dict()
+        logging.info(f"Run took {data['wall_seconds']:.2f}s")
+        for stage, values in data['stages'].items():
+            logging.info(f"  {stage:<10} {values['seconds']:8.2f}s over {values['calls']} calls")
+        if data['counters']:
+            logging.info("  " + ", ".join(f"{name}={value}" for name, value in sorted(data['counters'].items())))
+
+
+@contextlib.contextmanager
+def profile_run(profiler, output_path):
+    """
+    Profile the enclosed block with cProfile or pyinstrument.
+
+    cProfile writes a .pstats file (open it with ``python -m pstats`` or snakeviz)
+    and logs the top functions by cumulative time; pyinstrument writes an HTML
+    report. Only the calling process is profiled: time spent in pool workers
+    shows up as waiting, and is broken down by the ``RunMetrics`` stages instead.
+
+    Args:
+        profiler (str): 'cprofile', 'pyinstrument' or None to disable profiling.
+        output_path (str): Report path without extension.
+    """
+    if not profiler:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("pyinstrument profiling requires: pip install pyinstrument")
+        profile = Profiler(async_mode='enabled')
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            with open(f'{output_path}.html', 'w') as f:
+                f.write(profile.output_html())
+            logging.info(f"Saved pyinstrument report to {output_path}.html")
+        return
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(f'{output_path}.pstats')
+        top = io.StringIO()
+        pstats.Stats(profile, stream=top).sort_stats('cumulative').print_stats(15)
+        logging.info(f"Saved cProfile stats to {output_path}.pstats\n{top.getvalue()}")
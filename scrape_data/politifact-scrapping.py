@@ -1,57 +1,176 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import bisect
 import csv
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import requests
+from extraction import extract_politifact_listicle
+from http_cache import DEFAULT_CACHE_PATH, CachedSession, open_cache
 
-def safe_extract(element, selector, attribute=None):
-    try:
-        found = element.select_one(selector)
-        if found:
-            return found.get(attribute) if attribute else found.get_text(strip=True)
-    except:
-        pass
-    return ""
-
-def scrape_politifact(max_pages=5):
-    base_url = "https://www.politifact.com/factchecks/list/"
+BASE_URL = "https://www.politifact.com/factchecks/list/"
+# Listing pages fetched at once by the date-range mode
+DEFAULT_WORKERS = 4
+
+
+def parse_listing_page(content):
     fact_checks = []
+    for item in extract_politifact_listicle(content):
+        statement = item['statement'] or ""
+        source = item['source'] or ""
+        rating = item['rating'] or ""
+
+        footer = item['footer'] or ""
+        author, date_str = "", ""
+        if '•' in footer:
+            author, date_str = footer.split('•')
+        else:
+            date_str = footer
+
+        author = author.strip()
+        date_str = date_str.strip()
+
+        try:
+            date = datetime.strptime(date_str, '%B %d, %Y')
+            date_formatted = date.strftime('%Y-%m-%d')
+        except:
+            date_formatted = date_str
+
+        fact_checks.append({
+            'statement': statement,
+            'source': source,
+            'author': author,
+            'date': date_formatted,
+            'rating': rating
+        })
+    return fact_checks
 
-    for page in range(1, max_pages + 1):
-        url = f"{base_url}?page={page}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        for article in soup.find_all('li', class_='o-listicle__item'):
-            statement = safe_extract(article, '.m-statement__quote')
-            source = safe_extract(article, '.m-statement__meta a')
-            rating = safe_extract(article, '.m-statement__content img', 'alt')
-
-            footer = safe_extract(article, '.m-statement__footer')
-            author, date_str = "", ""
-            if '•' in footer:
-                author, date_str = footer.split('•')
-            else:
-                date_str = footer
-
-            author = author.strip()
-            date_str = date_str.strip()
-
-            try:
-                date = datetime.strptime(date_str, '%B %d, %Y')
-                date_formatted = date.strftime('%Y-%m-%d')
-            except:
-                date_formatted = date_str
-
-            fact_checks.append({
-                'statement': statement,
-                'source': source,
-                'author': author,
-                'date': date_formatted,
-                'rating': rating
-            })
+def scrape_politifact(max_pages=5, session=None, base_url=BASE_URL):
+    fact_checks = []
+    # A session passed in belongs to the caller; one created here is closed here
+    with nullcontext(session) if session else CachedSession() as session:
+        for page in range(1, max_pages + 1):
+            url = f"{base_url}?page={page}"
+            fact_checks.extend(parse_listing_page(session.fetch(url)))
 
     return fact_checks
 
+def item_date(fact_check):
+    """Return the date of a parsed fact check, or None when its footer had no date."""
+    try:
+        return datetime.strptime(fact_check['date'], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+class ListingPages:
+    """
+    Parsed PolitiFact listing pages, each fetched at most once.
+
+    Pages past the end of the archive (404) are empty. ``fetches`` counts the
+    pages requested so far.
+    """
+
+    def __init__(self, session, base_url=BASE_URL):
+        self.session = session
+        self.base_url = base_url
+        self.pages = {}
+        self.fetches = 0
+
+    def _fetch(self, page):
+        try:
+            return self.session.fetch(f"{self.base_url}?page={page}")
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+    def fetch_all(self, pages, workers=DEFAULT_WORKERS):
+        """Fetch the pages that are not loaded yet in parallel and parse them."""
+        missing = [page for page in pages if page not in self.pages]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for page, content in zip(missing, executor.map(self._fetch, missing)):
+                self.pages[page] = parse_listing_page(content) if content is not None else []
+        self.fetches += len(missing)
+        return [self.pages[page] for page in pages]
+
+    def dates(self, page):
+        """Return the dates of the fact checks listed on ``page``."""
+        fact_checks, = self.fetch_all([page])
+        return [date for date in map(item_date, fact_checks) if date is not None]
+
+
+def find_page_window(pages, start_date, end_date):
+    """
+    Find the listing pages covering a date window by binary search.
+
+    Listings are newest first, so the dates decrease with the page number. The
+    end of the search range is found by doubling the page number until a page
+    is older than the window (or empty); then the first page reaching back to
+    ``end_date`` and the first page entirely before ``start_date`` are bisected.
+    Only O(log n) pages are fetched.
+
+    Args:
+        pages (ListingPages): The listing pages.
+        start_date (date): First day of the window.
+        end_date (date): Last day of the window.
+
+    Returns:
+        tuple[int, int]: First and last page of the window; the last page is
+            smaller than the first when no fact check falls in the window.
+    """
+    def reaches_end(page):
+        dates = pages.dates(page)
+        return not dates or min(dates) <= end_date
+
+    def before_start(page):
+        dates = pages.dates(page)
+        return not dates or max(dates) < start_date
+
+    upper = 1
+    while not before_start(upper):
+        upper *= 2
+
+    candidates = range(1, upper + 1)
+    first = candidates[bisect.bisect_left(candidates, True, key=reaches_end)]
+    candidates = range(first, upper + 1)
+    last = candidates[bisect.bisect_left(candidates, True, key=before_start)] - 1
+    return first, last
+
+def scrape_politifact_date_range(start_date, end_date, session=None, base_url=BASE_URL, workers=DEFAULT_WORKERS):
+    """
+    Scrape the fact checks published between two dates, both included.
+
+    Instead of walking the listing from page 1, the pages covering the window are
+    located by binary search over the page numbers (see ``find_page_window``) and
+    then fetched in parallel.
+
+    Args:
+        start_date (date): First day of the window.
+        end_date (date): Last day of the window.
+        session (CachedSession, optional): Fetcher; a new uncached one by default.
+        base_url (str): The listing URL.
+        workers (int): Listing pages fetched at once.
+
+    Returns:
+        tuple[list[dict], dict]: The fact checks, newest first, and the 'first_page',
+            'last_page', 'search_fetches' and 'fetches' of the run.
+    """
+    with nullcontext(session) if session else CachedSession() as session:
+        pages = ListingPages(session, base_url)
+        first, last = find_page_window(pages, start_date, end_date)
+        search_fetches = pages.fetches
+
+        fact_checks = []
+        for listed in pages.fetch_all(list(range(first, last + 1)), workers):
+            for fact_check in listed:
+                date = item_date(fact_check)
+                if date is not None and start_date <= date <= end_date:
+                    fact_checks.append(fact_check)
+
+    stats = {'first_page': first, 'last_page': last, 'search_fetches': search_fetches, 'fetches': pages.fetches}
+    return fact_checks, stats
+
 def save_to_csv(fact_checks, filename):
     with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['statement', 'source', 'author', 'date', 'rating']
@@ -64,70 +183,35 @@ def save_to_csv(fact_checks, filename):
     print(f"Data saved to {filename}")
 
 if __name__ == "__main__":
-    fact_checks = scrape_politifact(max_pages=5)
+    parser = argparse.ArgumentParser(description="Scrape PolitiFact listing pages.")
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--start-date', type=datetime.fromisoformat,
+                        help="Scrape the fact checks from this date (YYYY-MM-DD) instead of the first --pages pages")
+    parser.add_argument('--end-date', type=datetime.fromisoformat, default=datetime.now(),
+                        help="Last date scraped with --start-date (default: today)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Listing pages fetched at once")
+    parser.add_argument('--base-url', default=BASE_URL, help="Listing URL, e.g. of a local stand-in")
+    parser.add_argument('--http-cache', default=DEFAULT_CACHE_PATH, help="HTTP response cache file")
+    parser.add_argument('--no-http-cache', action='store_true', help="Fetch every page from the network")
+    parser.add_argument('--offline', action='store_true', help="Replay pages from the HTTP cache only")
+    args = parser.parse_args()
+
+    cache = open_cache(None if args.no_http_cache else args.http_cache, args.offline)
+    with CachedSession(cache) as session:
+        if args.start_date:
+            start_date, end_date = args.start_date.date(), args.end_date.date()
+            fact_checks, stats = scrape_politifact_date_range(start_date, end_date, session, args.base_url,
+                                                              args.workers)
+            print(f"Pages {stats['first_page']}-{stats['last_page']} cover {start_date} to {end_date}: "
+                  f"fetched {stats['fetches']} listing pages ({stats['search_fetches']} to locate them)")
+            filename = f"politifact_factchecks_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"
+        else:
+            fact_checks = scrape_politifact(max_pages=args.pages, session=session, base_url=args.base_url)
+            filename = f"politifact_factchecks_{datetime.now().strftime('%Y%m%d')}.csv"
+    if cache is not None:
+        print(cache.report())
+        cache.close()
 
-    filename = f"politifact_factchecks_{datetime.now().strftime('%Y%m%d')}.csv"
     save_to_csv(fact_checks, filename)
 
     print(f"Scraped {len(fact_checks)} fact checks from PolitiFact")
-
-# import requests
-# from bs4 import BeautifulSoup
-# import pandas as pd
-# from datetime import datetime
-# import pyarrow as pa
-# import pyarrow.parquet as pq
-
-# def scrape_politifact(start_date, end_date, max_pages=10):
-#     base_url = "https://www.politifact.com/factchecks/list/"
-#     fact_checks = []
-
-#     for page in range(1, max_pages + 1):
-#         url = f"{base_url}?page={page}"
-#         response = requests.get(url)
-#         soup = BeautifulSoup(response.content, 'html.parser')
-
-#         for article in soup.find_all('li', class_='o-listicle__item'):
-#             footer_text = article.find('div', class_='m-statement__body').find('footer').text.strip()
-
-#             # Extract only the date part
-#             date_str = footer_text.split('•')[-1].strip()
-#             date = datetime.strptime(date_str, '%B %d, %Y')  # Use '%B' for full month name
-
-#             if start_date <= date <= end_date:
-#                 statement = article.find('div', class_='m-statement__quote').text.strip()
-#                 source = article.find('div', class_='m-statement__meta').find('a').text.strip()
-#                 rating = article.find('div', class_='m-statement__content').find('img')['alt']
-
-#                 fact_checks.append({
-#                     'statement': statement,
-#                     'source': source,
-#                     'date': date,
-#                     'rating': rating
-#                 })
-#             elif date < start_date:
-#                 return fact_checks  # Stop if we've gone past the start date
-
-#     return fact_checks
-
-
-# def save_to_parquet(fact_checks, filename):
-#     df = pd.DataFrame(fact_checks)
-#     table = pa.Table.from_pandas(df)
-#     pq.write_table(table, filename)
-#     print(f"Data saved to {filename}")
-
-# if __name__ == "__main__":
-#     # Example: Scrape data from 2014 to 2016
-#     start_date = datetime(2020, 1, 1)
-#     end_date = datetime(2024, 9, 15)
-
-#     fact_checks = scrape_politifact(start_date, end_date)
-
-#     filename = f"politifact_factchecks_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.parquet"
-#     save_to_parquet(fact_checks, filename)
-
-#     print(f"Scraped {len(fact_checks)} fact checks from PolitiFact")
-
-
-
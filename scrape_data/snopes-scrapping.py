@@ -1,15 +1,26 @@
+import argparse
+import asyncio
+import os
+import sqlite3
 import requests
-from bs4 import BeautifulSoup
 import logging
 import csv
 import re
-import time
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urljoin
+from async_fetch import AsyncFetcher, DEFAULT_RATE_PER_HOST
+from http_cache import DEFAULT_CACHE_PATH, CacheMiss, CachedSession, open_cache
+from extraction import extract_snopes_article, extract_snopes_listing
+
+FIELDNAMES = ['title', 'author', 'date', 'claim', 'rating']
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def scrape_snopes_fact_check_urls(base_url, num_pages=2):
+# Seconds between two network requests of the sequential scraper, to be respectful to the website
+SEQUENTIAL_DELAY = 2
+
+def scrape_snopes_fact_check_urls(session, base_url, num_pages=2):
     all_article_links = []
     current_page = 1
     next_page_url = base_url
@@ -17,37 +28,27 @@ def scrape_snopes_fact_check_urls(base_url, num_pages=2):
     while next_page_url and current_page <= num_pages:
         logging.info(f"Scraping page {current_page}: {next_page_url}")
         try:
-            response = requests.get(next_page_url)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            logging.error(f"Error fetching page {current_page}: {e}")
+            content = session.fetch(next_page_url)
+        except (requests.RequestException, CacheMiss) as e:
+            logging.error(f"Error fetching page {current_page}: {e!r}")
             break
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        article_links = [urljoin(base_url, link['href']) for link in soup.find_all('a', class_='outer_article_link_wrapper', href=True)]
+        article_links, next_page_url = parse_listing_page(content, base_url)
         all_article_links.extend(article_links)
         logging.info(f"Found {len(article_links)} URLs on page {current_page}")
 
-        # Check for the "Next" button to proceed to the next page
-        next_button = soup.find('a', class_='next-button')
-        if next_button and 'href' in next_button.attrs:
-            next_page_url = urljoin(base_url, next_button['href'])  # Get the URL of the next page
+        # Follow the "Next" button to the next page, if there is one
+        if next_page_url:
             current_page += 1
-        else:
-            next_page_url = None  # No more pages to scrape
-
-        time.sleep(2)  # Be respectful to the website
 
     logging.info(f"Total {len(all_article_links)} URLs found across {num_pages} pages")
     return all_article_links
 
-def fetch_article_html(url):
+def fetch_article_html(session, url):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        logging.error(f"Error fetching the article: {e}")
+        return session.fetch(url)
+    except (requests.RequestException, CacheMiss) as e:
+        logging.error(f"Error fetching the article: {e!r}")
         return None
 
 def clean_rating(rating_text):
@@ -59,28 +60,15 @@ def clean_rating(rating_text):
     return 'N/A'
 
 def extract_article_data(article_html):
-    soup = BeautifulSoup(article_html, 'html.parser')
-
-    title = soup.find('h1').text.strip() if soup.find('h1') else 'N/A'
-    author = soup.find('h3', class_='author_name').text.strip() if soup.find('h3', class_='author_name') else 'N/A'
-    date = soup.find('h3', class_='publish_date').text.strip() if soup.find('h3', class_='publish_date') else 'N/A'
-    claim = soup.find('div', class_='claim_cont').text.strip() if soup.find('div', class_='claim_cont') else 'N/A'
-    raw_rating = soup.find('div', class_='rating_title_wrap').text.strip() if soup.find('div', class_='rating_title_wrap') else 'N/A'
-    rating = clean_rating(raw_rating)
-
-    return {
-        'title': title,
-        'author': author,
-        'date': date,
-        'claim': claim,
-        'rating': rating
-    }
+    fields = {field: value if value is not None else 'N/A'
+              for field, value in extract_snopes_article(article_html).items()}
+    rating = clean_rating(fields.pop('raw_rating'))
+    return {**fields, 'rating': rating}
 
 def save_to_csv(data, filename):
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['title', 'author', 'date', 'claim', 'rating']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
             writer.writeheader()
             for row in data:
                 writer.writerow(row)
@@ -88,27 +76,288 @@ def save_to_csv(data, filename):
     except IOError as e:
         logging.error(f"Error saving data to CSV: {e}")
 
-def main():
-    base_url = "https://www.snopes.com/fact-check/"
-    output_file = "snopes_factchecks_data.csv"
-    num_pages = 8 # Set number of pages to scrape
-
-    urls = scrape_snopes_fact_check_urls(base_url, num_pages)
-    all_article_data = []
-
-    logging.info(f"Starting to scrape {len(urls)} articles")
-    for i, url in enumerate(urls, 1):
-        logging.info(f"Scraping article {i} of {len(urls)}")
-        article_html = fetch_article_html(url)
-        if article_html:
-            article_data = extract_article_data(article_html)
-            all_article_data.append(article_data)
-            time.sleep(2)  # Be respectful to the website
-        else:
-            logging.error(f"Failed to fetch the article from {url}. Skipping.")
+def parse_listing_page(content, base_url):
+    links, next_href = extract_snopes_listing(content)
+    article_links = [urljoin(base_url, link) for link in links]
+    next_page_url = urljoin(base_url, next_href) if next_href is not None else None
+    return article_links, next_page_url
+
+
+class CrawlCheckpoint:
+    """
+    Crawl state kept in SQLite so a restarted crawl resumes where it stopped.
+
+    Tracks the next listing page to fetch, the article URLs queued but not yet
+    saved (``pending``) and those already saved (``visited``). Everything lives on
+    disk, so memory does not grow with the size of the crawl.
+
+    ``csv_size`` is the size of the output file once the last visited article was
+    written (once its header was, before the first article). A crash between writing a record and marking its article visited
+    leaves a row past that size, which a resumed crawl truncates before fetching
+    the (still pending) article again.
+    """
+
+    def __init__(self, path, base_url):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS pending (url TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY) WITHOUT ROWID;
+        """)
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO state VALUES ('next_page_url', ?)", (base_url,))
+            self.conn.execute("INSERT OR IGNORE INTO state VALUES ('pages_done', '0')")
+            self.conn.execute("INSERT OR IGNORE INTO state VALUES ('csv_size', NULL)")
+
+    def close(self):
+        self.conn.close()
+
+    def _get(self, key):
+        return self.conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()[0]
+
+    @property
+    def next_page_url(self):
+        return self._get('next_page_url')
+
+    @property
+    def pages_done(self):
+        return int(self._get('pages_done'))
+
+    @property
+    def csv_size(self):
+        size = self._get('csv_size')
+        return int(size) if size is not None else None
+
+    @csv_size.setter
+    def csv_size(self, size):
+        with self.conn:
+            self.conn.execute("UPDATE state SET value = ? WHERE key = 'csv_size'", (str(size),))
+
+    def page_done(self, urls, next_page_url):
+        # Queue the page's new articles and advance the cursor atomically
+        with self.conn:
+            for url in urls:
+                if not self.conn.execute('SELECT 1 FROM visited WHERE url = ?', (url,)).fetchone():
+                    self.conn.execute('INSERT OR IGNORE INTO pending VALUES (?)', (url,))
+            self.conn.execute("UPDATE state SET value = ? WHERE key = 'next_page_url'", (next_page_url,))
+            self.conn.execute("UPDATE state SET value = ? WHERE key = 'pages_done'", (str(self.pages_done + 1),))
+
+    def is_pending(self, url):
+        return self.conn.execute('SELECT 1 FROM pending WHERE url = ?', (url,)).fetchone() is not None
+
+    def iter_pending(self, batch_size=500):
+        last = ''
+        while True:
+            rows = self.conn.execute('SELECT url FROM pending WHERE url > ? ORDER BY url LIMIT ?',
+                                     (last, batch_size)).fetchall()
+            if not rows:
+                return
+            for (url,) in rows:
+                yield url
+            last = rows[-1][0]
+
+    def article_done(self, url, csv_size):
+        with self.conn:
+            self.conn.execute('DELETE FROM pending WHERE url = ?', (url,))
+            self.conn.execute('INSERT OR IGNORE INTO visited VALUES (?)', (url,))
+            self.conn.execute("UPDATE state SET value = ? WHERE key = 'csv_size'", (str(csv_size),))
+
+
+class IncrementalCSVWriter:
+    """Append records to a CSV as they arrive, writing the header only for a new file."""
+
+    def __init__(self, filename):
+        is_new = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        self.file = open(filename, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES)
+        if is_new:
+            self.writer.writeheader()
+            self.file.flush()
+
+    @property
+    def size(self):
+        return self.file.tell()
+
+    def write(self, record):
+        """Append a record and return the size of the file after it."""
+        self.writer.writerow(record)
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+async def produce_article_urls(fetcher, checkpoint, queue, num_pages):
+    # Articles left over from an interrupted run go first
+    resumed = 0
+    for url in checkpoint.iter_pending():
+        await queue.put(url)
+        resumed += 1
+    if resumed:
+        logging.info(f"Resuming {resumed} pending articles")
+
+    while checkpoint.next_page_url and checkpoint.pages_done < num_pages:
+        page_url = checkpoint.next_page_url
+        current_page = checkpoint.pages_done + 1
+        logging.info(f"Scraping page {current_page}: {page_url}")
+        try:
+            content = await fetcher.fetch(page_url)
+        except Exception as e:
+            logging.error(f"Error fetching page {current_page}: {e}")
+            break
+
+        article_links, next_page_url = parse_listing_page(content, page_url)
+        checkpoint.page_done(article_links, next_page_url)
+        logging.info(f"Found {len(article_links)} URLs on page {current_page}")
+        for url in article_links:
+            if checkpoint.is_pending(url):
+                await queue.put(url)
+
+
+async def fetch_and_save_article(fetcher, checkpoint, writer, executor, url):
+    article_html = await fetcher.fetch(url)
+    loop = asyncio.get_running_loop()
+    article_data = await loop.run_in_executor(executor, extract_article_data, article_html)
+    # No await between the two, so every other row in the file is already recorded as done
+    csv_size = writer.write(article_data)
+    checkpoint.article_done(url, csv_size)
+
+
+async def article_worker(fetcher, checkpoint, queue, writer, executor, counters, in_flight):
+    while True:
+        url = await queue.get()
+        try:
+            if url is None:
+                return
+            # A URL can be queued twice (resumed and seen again on a listing page)
+            if url in in_flight or not checkpoint.is_pending(url):
+                continue
+            in_flight.add(url)
+            try:
+                await fetch_and_save_article(fetcher, checkpoint, writer, executor, url)
+                counters['saved'] += 1
+                logging.info(f"Scraped article {counters['saved']}: {url}")
+            except Exception as e:
+                # Left pending, so the next run retries it
+                logging.error(f"Failed to scrape the article from {url}: {e}. Skipping.")
+            finally:
+                in_flight.discard(url)
+        finally:
+            queue.task_done()
+
+
+async def crawl(base_url, output_file, num_pages, workers=4, rate_per_host=DEFAULT_RATE_PER_HOST,
+                queue_size=100, checkpoint_path=None, cache=None, resume=False):
+    """
+    Stream Snopes listing pages into a bounded work queue and fetch the articles
+    with a pool of workers, appending each record to ``output_file`` as soon as
+    it is extracted.
+
+    Crawl state is checkpointed to ``checkpoint_path`` (by default next to the
+    output file). With ``resume`` an interrupted crawl continues from it and keeps
+    appending to ``output_file``; otherwise both are started afresh.
+
+    Args:
+        base_url (str): The first listing page.
+        output_file (str): CSV file the records are appended to.
+        num_pages (int): Total number of listing pages to crawl, across resumes.
+        workers (int): Number of concurrent article workers.
+        rate_per_host (float): Requests per second allowed per host.
+        queue_size (int): Maximum number of article URLs waiting to be fetched.
+        checkpoint_path (str, optional): Path of the SQLite checkpoint.
+        cache (ResponseCache, optional): HTTP response cache shared by all fetches.
+        resume (bool): Continue the crawl recorded in the checkpoint.
+
+    Returns:
+        int: Number of articles saved by this run.
+    """
+    checkpoint_path = checkpoint_path or f'{output_file}.checkpoint.sqlite'
+    if not resume:
+        for path in (checkpoint_path, output_file):
+            if os.path.exists(path):
+                os.remove(path)
+    checkpoint = CrawlCheckpoint(checkpoint_path, base_url)
+    if checkpoint.csv_size is not None and os.path.exists(output_file) \
+            and os.path.getsize(output_file) > checkpoint.csv_size:
+        logging.info(f"Dropping records written after the last checkpoint from {output_file}")
+        os.truncate(output_file, checkpoint.csv_size)
+    writer = IncrementalCSVWriter(output_file)
+    if checkpoint.csv_size is None:
+        # A crawl that crashes before its first article is done resumes from the header
+        checkpoint.csv_size = writer.size
+    queue = asyncio.Queue(maxsize=queue_size)
+    counters = {'saved': 0}
+    in_flight = set()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            async with AsyncFetcher(concurrency=workers, rate_per_host=rate_per_host, cache=cache) as fetcher:
+                worker_tasks = [
+                    asyncio.create_task(article_worker(fetcher, checkpoint, queue, writer, executor, counters, in_flight))
+                    for _ in range(workers)
+                ]
+                try:
+                    await produce_article_urls(fetcher, checkpoint, queue, num_pages)
+                finally:
+                    for _ in worker_tasks:
+                        await queue.put(None)
+                    await asyncio.gather(*worker_tasks)
+    finally:
+        writer.close()
+        checkpoint.close()
+    return counters['saved']
+
+
+def main_sequential(base_url, output_file, num_pages, cache=None):
+    # Network requests are spaced by the session; pages replayed from the cache are not
+    with CachedSession(cache, delay=SEQUENTIAL_DELAY) as session:
+        urls = scrape_snopes_fact_check_urls(session, base_url, num_pages)
+        all_article_data = []
+
+        logging.info(f"Starting to scrape {len(urls)} articles")
+        for i, url in enumerate(urls, 1):
+            logging.info(f"Scraping article {i} of {len(urls)}")
+            article_html = fetch_article_html(session, url)
+            if article_html:
+                article_data = extract_article_data(article_html)
+                all_article_data.append(article_data)
+            else:
+                logging.error(f"Failed to fetch the article from {url}. Skipping.")
 
     save_to_csv(all_article_data, output_file)
     logging.info(f"Scraping completed. {len(all_article_data)} articles scraped and saved.")
 
+def main():
+    parser = argparse.ArgumentParser(description="Crawl Snopes fact checks.")
+    parser.add_argument('--output', default="snopes_factchecks_data.csv")
+    parser.add_argument('--pages', type=int, default=8, help="Number of listing pages to crawl")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent article fetches")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE_PER_HOST, help="Requests per second per host")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <output>.checkpoint.sqlite)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted crawl from its checkpoint instead of starting afresh")
+    parser.add_argument('--sequential', action='store_true',
+                        help="Use the original sequential scraper and write the CSV at the end")
+    parser.add_argument('--http-cache', default=DEFAULT_CACHE_PATH, help="HTTP response cache file")
+    parser.add_argument('--no-http-cache', action='store_true', help="Fetch every page from the network")
+    parser.add_argument('--offline', action='store_true', help="Replay pages from the HTTP cache only")
+    args = parser.parse_args()
+
+    base_url = "https://www.snopes.com/fact-check/"
+    cache = open_cache(None if args.no_http_cache else args.http_cache, args.offline)
+
+    try:
+        if args.sequential:
+            main_sequential(base_url, args.output, args.pages, cache)
+            return
+
+        saved = asyncio.run(crawl(base_url, args.output, args.pages, args.workers, args.rate,
+                                  checkpoint_path=args.checkpoint, cache=cache, resume=args.resume))
+        logging.info(f"Scraping completed. {saved} articles scraped and saved.")
+    finally:
+        if cache is not None:
+            logging.info(cache.report())
+            cache.close()
+
 if __name__ == "__main__":
     main()
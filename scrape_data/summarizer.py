@@ -0,0 +1,94 @@
+import json
+import os
+import numpy as np
+
+# Prebuilt by nlp_resources.py in the project root, so loading the stopwords does not import nltk
+NLP_RESOURCES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data',
+                                  'nlp_resources.json')
+
+
+def load_stop_words(path=NLP_RESOURCES_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return frozenset(json.load(f)['stop_words'])
+    except (OSError, ValueError, KeyError):
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+
+
+# Load stopwords once to improve performance
+STOP_WORDS = load_stop_words()
+
+
+def sentence_term_matrix(sentence_words):
+    """
+    Build a sparse sentence x term count matrix.
+
+    Args:
+        sentence_words (list[list[str]]): The filtered words of each sentence.
+
+    Returns:
+        scipy.sparse.csr_matrix: Term counts, one row per sentence.
+    """
+    from scipy.sparse import csr_matrix
+    vocabulary = {}
+    rows, cols = [], []
+    for i, words in enumerate(sentence_words):
+        for word in words:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    data = np.ones(len(rows), dtype=np.int64)
+    return csr_matrix((data, (rows, cols)), shape=(len(sentence_words), len(vocabulary)))
+
+
+def similarity_matrix(sentence_words):
+    """
+    Compute the cosine similarity of every pair of sentences in one matrix product.
+
+    The integer Gram matrix is normalized afterwards with the same float operations
+    scipy's ``cosine`` uses, so every entry is bit-identical to the old pairwise
+    loop. Sentences without any non-stopword give NaN rows, as before.
+
+    Args:
+        sentence_words (list[list[str]]): The filtered words of each sentence.
+
+    Returns:
+        np.ndarray: Symmetric similarity matrix with a zero diagonal.
+    """
+    counts = sentence_term_matrix(sentence_words)
+    gram = (counts @ counts.T).toarray().astype(np.float64)
+    norms = np.diag(gram)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = 1.0 - (1.0 - gram / np.sqrt(np.outer(norms, norms)))
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+def summarize(text, num_sentences=3):
+    """
+    Extractive summary: keep the sentences most similar to the rest of the text.
+
+    Args:
+        text (str): The article text.
+        num_sentences (int): Number of sentences to keep.
+
+    Returns:
+        str: The top-ranked sentences joined by spaces.
+    """
+    # nltk takes over a second to import; only pay for it once there is text to summarize
+    from nltk.tokenize import sent_tokenize
+    sentences = sent_tokenize(text)
+    if not sentences:
+        return ''
+
+    sentence_words = []
+    for sentence in sentences:
+        lowered = (word.lower() for word in sentence.split())
+        sentence_words.append([word for word in lowered if word not in STOP_WORDS])
+
+    sentence_scores = similarity_matrix(sentence_words).sum(axis=1)
+    ranked_sentences = [sentences[i] for i in np.argsort(sentence_scores)[::-1][:num_sentences]]
+
+    return ' '.join(ranked_sentences)
@@ -1,16 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import argparse
+import asyncio
+import contextvars
 import logging
-import time
-import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
-import numpy as np
-from scipy.spatial.distance import cosine
-from prefect import task, flow
+from urllib.parse import urljoin
 import os
+from async_fetch import AsyncFetcher, DEFAULT_CONCURRENCY, DEFAULT_RATE_PER_HOST
+from summarizer import summarize
+from extraction import extract_politifact_article_text, extract_politifact_statements
+from fact_check_store import FactCheckStore
+from http_cache import DEFAULT_CACHE_PATH, open_cache
+from metrics import CSV_IO, PARSE, PROFILERS, SUMMARIZE, RunMetrics, profile_run
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,184 +19,280 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Define the path to the data folder
 DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
 
-@task(name="safe_extract")
-def safe_extract(element, selector, attribute=None):
-    found = element.select_one(selector) if element else None
-    if not found:
-        return "N/A"
-    if attribute:
-        return found.get(attribute, "N/A")
-    return found.get_text(strip=True)
-
-def summarize(text, num_sentences=3):
-    sentences = sent_tokenize(text)
-    stop_words = set(stopwords.words('english'))
-
-    sentence_vectors = []
-    for sentence in sentences:
-        words = [word.lower() for word in sentence.split() if word.lower() not in stop_words]
-        sentence_vectors.append(words)
-
-    similarity_matrix = np.zeros((len(sentences), len(sentences)))
-    for i in range(len(sentences)):
-        for j in range(len(sentences)):
-            if i != j:
-                similarity_matrix[i][j] = sentence_similarity(sentence_vectors[i], sentence_vectors[j])
-
-    sentence_scores = similarity_matrix.sum(axis=1)
-    ranked_sentences = [sentences[i] for i in np.argsort(sentence_scores)[::-1][:num_sentences]]
-
-    return ' '.join(ranked_sentences)
-
-def sentence_similarity(sent1, sent2):
-    all_words = list(set(sent1 + sent2))
-    vector1 = [0] * len(all_words)
-    vector2 = [0] * len(all_words)
-
-    for w in sent1:
-        vector1[all_words.index(w)] += 1
-    for w in sent2:
-        vector2[all_words.index(w)] += 1
-
-    return 1 - cosine(vector1, vector2)
-
-@task(name="scrape_article_page")
-def scrape_article_page(url):
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+BASE_URL = 'https://www.politifact.com/factchecks/list/'
+NUM_PAGES = 1
+CSV_FILENAME = 'politifact_fact_checks.csv'
+
+# Number of appended segments after which a run compacts them into the main CSV
+COMPACT_AFTER_SEGMENTS = 4
+
+# Per-run metrics (.prom for Prometheus text, .json otherwise) and profiler report
+METRICS_FILE = os.path.join(DATA_FOLDER, 'politifact_scraper_metrics.prom')
+PROFILE_FILE = os.path.join(DATA_FOLDER, 'politifact_scraper_profile')
 
-        article = soup.find('article', class_='m-textblock')
-        if article:
-            paragraphs = article.find_all('p')
-            text = ' '.join([p.get_text() for p in paragraphs])
+def parse_article_page(content, metrics=None):
+    metrics = metrics if metrics is not None else RunMetrics()
+    with metrics.time(PARSE):
+        text = extract_politifact_article_text(content)
+    if text is not None:
+        with metrics.time(SUMMARIZE):
             summary = summarize(text)
-            return {'summary': summary}
-        else:
-            return {'summary': "N/A"}
-    except Exception as e:
-        logging.error(f"Error scraping article page: {e}")
+        return {'summary': summary}
+    else:
         return {'summary': "N/A"}
 
-@task(name="load_existing_data")
-def load_existing_data(filename):
-    file_path = os.path.join(DATA_FOLDER, filename)
+def parse_article_page_with_metrics(content):
+    # Runs in a pool worker: the timings travel back with the result
+    metrics = RunMetrics()
+    return parse_article_page(content, metrics), metrics
+
+async def scrape_article_page(fetcher, url, executor, metrics):
+    # Fetch on the event loop, parse and summarize in the executor so CPU work
+    # overlaps with the network waits of the other articles
     try:
-        df = pd.read_csv(file_path)
-        return df.to_dict('records')
-    except pd.errors.EmptyDataError:
-        logging.warning(f"The file at {file_path} is empty. Starting fresh.")
-        return []
-    except FileNotFoundError:
-        logging.info(f"No existing file found at {file_path}. Starting fresh.")
-        return []
+        content = await fetcher.fetch(url)
+        loop = asyncio.get_running_loop()
+        result, worker_metrics = await loop.run_in_executor(executor, parse_article_page_with_metrics, content)
+        metrics.merge(worker_metrics)
+        metrics.incr('articles')
+        return result
     except Exception as e:
-        logging.error(f"Error loading data from {file_path}: {str(e)}")
-        return []
-
-@task(name="scrape_politifact")
-def scrape_politifact(base_url, num_pages, existing_data):
-    fact_checks = []
-    existing_links = set(item['link'] for item in existing_data)
-
-    for page in range(1, num_pages + 1):
-        url = f"{base_url}?page={page}"
-        logging.info(f"Scraping page {page}...")
-        response = requests.get(url)
-        response.encoding = 'utf-8'
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        articles = soup.find_all('article', class_='m-statement')
-
-        for article in articles:
-            try:
-                link_element = article.select_one('.m-statement__content a')
-                link = link_element['href'] if link_element else "N/A"
-                full_link = f"https://www.politifact.com{link}" if link != "N/A" else "N/A"
-
-                if full_link in existing_links:
-                    logging.info(f"Encountered existing article: {full_link}. Stopping scrape.")
-                    return fact_checks  # Stop scraping and return collected fact checks
-
-                claim = safe_extract(article, '.m-statement__quote')
-                verdict = safe_extract(article, '.m-statement__meter img', 'alt')
-                source_element = article.select_one('.m-statement__meta .m-statement__name')
-                source = source_element.get_text(strip=True) if source_element else "N/A"
-
-                article_content = scrape_article_page(full_link) if full_link != "N/A" else {'summary': "N/A"}
+        logging.error(f"Error scraping article page: {e}")
+        metrics.incr('article_errors')
+        return {'summary': "N/A"}
 
+def open_fact_check_store(filename, metrics, data_folder=DATA_FOLDER):
+    with metrics.time(CSV_IO):
+        store = FactCheckStore(os.path.join(data_folder, filename))
+    logging.info(f"Link index holds {len(store)} existing fact checks")
+    return store
+
+def parse_listing_page(content, base_url, metrics=None):
+    metrics = metrics if metrics is not None else RunMetrics()
+    with metrics.time(PARSE):
+        statements = extract_politifact_statements(content)
+    items = []
+    for statement in statements:
+        link = statement['link']
+        items.append({
+            'claim': statement['claim'] if statement['claim'] is not None else "N/A",
+            'verdict': statement['verdict'] if statement['verdict'] is not None else "N/A",
+            'source': statement['source'] if statement['source'] is not None else "N/A",
+            'link': urljoin(base_url, link) if link is not None else "N/A",
+        })
+
+    return items
+
+def parse_listing_page_with_metrics(content, base_url):
+    metrics = RunMetrics()
+    return parse_listing_page(content, base_url, metrics), metrics
+
+async def scrape_politifact_async(base_url, num_pages, existing_links, concurrency=DEFAULT_CONCURRENCY,
+                                  rate_per_host=DEFAULT_RATE_PER_HOST, summary_workers=None, metrics=None, cache=None):
+    metrics = metrics if metrics is not None else RunMetrics()
+    pending = []
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=summary_workers) as executor:
+        async with AsyncFetcher(concurrency=concurrency, rate_per_host=rate_per_host, metrics=metrics,
+                                cache=cache) as fetcher:
+            # Listing pages are walked in order so the "stop at first existing link"
+            # rule still holds; article pages are scheduled as soon as they are seen
+            for page in range(1, num_pages + 1):
+                url = f"{base_url}?page={page}"
+                logging.info(f"Scraping page {page}...")
+                try:
+                    content = await fetcher.fetch(url)
+                except Exception as e:
+                    logging.error(f"Error fetching page {page}: {e}")
+                    break
+                metrics.incr('pages')
+
+                # Parsed in the process pool like the articles: lxml running in a thread while
+                # the pool forks a worker can leave the worker holding lxml's locks (deadlock)
+                items, worker_metrics = await loop.run_in_executor(executor, parse_listing_page_with_metrics,
+                                                                   content, base_url)
+                metrics.merge(worker_metrics)
+                stop = False
+                for item in items:
+                    if item['link'] in existing_links:
+                        logging.info(f"Encountered existing article: {item['link']}. Stopping scrape.")
+                        stop = True
+                        break
+                    if item['link'] != "N/A":
+                        article_task = asyncio.ensure_future(scrape_article_page(fetcher, item['link'], executor, metrics))
+                    else:
+                        article_task = None
+                    pending.append((item, article_task))
+
+                if stop:
+                    break
+                if not pending:
+                    logging.info("No new articles found. Stopping scraping.")
+                    break
+
+            fact_checks = []
+            for item, article_task in pending:
+                article_content = await article_task if article_task else {'summary': "N/A"}
                 fact_checks.append({
-                    'claim': claim,
-                    'verdict': verdict,
+                    'claim': item['claim'],
+                    'verdict': item['verdict'],
                     'summary': article_content['summary'],
-                    'source': source,
-                    'link': full_link,
+                    'source': item['source'],
+                    'link': item['link'],
                 })
-
-                logging.info(f"Scraped new article: {claim[:50]}...")
-                time.sleep(random.uniform(1, 2))
-            except Exception as e:
-                logging.error(f"Error processing an article: {e}")
-
-        if not fact_checks:
-            logging.info("No new articles found. Stopping scraping.")
-            break
+                logging.info(f"Scraped new article: {item['claim'][:50]}...")
 
     return fact_checks
 
-
-@task(name="save_to_csv")
-def save_to_csv(new_data, filename):
-    file_path = os.path.join(DATA_FOLDER, filename)
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-    # Read existing data
+def scrape_politifact(base_url, num_pages, existing_links, concurrency=DEFAULT_CONCURRENCY,
+                      rate_per_host=DEFAULT_RATE_PER_HOST, summary_workers=None, metrics=None,
+                      cache_path=None, offline=False):
+    # The cache is opened here rather than passed in, so the task's inputs stay picklable
+    cache = open_cache(cache_path, offline)
     try:
-        existing_df = pd.read_csv(file_path, encoding='utf-8')
-    except FileNotFoundError:
-        existing_df = pd.DataFrame()
-
-    # Create DataFrame from new data
-    new_df = pd.DataFrame(new_data)
-
-    # Combine new data with existing data, new data on top
-    combined_df = pd.concat([new_df, existing_df]).drop_duplicates(subset=['link'], keep='first')
-
-    # Save combined data
-    combined_df.to_csv(file_path, index=False, encoding='utf-8')
-
-    return len(new_df)
+        return asyncio.run(scrape_politifact_async(base_url, num_pages, existing_links, concurrency,
+                                                   rate_per_host, summary_workers, metrics, cache))
+    finally:
+        if cache is not None:
+            logging.info(cache.report())
+            cache.close()
+
+
+def save_to_csv(new_data, store, metrics):
+    # Only the new records are written; the main CSV is left untouched
+    with metrics.time(CSV_IO):
+        num_saved = store.append(new_data)
+    metrics.incr('saved', num_saved)
+    return num_saved
+
+
+def compact_segments(store, metrics):
+    with metrics.time('compact'):
+        return store.compact()
+
+
+# The coarse stages the Prefect flow runs as tasks
+STAGES = (open_fact_check_store, scrape_politifact, save_to_csv, compact_segments)
+
+
+def run_pipeline(base_url=BASE_URL, num_pages=NUM_PAGES, csv_filename=CSV_FILENAME, metrics_file=METRICS_FILE,
+                 profiler=None, data_folder=DATA_FOLDER, rate_per_host=DEFAULT_RATE_PER_HOST,
+                 cache_path=DEFAULT_CACHE_PATH, offline=False, stage=None):
+    """
+    Scrape the newest PolitiFact fact checks and append them to ``csv_filename``.
+
+    This is the whole pipeline as plain function calls; the Prefect flow runs the
+    same code with each of the STAGES wrapped as a task.
+
+    Args:
+        base_url (str): The first listing page.
+        num_pages (int): Maximum number of listing pages to walk.
+        csv_filename (str): File name of the fact-check CSV in ``data_folder``.
+        metrics_file (str): Where the run's stage timings and counters are written;
+            Prometheus text for a .prom file, JSON otherwise. None to skip.
+        profiler (str, optional): 'cprofile' or 'pyinstrument' to also save a
+            profile of the run next to PROFILE_FILE.
+        data_folder (str): Folder of the fact-check CSV.
+        rate_per_host (float): Requests per second allowed per host.
+        cache_path (str): HTTP response cache (see http_cache.py); None disables it.
+        offline (bool): Replay pages from the response cache without any network traffic.
+        stage (callable, optional): Applied to each stage function before it is called.
+
+    Returns:
+        int: Number of new fact checks saved.
+    """
+    stage = stage or (lambda function: function)
+    logging.info(f"Script started at {datetime.now()}")
+    metrics = RunMetrics()
+    num_saved = 0
 
+    with profile_run(profiler, PROFILE_FILE), ThreadPoolExecutor(max_workers=1) as background:
+        store = stage(open_fact_check_store)(csv_filename, metrics, data_folder)
 
-@flow(name="politifact_scraper")
-def main_flow():
-    logging.info("Starting PolitiFact scraper flow")
-    base_url = 'https://www.politifact.com/factchecks/list/'
-    num_pages = 1
-    csv_filename = 'politifact_fact_checks.csv'   #'politifact_fact_checks.csv' new_df
+        # Fold segments from previous runs into the main CSV while this run scrapes;
+        # the copied context lets a Prefect task find its flow run from the thread
+        compaction = None
+        if len(store.segments()) >= COMPACT_AFTER_SEGMENTS:
+            compaction = background.submit(contextvars.copy_context().run, stage(compact_segments), store, metrics)
 
-    logging.info(f"Script started at {datetime.now()}")
+        new_fact_checks = stage(scrape_politifact)(base_url, num_pages, store, rate_per_host=rate_per_host,
+                                                   metrics=metrics, cache_path=cache_path, offline=offline)
+        logging.info(f"Scraped {len(new_fact_checks)} new fact checks")
 
-    existing_data = load_existing_data(csv_filename)
-    logging.info(f"Loaded {len(existing_data)} existing fact checks")
+        if new_fact_checks:
+            num_saved = stage(save_to_csv)(new_fact_checks, store, metrics)
+            logging.info(f"Saved {num_saved} new fact checks to {csv_filename}")
+        else:
+            logging.info("No new fact checks found.")
 
-    new_fact_checks = scrape_politifact(base_url, num_pages, existing_data)
-    logging.info(f"Scraped {len(new_fact_checks)} new fact checks")
+        if compaction is not None:
+            compaction.result()
 
-    if new_fact_checks:
-        num_saved = save_to_csv(new_fact_checks, csv_filename)
-        logging.info(f"Saved {num_saved} new fact checks to {csv_filename}")
-    else:
-        logging.info("No new fact checks found.")
+    metrics.log_summary()
+    if metrics_file:
+        metrics.write(metrics_file, namespace='politifact_scraper')
+        logging.info(f"Saved run metrics to {metrics_file}")
 
     logging.info("Scraping completed.")
     logging.info(f"Script completed at {datetime.now()}")
-
-if __name__ == "__main__":
-    main_flow()
-
-
-if __name__ == "__main__":
+    return num_saved
+
+
+_main_flow = None
+
+
+def get_main_flow():
+    """Build the Prefect flow on first use, so running without the orchestrator never imports prefect."""
+    global _main_flow
+    if _main_flow is not None:
+        return _main_flow
+    from prefect import flow, task
+
+    tasks = {function: task(function, name=function.__name__) for function in STAGES}
+
+    @flow(name="politifact_scraper")
+    def main_flow(metrics_file=METRICS_FILE, profiler=None, base_url=BASE_URL, num_pages=NUM_PAGES,
+                  data_folder=DATA_FOLDER, rate_per_host=DEFAULT_RATE_PER_HOST, cache_path=DEFAULT_CACHE_PATH,
+                  offline=False):
+        """Scrape the newest PolitiFact fact checks, one Prefect task per stage (see run_pipeline)."""
+        logging.info("Starting PolitiFact scraper flow")
+        return run_pipeline(base_url, num_pages, metrics_file=metrics_file, profiler=profiler,
+                            data_folder=data_folder, rate_per_host=rate_per_host, cache_path=cache_path,
+                            offline=offline, stage=tasks.__getitem__)
+
+    _main_flow = main_flow
+    return _main_flow
+
+
+def __getattr__(name):
+    # Deployments load the "weekly-politifact-scraper.py:main_flow" entrypoint through here
+    if name == 'main_flow':
+        return get_main_flow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape the newest PolitiFact fact checks.")
+    parser.add_argument('--no-orchestrator', action='store_true',
+                        help="Run the pipeline directly, without Prefect (no flow run, no deployment)")
+    parser.add_argument('--num-pages', type=int, default=NUM_PAGES)
+    parser.add_argument('--metrics-file', default=METRICS_FILE)
+    parser.add_argument('--profiler', choices=PROFILERS)
+    parser.add_argument('--http-cache', default=DEFAULT_CACHE_PATH, help="HTTP response cache file")
+    parser.add_argument('--no-http-cache', action='store_true', help="Fetch every page from the network")
+    parser.add_argument('--offline', action='store_true', help="Replay pages from the HTTP cache only")
+    args = parser.parse_args()
+    cache_path = None if args.no_http_cache else args.http_cache
+
+    if args.no_orchestrator:
+        run_pipeline(num_pages=args.num_pages, metrics_file=args.metrics_file, profiler=args.profiler,
+                     cache_path=cache_path, offline=args.offline)
+        return
+
+    main_flow = get_main_flow()
+    main_flow(metrics_file=args.metrics_file, profiler=args.profiler, num_pages=args.num_pages,
+              cache_path=cache_path, offline=args.offline)
     main_flow.from_source(
         "https://github.com/Taciturny/fact-checking-news-project.git",  # Replace with your repo URL
         entrypoint="scrape_data/weekly-politifact-scraper.py:main_flow"  # Path to your flow file and function name
@@ -209,6 +306,10 @@ if __name__ == "__main__":
     )
 
 
+if __name__ == "__main__":
+    main()
+
+
 # if __name__ == "__main__":
 #     main_flow.serve(
 #         name="politifact_tuesday_scraper",
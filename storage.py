@@ -0,0 +1,199 @@
+import os
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from schema import UUID_DTYPE, uuids_to_str
+
+# Low-cardinality columns stored dictionary-encoded (read back as categoricals)
+DICTIONARY_COLUMNS = ['label', 'source']
+UUID_TYPE = pa.binary(16)
+# Smaller row groups bound the decode buffers needed when loading
+ROW_GROUP_SIZE = 128 * 1024
+
+# Arrow schema of a corpus file: label, statement, source, uuid
+CORPUS_SCHEMA = pa.schema([
+    ('label', pa.dictionary(pa.int32(), pa.string())),
+    ('statement', pa.string()),
+    ('source', pa.dictionary(pa.int32(), pa.string())),
+    ('uuid', UUID_TYPE),
+])
+
+
+def to_arrow_table(df):
+    """
+    Convert a corpus dataframe to an Arrow table with a compact schema.
+
+    'label' and 'source' are dictionary-encoded and 'uuid' is stored as a
+    16-byte fixed-width binary column, from either binary or string UUIDs.
+
+    Args:
+        df (pd.DataFrame): The corpus with 'label', 'statement', 'source' and 'uuid' columns.
+
+    Returns:
+        pa.Table: The converted table.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if column in DICTIONARY_COLUMNS:
+            columns[column] = pa.array(values.astype(object), type=pa.string(), from_pandas=True).dictionary_encode()
+        elif column == 'uuid' and values.dtype == UUID_DTYPE:
+            columns[column] = pa.array(values)
+        elif column == 'uuid':
+            columns[column] = pa.array([uuid.UUID(str(value)).bytes for value in values], type=UUID_TYPE)
+        else:
+            columns[column] = pa.array(values, from_pandas=True)
+    return pa.table(columns)
+
+
+def save_parquet(df, path):
+    pq.write_table(to_arrow_table(df), path, use_dictionary=DICTIONARY_COLUMNS, compression='zstd',
+                   row_group_size=ROW_GROUP_SIZE)
+
+
+def load_parquet(path, columns=None, uuid_as_str=True):
+    """
+    Load a corpus Parquet file, reading only the requested columns.
+
+    The file is memory-mapped, so unused columns are never read from disk.
+
+    Args:
+        path (str): Path of the Parquet file.
+        columns (list[str], optional): Columns to load; all columns by default.
+        uuid_as_str (bool): Convert the binary 'uuid' column back to strings.
+
+    Returns:
+        pd.DataFrame: The loaded data; dictionary columns become categoricals.
+    """
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    # Release Arrow buffers as columns are converted to keep peak memory low
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    if uuid_as_str and 'uuid' in df.columns:
+        df['uuid'] = [str(uuid.UUID(bytes=value)) for value in df['uuid']]
+    return df
+
+
+def save_corpus(df, base_path, name, formats=('parquet', 'csv')):
+    """
+    Save a corpus dataframe in the requested formats.
+
+    Args:
+        df (pd.DataFrame): The corpus to save.
+        base_path (str): Output directory.
+        name (str): File name without extension.
+        formats (tuple[str]): Any of 'parquet' and 'csv'.
+
+    Returns:
+        list[str]: The paths written.
+    """
+    paths = []
+    if 'parquet' in formats:
+        paths.append(os.path.join(base_path, f'{name}.parquet'))
+        save_parquet(df, paths[-1])
+    if 'csv' in formats:
+        paths.append(os.path.join(base_path, f'{name}.csv'))
+        # CSV keeps the usual 36-character UUID strings
+        if 'uuid' in df.columns:
+            df = df.assign(uuid=uuids_to_str(df['uuid']))
+        df.to_csv(paths[-1], index=False)
+    return paths
+
+
+class CorpusWriter:
+    """
+    Write a corpus chunk by chunk, so it never has to be held in memory at once.
+
+    Produces the same files as ``save_corpus``: each chunk becomes a row group of
+    the Parquet file and is appended to the CSV file.
+
+    Args:
+        base_path (str): Output directory.
+        name (str): File name without extension.
+        formats (tuple[str]): Any of 'parquet' and 'csv'.
+    """
+
+    def __init__(self, base_path, name, formats=('parquet', 'csv')):
+        self.parquet_path = os.path.join(base_path, f'{name}.parquet') if 'parquet' in formats else None
+        self.csv_path = os.path.join(base_path, f'{name}.csv') if 'csv' in formats else None
+        self.paths = [path for path in (self.parquet_path, self.csv_path) if path]
+        self.rows = 0
+        self._parquet_writer = None
+        if self.parquet_path:
+            self._parquet_writer = pq.ParquetWriter(self.parquet_path, CORPUS_SCHEMA, compression='zstd',
+                                                    use_dictionary=DICTIONARY_COLUMNS)
+        if self.csv_path:
+            pd.DataFrame(columns=CORPUS_SCHEMA.names).to_csv(self.csv_path, index=False)
+
+    def write(self, df):
+        """Append a chunk with the corpus columns."""
+        if not len(df):
+            return
+        df = df[CORPUS_SCHEMA.names]
+        if self._parquet_writer is not None:
+            self._parquet_writer.write_table(to_arrow_table(df).cast(CORPUS_SCHEMA), row_group_size=ROW_GROUP_SIZE)
+        if self.csv_path:
+            df.assign(uuid=uuids_to_str(df['uuid'])).to_csv(self.csv_path, mode='a', header=False, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_corpus(base_path, name, columns=None):
+    """
+    Load a corpus, preferring the Parquet file and falling back to CSV.
+
+    Args:
+        base_path (str): Directory containing the files.
+        name (str): File name without extension.
+        columns (list[str], optional): Columns to load; all columns by default.
+
+    Returns:
+        pd.DataFrame: The loaded data.
+    """
+    parquet_path = os.path.join(base_path, f'{name}.parquet')
+    if os.path.exists(parquet_path):
+        return load_parquet(parquet_path, columns=columns)
+    return pd.read_csv(os.path.join(base_path, f'{name}.csv'), usecols=columns)
+
+
+def iter_corpus(base_path, name, columns=None, chunk_size=ROW_GROUP_SIZE, seed=None):
+    """
+    Read a corpus chunk by chunk, preferring the Parquet file and falling back to CSV.
+
+    Only one chunk is held in memory at a time, so corpora larger than memory
+    can be streamed. UUIDs are not converted to strings.
+
+    Args:
+        base_path (str): Directory containing the files.
+        name (str): File name without extension.
+        columns (list[str], optional): Columns to load; all columns by default.
+        chunk_size (int): Rows per chunk.
+        seed (int, optional): Read the Parquet row groups in an order shuffled with
+            this seed. CSV files are always read in file order.
+
+    Yields:
+        pd.DataFrame: Chunks of the corpus, consecutive within a row group.
+    """
+    parquet_path = os.path.join(base_path, f'{name}.parquet')
+    if os.path.exists(parquet_path):
+        parquet_file = pq.ParquetFile(parquet_path, memory_map=True)
+        row_groups = list(range(parquet_file.num_row_groups))
+        if seed is not None:
+            row_groups = np.random.default_rng(seed).permutation(row_groups).tolist()
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=row_groups, columns=columns):
+            yield batch.to_pandas()
+        return
+    with pd.read_csv(os.path.join(base_path, f'{name}.csv'), usecols=columns, chunksize=chunk_size) as reader:
+        yield from reader
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict, deque
+import numpy as np
+import pandas as pd
+from aiohttp import web
+from claim_index import DEFAULT_INDEX_PATH, load_or_build
+from data_preprocessing import preprocess_series
+from storage import load_corpus
+
+DEFAULT_PORT = 8080
+DEFAULT_K = 5
+MAX_K = 50
+# A batch is dispatched when it is full or when its oldest request has waited this long
+DEFAULT_MAX_BATCH = 32
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_CACHE_SIZE = 4096
+# Number of recent request latencies kept for the percentiles
+LATENCY_WINDOW = 10_000
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class LRUCache:
+    """Least-recently-used cache of verification results."""
+
+    def __init__(self, capacity=DEFAULT_CACHE_SIZE):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.items:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return self.items[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+
+
+class Verifier:
+    """
+    Retrieve the prior fact checks closest to a claim and weigh their labels.
+
+    Args:
+        knowledge_base (pd.DataFrame): 'statement', 'label', 'source' and 'uuid' columns,
+            in the order the index was built from.
+        index (BM25Index): Index over the knowledge base statements.
+    """
+
+    def __init__(self, knowledge_base, index):
+        self.statements = knowledge_base['statement'].astype(object).fillna('').to_numpy()
+        self.labels = knowledge_base['label'].astype(object).fillna('unknown').astype(str).str.lower().to_numpy()
+        self.sources = knowledge_base['source'].astype(object).to_numpy()
+        self.uuids = knowledge_base['uuid'].astype(str).to_numpy()
+        self.index = index
+
+    def verify_batch(self, claims, k=DEFAULT_K):
+        """
+        Verify a batch of raw claims.
+
+        Claims are normalized together with the knowledge base preprocessing, then
+        each is looked up in the index. The verdict is the label with the largest
+        sum of BM25 scores among the matches.
+
+        Args:
+            claims (list[str]): Raw claims.
+            k (int): Matches per claim.
+
+        Returns:
+            list[dict]: One result per claim.
+        """
+        normalized = preprocess_series(pd.Series(claims, dtype=object))
+        results = []
+        for claim, statement in zip(claims, normalized):
+            terms = Counter(statement.split())
+            query = [(self.index.vocabulary[token], tf) for token, tf in terms.items() if token in self.index.vocabulary]
+            matches = self.index.search_terms(query, k)
+
+            weights = Counter()
+            for position, score in matches:
+                weights[self.labels[position]] += score
+            total = sum(weights.values())
+            verdict, weight = weights.most_common(1)[0] if weights else (None, 0.0)
+            results.append({
+                'claim': claim,
+                'normalized_claim': statement,
+                'verdict': verdict,
+                'confidence': weight / total if total else 0.0,
+                'label_weights': {label: value / total for label, value in weights.most_common()} if total else {},
+                'matches': [{
+                    'statement': self.statements[position],
+                    'label': self.labels[position],
+                    'source': self.sources[position],
+                    'uuid': self.uuids[position],
+                    'score': score,
+                } for position, score in matches],
+            })
+        return results
+
+
+class MicroBatcher:
+    """
+    Collect concurrent requests into batches processed off the event loop.
+
+    Requests with the same ``k`` are batched together; a batch runs when it holds
+    ``max_batch`` claims or ``max_wait_ms`` after its first claim arrived.
+    """
+
+    def __init__(self, process, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.process = process
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, claim, k):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((claim, k, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            by_k = {}
+            for claim, k, future in batch:
+                by_k.setdefault(k, []).append((claim, future))
+            for k, requests in by_k.items():
+                self.batch_sizes.append(len(requests))
+                try:
+                    results = await loop.run_in_executor(None, self.process, [claim for claim, _ in requests], k)
+                except Exception as e:
+                    for _, future in requests:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(requests, results):
+                    if not future.done():
+                        future.set_result(result)
+
+
+def percentile_ms(values, percentiles):
+    if not values:
+        return [None] * len(percentiles)
+    return [round(value * 1000, 3) for value in np.percentile(list(values), percentiles)]
+
+
+def create_app(verifier, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Build the aiohttp application.
+
+    Routes:
+        POST /verify   {"claim": str, "k": int} -> verdict, confidence and matches
+        GET  /stats    request count, p50/p99 latency, cache and batch statistics
+        GET  /health   liveness check
+    """
+    app = web.Application()
+    batcher = MicroBatcher(verifier.verify_batch, max_batch, max_wait_ms)
+    cache = LRUCache(cache_size)
+    latencies = deque(maxlen=LATENCY_WINDOW)
+    counters = Counter()
+
+    async def verify(request):
+        start = time.perf_counter()
+        try:
+            payload = await request.json()
+            claim = payload['claim']
+            k = int(payload.get('k', DEFAULT_K))
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest(text='Expected a JSON body with a "claim" string and an optional "k"')
+        if not isinstance(claim, str) or not 1 <= k <= MAX_K:
+            raise web.HTTPBadRequest(text=f'"claim" must be a string and "k" between 1 and {MAX_K}')
+
+        key = (claim, k)
+        result = cache.get(key)
+        if result is None:
+            result = await batcher.submit(claim, k)
+            cache.put(key, result)
+
+        latencies.append(time.perf_counter() - start)
+        counters['requests'] += 1
+        return web.json_response(result)
+
+    async def stats(request):
+        p50, p99 = percentile_ms(latencies, [50, 99])
+        return web.json_response({
+            'requests': counters['requests'],
+            'latency_ms': {'p50': p50, 'p99': p99, 'window': len(latencies)},
+            'cache': {'size': len(cache.items), 'hits': cache.hits, 'misses': cache.misses},
+            'batches': {'count': len(batcher.batch_sizes),
+                        'mean_size': float(np.mean(batcher.batch_sizes)) if batcher.batch_sizes else None},
+        })
+
+    async def health(request):
+        return web.json_response({'status': 'ok', 'documents': len(verifier.index)})
+
+    async def on_startup(app):
+        batcher.start()
+
+    async def on_cleanup(app):
+        await batcher.stop()
+
+    app.router.add_post('/verify', verify)
+    app.router.add_get('/stats', stats)
+    app.router.add_get('/health', health)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def load_verifier(base_path='data', index_path=DEFAULT_INDEX_PATH):
+    """
+    Load the knowledge base and its BM25 index, building the index if it is missing or
+    was built from other statements (compared by uuid, in order).
+    """
+    knowledge_base = load_corpus(base_path, 'knowledge_base', columns=['label', 'statement', 'source', 'uuid'])
+    index, _ = load_or_build(knowledge_base, index_path)
+    return Verifier(knowledge_base, index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve claim verification over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="BM25 index directory")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    verifier = load_verifier(index_path=args.index)
+    logging.info(f"Loaded {len(verifier.index)} fact checks in {time.perf_counter() - start:.2f}s")
+    web.run_app(create_app(verifier, args.max_batch, args.max_wait_ms, args.cache_size),
+                host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()